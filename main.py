@@ -1,4 +1,10 @@
-from src.configs.config import Instance
+import sys
+import json
+import argparse
+
+from src.configs.config import Config, Instance
+from src.services.batch import BatchRunner
+from src.services.benchmark import Benchmark
 from src.services.service import RoutingService
 
 
@@ -19,14 +25,78 @@ def main():
                                               no_of_vehicles=int(no_of_vehicles),
                                               no_of_pickups=int(no_of_pickups),
                                               capacity=int(capacity),
-                                              use_n_n=bool(use_n_n),
-                                              use_polar_angle=bool(use_polar_angle))
+                                              use_n_n=BatchRunner.parse_bool(use_n_n),
+                                              use_polar_angle=BatchRunner.parse_bool(use_polar_angle))
 
         return output
 
-    except:
-        print("Please provide valid inputs")
+    except (ValueError, KeyError) as error:
+        print(f"Please provide valid inputs: {error}")
+
+
+def batch(arguments: list[str]):
+    parser = argparse.ArgumentParser(description="Run routing scenarios without interaction, "
+                                                 "one JSON line of results per scenario")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--scenarios", help="JSON list or JSON lines file of scenarios")
+    source.add_argument("--grid", help="JSON file mapping each solve_routing argument to a list of values")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--output", help="File to write the JSON lines to, stdout by default")
+    parser.add_argument("--routes", action="store_true", help="Include the routes in the results")
+    parser.add_argument("--cache-directory", default=Config.CACHE_DIRECTORY, help="Instance cache directory")
+    args = parser.parse_args(arguments)
+
+    if args.scenarios:
+        scenarios = BatchRunner.load_scenarios(path=args.scenarios)
+    else:
+        with open(args.grid) as file:
+            scenarios = BatchRunner.expand_grid(grid=json.load(file))
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        BatchRunner.run(scenarios=scenarios, workers=args.workers, output=output, include_routes=args.routes,
+                        cache_directory=args.cache_directory)
+    finally:
+        if args.output:
+            output.close()
+
+
+def benchmark(arguments: list[str]):
+    parser = argparse.ArgumentParser(prog="main.py benchmark",
+                                     description="Benchmark the bundled and a synthetic instance and fail on "
+                                                 "regressions against the baseline file")
+    parser.add_argument("--scenarios", nargs="*", help="Names of the scenarios to run, all by default")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed solves per scenario")
+    parser.add_argument("--no-synthetic", action="store_true", help="Leave out the synthetic instance")
+    parser.add_argument("--baseline", default=Config.BENCHMARK_BASELINE, help="Baseline file")
+    parser.add_argument("--update", action="store_true", help="Write the results to the baseline file")
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="Allowed relative slowdown")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="Allowed relative memory growth")
+    parser.add_argument("--timings", action="store_true",
+                        help="Also compare the times and memory, only valid on the machine that recorded the baseline")
+    args = parser.parse_args(arguments)
+
+    results = Benchmark.run(names=args.scenarios, repeat=args.repeat, synthetic=not args.no_synthetic)
+    print(json.dumps(results, indent=2))
+    if args.update:
+        baseline = Benchmark.load_baseline(path=args.baseline)
+        baseline.update(results)
+        Benchmark.save_baseline(results=baseline, path=args.baseline)
+        return
+
+    regressions = Benchmark.compare(results=results, baseline=Benchmark.load_baseline(path=args.baseline),
+                                    time_tolerance=args.time_tolerance, memory_tolerance=args.memory_tolerance,
+                                    timings=args.timings)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    if regressions:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == 'benchmark':
+        benchmark(sys.argv[2:])
+    elif len(sys.argv) > 1:
+        batch(sys.argv[1:])
+    else:
+        main()
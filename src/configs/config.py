@@ -24,3 +24,6 @@ class Instance:
 
 class Config:
     MAX_DISTANCE = 9999999
+    CACHE_DIRECTORY = '.cache/instances'
+    CACHE_MAX_SIZE = 2 * 1024 ** 3
+    BENCHMARK_BASELINE = 'src/data/benchmark/baseline.json'
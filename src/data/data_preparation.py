@@ -1,18 +1,23 @@
-import pandas as pd
-
-from src.models.node import Node
 from src.utils.sorting import Sorting
-from src.models.location import Location
+from src.models.node_table import NodeTable
+from src.models.cvrp_instance import CVRPInstance
+from src.data.instance_cache import InstanceCache
+from src.data.instance_parser import InstanceParser
+from src.data.instance_generator import InstanceGenerator
 
 
 class DataPreparation:
-    def __init__(self, instance: dict, no_of_vehicles: int, no_of_pickups: int, capacity: int):
+    def __init__(self, instance: dict, no_of_vehicles: int, no_of_pickups: int, capacity: int = None,
+                 cache: InstanceCache = None):
+        self.instance = instance
         self.path = instance.get("path")
-        self.no_of_customers = instance.get("number_of_customers")
+        self.cache = cache
+        self.no_of_customers = 0
         self.no_of_pickups = no_of_pickups
         self.no_of_vehicles = no_of_vehicles
         self.capacity = capacity
         self.nodes = []
+        self.node_table = None
         self.vehicles = []
         self.depot = []
         self.eligible_pickups = []
@@ -28,55 +33,33 @@ class DataPreparation:
         DataPreparation.set_eligible_deliveries_by_ascending_demand(self)
         DataPreparation.set_minimum_number_of_required_vehicles(self)
 
-    def get_demand_data(self) -> pd.DataFrame:
-        """Get demand data from the instance file
+    def get_instance_data(self) -> CVRPInstance:
+        """Get the instance data. An instance dict holds the path of an instance file, the parsed or generated
+        CVRPInstance as "data", or the InstanceGenerator.generate arguments as "generator".
+        Instance files are read from the instance cache if given.
 
         Returns:
-            pd.DataFrame: The demand data
+            CVRPInstance: The instance data
         """
-        df = pd.read_csv(self.path, delim_whitespace=True)
-        start = df.loc[df.NAME == 'NODE_COORD_SECTION'].index[0]
-        location_data = pd.read_csv(self.path,
-                                    skiprows=start + 2,
-                                    delim_whitespace=True,
-                                    header=None,
-                                    index_col=0,
-                                    nrows=self.no_of_customers + 1)
-        start = df.loc[df.NAME == 'DEMAND_SECTION'].index[0]
-        demand_data = pd.read_csv(self.path,
-                                  skiprows=start + 2,
-                                  delim_whitespace=True,
-                                  header=None,
-                                  index_col=0,
-                                  nrows=self.no_of_customers + 1)
-
-        data = pd.concat([location_data, demand_data], axis=1)
-        data.index -= 1
-        return data
+        if "data" in self.instance:
+            return self.instance["data"]
+        if "generator" in self.instance:
+            return InstanceGenerator.generate(**self.instance["generator"])
+        if self.cache is not None:
+            return self.cache.load_instance(path=self.path)
+        return InstanceParser.parse(path=self.path)
 
     def create_nodes(self) -> None:
-        """Create nodes from the demand data
+        """Create the node table and the nodes from the instance data
             Node Types: 1 - Depot, 2 - Pickup, 3 - Delivery"""
-        demand_data = self.get_demand_data()
-        for row in demand_data.itertuples():
-            if row.Index == 0:
-                depot = Node(id=row.Index,
-                             location=Location(lat=row[1], lon=row[2]),
-                             demand=row[3],
-                             node_type='depot')
-                self.nodes.append(depot)
-            elif row.Index <= self.no_of_pickups:
-                customer = Node(id=row.Index,
-                                location=Location(lat=row[1], lon=row[2]),
-                                demand=row[3],
-                                node_type='pickup')
-                self.nodes.append(customer)
-            else:
-                customer = Node(id=row.Index,
-                                location=Location(lat=row[1], lon=row[2]),
-                                demand=row[3],
-                                node_type='delivery')
-                self.nodes.append(customer)
+        instance_data = self.get_instance_data()
+        self.no_of_customers = instance_data.no_of_customers
+        if self.capacity is None:
+            self.capacity = instance_data.capacity
+        self.node_table = NodeTable.create(coordinates=instance_data.coordinates,
+                                           demand=instance_data.demand,
+                                           no_of_pickups=self.no_of_pickups)
+        self.nodes = self.node_table.to_nodes()
 
     def set_depot(self) -> None:
         """Set the depot node"""""
@@ -103,7 +86,7 @@ class DataPreparation:
 
     def set_minimum_number_of_required_vehicles(self) -> None:
         """Set the minimum number of required vehicles based on the eligible deliveries total demand"""
-        required_total_capacity = sum([node.demand for node in self.nodes if node.node_type == 'delivery'])
+        required_total_capacity = self.node_table.get_total_demand(node_type=NodeTable.DELIVERY)
         self.minimum_required_vehicles = required_total_capacity // self.capacity
         if required_total_capacity % self.capacity != 0:
             self.minimum_required_vehicles += 1
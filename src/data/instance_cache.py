@@ -0,0 +1,148 @@
+import os
+import hashlib
+import tempfile
+
+import numpy as np
+
+from src.configs.config import Config
+from src.models.cvrp_instance import CVRPInstance
+from src.data.instance_parser import InstanceParser
+from src.methods.distance_matrix import DistanceMatrix
+
+
+class InstanceCache:
+    """An on-disk cache of parsed instances (.npz) and dense distance matrices (.npy).
+
+    Entries are keyed by the SHA-256 of the instance file content, so a changed file gets new entries and the
+    stale ones age out. Distance matrices are loaded with memory mapping. When the cache grows beyond max_size
+    bytes, the least recently used entries are removed."""
+
+    def __init__(self, directory: str = Config.CACHE_DIRECTORY, max_size: int = Config.CACHE_MAX_SIZE,
+                 mmap: bool = True):
+        self.directory = directory
+        self.max_size = max_size
+        self.mmap = mmap
+        self.keys = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def get_key(self, path: str) -> str:
+        """Get the content hash of an instance file, rehashed only when its size or modification time changes
+
+        Args:
+            path (str): The path of the instance file
+
+        Returns:
+            str: The hexadecimal SHA-256 of the file content
+        """
+        stat = os.stat(path)
+        signature = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        key = self.keys.get(signature)
+        if key is None:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as file:
+                for block in iter(lambda: file.read(1 << 20), b''):
+                    digest.update(block)
+            key = digest.hexdigest()
+            self.keys[signature] = key
+        return key
+
+    def load_instance(self, path: str) -> CVRPInstance:
+        """Load a parsed instance, parsing and storing it on a miss
+
+        Args:
+            path (str): The path of the instance file
+
+        Returns:
+            CVRPInstance: The parsed instance
+        """
+        entry = os.path.join(self.directory, f"{self.get_key(path=path)}.npz")
+        if os.path.exists(entry):
+            os.utime(entry)
+            with np.load(entry) as arrays:
+                capacity = int(arrays['capacity'])
+                return CVRPInstance(name=str(arrays['name']),
+                                    dimension=int(arrays['dimension']),
+                                    capacity=capacity if capacity >= 0 else None,
+                                    edge_weight_type=str(arrays['edge_weight_type']),
+                                    depot_ids=arrays['depot_ids'].tolist(),
+                                    coordinates=arrays['coordinates'],
+                                    demand=arrays['demand'])
+
+        instance = InstanceParser.parse(path=path)
+        self.write(entry=entry, save=lambda file: np.savez(file,
+                                                           name=instance.name or '',
+                                                           dimension=instance.dimension,
+                                                           capacity=-1 if instance.capacity is None
+                                                           else instance.capacity,
+                                                           edge_weight_type=instance.edge_weight_type or '',
+                                                           depot_ids=np.asarray(instance.depot_ids, dtype=np.int64),
+                                                           coordinates=instance.coordinates,
+                                                           demand=instance.demand))
+        return instance
+
+    def load_distance_matrix(self, path: str, coordinates: np.ndarray, dtype: np.dtype = np.float64,
+                             round_to_int: bool = False) -> np.ndarray:
+        """Load the dense distance matrix of an instance, building and storing it on a miss
+
+        Args:
+            path (str): The path of the instance file
+            coordinates (np.ndarray): The (n, 2) array of (lat, lon) coordinates of the instance
+            dtype (np.dtype): The dtype of the distance matrix
+            round_to_int (bool): Round the distances to the nearest integer (TSPLIB EUC_2D convention)
+
+        Returns:
+            np.ndarray: The distance matrix, read-only and memory mapped if mmap is set
+        """
+        suffix = f"{np.dtype(dtype).name}{'-euc2d' if round_to_int else ''}"
+        entry = os.path.join(self.directory, f"{self.get_key(path=path)}-{suffix}.npy")
+        if os.path.exists(entry):
+            os.utime(entry)
+            return np.load(entry, mmap_mode='r' if self.mmap else None).view(np.ndarray)
+
+        distance_matrix = DistanceMatrix.create(coordinates=coordinates, dtype=dtype, round_to_int=round_to_int)
+        self.write(entry=entry, save=lambda file: np.save(file, distance_matrix))
+        return distance_matrix
+
+    def write(self, entry: str, save) -> None:
+        """Write an entry atomically and evict old entries if the cache is too large
+
+        Args:
+            entry (str): The path of the entry
+            save (Callable): Writes the entry to the given file object
+        """
+        handle, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                save(file)
+            os.replace(temporary_path, entry)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        self.evict(keep=entry)
+
+    def evict(self, keep: str = None) -> None:
+        """Remove the least recently used entries until the cache fits in max_size bytes
+
+        Args:
+            keep (str): An entry that is never removed, e.g. the one just written
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(('.npz', '.npy')):
+                entry = os.path.join(self.directory, name)
+                stat = os.stat(entry)
+                entries.append((stat.st_mtime_ns, stat.st_size, entry))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            if entry == keep:
+                continue
+            os.remove(entry)
+            total_size -= size
+
+    @property
+    def size(self) -> int:
+        """The number of bytes of the cached entries"""
+        return sum(os.path.getsize(os.path.join(self.directory, name)) for name in os.listdir(self.directory)
+                   if name.endswith(('.npz', '.npy')))
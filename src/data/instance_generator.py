@@ -0,0 +1,199 @@
+import math
+
+import numpy as np
+
+from src.models.cvrp_instance import CVRPInstance
+
+
+class InstanceGenerator:
+    """Seeded CVRP instances generated like the X instances of Uchoa et al. (2017) at any size.
+
+    Points lie on the integer grid [0, 1000] x [0, 1000] and no two nodes share a point.
+    Depot positions: R - random, C - center, E - eccentric (corner)
+    Customer positions: R - random, C - clustered, RC - half clustered and half random
+    Demand distributions: U - unitary, 1-10, 5-10, 1-100, 50-100 - uniform ranges,
+    Q - 1-50 in the lower left and upper right quadrants and 51-100 in the others,
+    SL - many small (1-10) and few large (50-100) demands"""
+
+    GRID_SIZE = 1000
+    DEPOT_POSITIONS = ('R', 'C', 'E')
+    CUSTOMER_POSITIONS = ('R', 'C', 'RC')
+    DEMAND_RANGES = {'1-10': (1, 10), '5-10': (5, 10), '1-100': (1, 100), '50-100': (50, 100)}
+    DEMAND_DISTRIBUTIONS = ('U', '1-10', '5-10', '1-100', '50-100', 'Q', 'SL')
+    # The attractiveness of a point for the clustered customers decays as exp(-distance / CLUSTER_DECAY)
+    CLUSTER_DECAY = 40
+
+    @staticmethod
+    def generate(no_of_customers: int,
+                 depot_position: str = 'R',
+                 customer_position: str = 'RC',
+                 demand_distribution: str = '1-100',
+                 route_size: float = None,
+                 seed: int = 0) -> CVRPInstance:
+        """Generate an instance
+
+        Args:
+            no_of_customers (int): The number of customers
+            depot_position (str): The depot position type
+            customer_position (str): The customer position type
+            demand_distribution (str): The demand distribution type
+            route_size (float): The average number of customers per route the capacity is set for,
+                None to draw it from the triangular distribution between 3 and 25 with mode 6
+            seed (int): The random seed
+
+        Returns:
+            CVRPInstance: The instance, node 0 is the depot
+        """
+        if depot_position not in InstanceGenerator.DEPOT_POSITIONS:
+            raise ValueError(f"Unknown depot position: {depot_position}")
+        if customer_position not in InstanceGenerator.CUSTOMER_POSITIONS:
+            raise ValueError(f"Unknown customer position: {customer_position}")
+        if demand_distribution not in InstanceGenerator.DEMAND_DISTRIBUTIONS:
+            raise ValueError(f"Unknown demand distribution: {demand_distribution}")
+        if no_of_customers > (InstanceGenerator.GRID_SIZE + 1) ** 2 - 1:
+            raise ValueError(f"Too many customers for the grid: {no_of_customers}")
+
+        rng = np.random.default_rng(seed)
+        depot = InstanceGenerator.get_depot(rng=rng, depot_position=depot_position)
+        used_points = {depot}
+        customers = InstanceGenerator.get_customers(rng=rng, no_of_customers=no_of_customers,
+                                                    customer_position=customer_position, used_points=used_points)
+        coordinates = np.array([depot] + customers, dtype=np.float64).reshape(-1, 2)
+        demand = InstanceGenerator.get_demand(rng=rng, coordinates=coordinates[1:],
+                                              demand_distribution=demand_distribution)
+        if route_size is None:
+            route_size = rng.triangular(3, 6, 25)
+        capacity = max(math.ceil(route_size * demand.sum() / max(no_of_customers, 1)), int(demand.max(initial=1)))
+        no_of_routes = math.ceil(demand.sum() / capacity)
+
+        return CVRPInstance(name=f"S-n{no_of_customers + 1}-k{no_of_routes}",
+                            dimension=no_of_customers + 1,
+                            capacity=capacity,
+                            edge_weight_type='EUC_2D',
+                            depot_ids=[0],
+                            coordinates=coordinates,
+                            demand=np.r_[0, demand].astype(np.int64))
+
+    @staticmethod
+    def get_depot(rng: np.random.Generator, depot_position: str) -> tuple[int, int]:
+        """Get the depot point
+
+        Args:
+            rng (np.random.Generator): The random generator
+            depot_position (str): The depot position type
+
+        Returns:
+            tuple[int, int]: The depot point
+        """
+        if depot_position == 'C':
+            return InstanceGenerator.GRID_SIZE // 2, InstanceGenerator.GRID_SIZE // 2
+        if depot_position == 'E':
+            return 0, 0
+        x, y = rng.integers(0, InstanceGenerator.GRID_SIZE + 1, size=2).tolist()
+        return x, y
+
+    @staticmethod
+    def get_customers(rng: np.random.Generator, no_of_customers: int, customer_position: str,
+                      used_points: set[tuple[int, int]]) -> list[tuple[int, int]]:
+        """Get the distinct customer points
+
+        Clustered customers start with 3 to 8 random seed customers. Further random points are accepted with
+        probability sum(exp(-d(point, seed) / CLUSTER_DECAY)) over the seeds, capped at 1.
+
+        Args:
+            rng (np.random.Generator): The random generator
+            no_of_customers (int): The number of customers
+            customer_position (str): The customer position type
+            used_points (set[tuple[int, int]]): The points already taken, updated with the customers
+
+        Returns:
+            list[tuple[int, int]]: The customer points
+        """
+        no_of_clustered = {'R': 0, 'C': no_of_customers, 'RC': no_of_customers // 2}[customer_position]
+        no_of_seeds = min(int(rng.integers(3, 9)), no_of_clustered)
+        customers = InstanceGenerator.get_points(rng=rng, no_of_points=no_of_seeds, used_points=used_points)
+        seeds = np.array(customers, dtype=np.float64).reshape(-1, 2)
+        customers += InstanceGenerator.get_points(rng=rng, no_of_points=no_of_clustered - no_of_seeds,
+                                                  used_points=used_points, seeds=seeds)
+        customers += InstanceGenerator.get_points(rng=rng, no_of_points=no_of_customers - no_of_clustered,
+                                                  used_points=used_points)
+        return customers
+
+    @staticmethod
+    def get_points(rng: np.random.Generator, no_of_points: int, used_points: set[tuple[int, int]],
+                   seeds: np.ndarray = None) -> list[tuple[int, int]]:
+        """Draw distinct random grid points in batches, accepted around the seeds if given
+
+        Args:
+            rng (np.random.Generator): The random generator
+            no_of_points (int): The number of points
+            used_points (set[tuple[int, int]]): The points already taken, updated with the new points
+            seeds (np.ndarray): The (k, 2) array of cluster seeds, None for uniform points
+
+        Returns:
+            list[tuple[int, int]]: The points
+        """
+        points = []
+        while len(points) < no_of_points:
+            batch_size = max(2 * (no_of_points - len(points)), 64)
+            candidates = rng.integers(0, InstanceGenerator.GRID_SIZE + 1, size=(batch_size, 2))
+            if seeds is not None and len(seeds):
+                distances = np.sqrt(((candidates[:, None, :] - seeds[None, :, :]) ** 2).sum(axis=2))
+                attractiveness = np.exp(-distances / InstanceGenerator.CLUSTER_DECAY).sum(axis=1)
+                candidates = candidates[rng.random(batch_size) < attractiveness]
+            for x, y in candidates.tolist():
+                if (x, y) not in used_points:
+                    used_points.add((x, y))
+                    points.append((x, y))
+                    if len(points) == no_of_points:
+                        break
+        return points
+
+    @staticmethod
+    def get_demand(rng: np.random.Generator, coordinates: np.ndarray, demand_distribution: str) -> np.ndarray:
+        """Draw the customer demands
+
+        Args:
+            rng (np.random.Generator): The random generator
+            coordinates (np.ndarray): The (n, 2) array of customer points
+            demand_distribution (str): The demand distribution type
+
+        Returns:
+            np.ndarray: The demands
+        """
+        no_of_customers = len(coordinates)
+        if demand_distribution == 'U':
+            return np.ones(no_of_customers, dtype=np.int64)
+        if demand_distribution in InstanceGenerator.DEMAND_RANGES:
+            low, high = InstanceGenerator.DEMAND_RANGES[demand_distribution]
+            return rng.integers(low, high + 1, size=no_of_customers)
+        if demand_distribution == 'Q':
+            half = InstanceGenerator.GRID_SIZE / 2
+            same_side = (coordinates[:, 0] >= half) == (coordinates[:, 1] >= half)
+            return np.where(same_side, rng.integers(1, 51, size=no_of_customers),
+                            rng.integers(51, 101, size=no_of_customers))
+        small = rng.random(no_of_customers) < rng.uniform(0.7, 0.95)
+        return np.where(small, rng.integers(1, 11, size=no_of_customers),
+                        rng.integers(50, 101, size=no_of_customers))
+
+    @staticmethod
+    def write(instance: CVRPInstance, path: str) -> None:
+        """Write an instance as a CVRPLIB file, node 0 is written as the depot
+
+        Args:
+            instance (CVRPInstance): The instance
+            path (str): The path of the instance file
+        """
+        lines = [f"NAME : \t{instance.name}\t",
+                 f"COMMENT : \t\"Generated by InstanceGenerator\"\t",
+                 "TYPE : \tCVRP\t",
+                 f"DIMENSION : \t{instance.dimension}\t",
+                 f"EDGE_WEIGHT_TYPE : \t{instance.edge_weight_type}\t",
+                 f"CAPACITY : \t{instance.capacity}\t",
+                 "NODE_COORD_SECTION\t\t"]
+        lines += [f"{node_id + 1}\t{x:g}\t{y:g}" for node_id, (x, y) in enumerate(instance.coordinates.tolist())]
+        lines.append("DEMAND_SECTION\t\t")
+        lines += [f"{node_id + 1}\t{demand}\t" for node_id, demand in enumerate(instance.demand.tolist())]
+        lines += ["DEPOT_SECTION\t\t", "\t1\t", "\t-1\t", "EOF\t\t"]
+        with open(path, 'w') as file:
+            file.write("\n".join(lines) + "\n")
@@ -0,0 +1,104 @@
+import numpy as np
+
+from src.models.cvrp_instance import CVRPInstance
+
+
+class InstanceParser:
+    SECTIONS = ('NODE_COORD_SECTION', 'DEMAND_SECTION', 'DEPOT_SECTION')
+    # The distances are Euclidean distances of the node coordinates
+    EDGE_WEIGHT_TYPES = ('EUC_2D',)
+
+    @staticmethod
+    def parse(path: str) -> CVRPInstance:
+        """Parse a TSPLIB/CVRPLIB instance file in a single pass
+
+        The specification headers are read as they come, the data sections are collected as text
+        and converted to arrays at once. Node ids in the file are 1-based, the depot is moved to row 0.
+        The rows of other sections, e.g. EDGE_WEIGHT_SECTION, are skipped.
+
+        Args:
+            path (str): The path of the instance file
+
+        Raises:
+            ValueError: If the DIMENSION header or a coordinate or demand section is missing, the node ids of a
+                section are not exactly 1..DIMENSION, or the edge weight type is not supported
+
+        Returns:
+            CVRPInstance: The parsed instance
+        """
+        headers = {}
+        sections = {section: [] for section in InstanceParser.SECTIONS}
+        current_section = None
+
+        with open(path) as file:
+            for line in file:
+                stripped = line.strip()
+                if not stripped:
+                    continue
+                keyword = stripped.split(maxsplit=1)[0].rstrip(':')
+                if keyword in sections:
+                    current_section = keyword
+                elif keyword.endswith('_SECTION'):
+                    current_section = None
+                elif keyword == 'EOF':
+                    break
+                elif current_section and (stripped[0].isdigit() or stripped[0] in '-+.'):
+                    sections[current_section].append(stripped)
+                elif ':' in stripped:
+                    current_section = None
+                    key, value = stripped.split(':', maxsplit=1)
+                    headers[key.strip()] = value.strip().strip('"').strip()
+
+        if 'DIMENSION' not in headers:
+            raise ValueError(f"{path}: missing DIMENSION header")
+        edge_weight_type = headers.get('EDGE_WEIGHT_TYPE')
+        if edge_weight_type is not None and edge_weight_type not in InstanceParser.EDGE_WEIGHT_TYPES:
+            raise ValueError(f"{path}: unsupported EDGE_WEIGHT_TYPE {edge_weight_type}, "
+                             f"supported: {', '.join(InstanceParser.EDGE_WEIGHT_TYPES)}")
+        dimension = int(headers['DIMENSION'])
+        coordinates = InstanceParser.get_section_array(lines=sections['NODE_COORD_SECTION'], columns=3,
+                                                       dimension=dimension, section='NODE_COORD_SECTION')
+        demand = InstanceParser.get_section_array(lines=sections['DEMAND_SECTION'], columns=2, dimension=dimension,
+                                                  section='DEMAND_SECTION')
+        depot_ids = [int(token) - 1 for token in ' '.join(sections['DEPOT_SECTION']).split() if int(token) >= 0]
+        if not depot_ids:
+            depot_ids = [0]
+        order = np.r_[depot_ids[0], np.delete(np.arange(dimension), depot_ids[0])]
+
+        return CVRPInstance(name=headers.get('NAME'),
+                            dimension=dimension,
+                            capacity=int(headers['CAPACITY']) if 'CAPACITY' in headers else None,
+                            edge_weight_type=edge_weight_type,
+                            depot_ids=depot_ids,
+                            coordinates=coordinates[order],
+                            demand=demand[order, 0].astype(np.int64))
+
+    @staticmethod
+    def get_section_array(lines: list[str], columns: int, dimension: int, section: str) -> np.ndarray:
+        """Convert the lines of an "id value..." section to an array ordered by node id
+
+        Args:
+            lines (list[str]): The section lines
+            columns (int): The number of columns of a line, the id included
+            dimension (int): The number of nodes
+            section (str): The section name, for the error messages
+
+        Raises:
+            ValueError: If the section is missing, a line has the wrong number of values or the node ids are not
+                exactly 1..dimension
+
+        Returns:
+            np.ndarray: The (dimension, columns - 1) array of values
+        """
+        if not lines:
+            raise ValueError(f"Missing {section}")
+        rows = [line.split() for line in lines]
+        if any(len(row) != columns for row in rows):
+            raise ValueError(f"{section}: every line must hold {columns} values")
+        table = np.array(rows, dtype=np.float64)
+        ids = table[:, 0].astype(np.intp)
+        if len(ids) != dimension or not np.array_equal(np.sort(ids), np.arange(1, dimension + 1)):
+            raise ValueError(f"{section}: the node ids must be 1..{dimension}, each exactly once")
+        values = np.empty((dimension, columns - 1), dtype=np.float64)
+        values[ids - 1] = table[:, 1:]
+        return values
@@ -4,12 +4,16 @@ from src.data.data_preparation import DataPreparation
 class Output:
     @staticmethod
     def prepare_output(data: DataPreparation,
-                       elapsed_time: float) -> dict:
+                       elapsed_time: float,
+                       profile: dict = None,
+                       time_limit_reached: bool = False) -> dict:
         """Prepare the output
 
         Args:
             data (DataPreparation): The data preparation object
             elapsed_time (float): The elapsed time for the algorithm
+            profile (dict): The numeric profile of the solve stages (see Profiler.get_summary), None to leave it out
+            time_limit_reached (bool): Whether the time limit cut the improvement stages short
 
         Returns:
             output (dict): The output with the following keys:
@@ -19,27 +23,32 @@ class Output:
                 minimum_required_vehicles (int): The minimum required vehicles
                 unused_vehicles (int): The number of unused vehicles
                 elapsed_time (float): The elapsed time for the algorithm
+                time_limit_reached (bool): Whether the time limit cut the improvement stages short
                 routes (list[dict]): The list of routes with the following keys:
                     vehicle_id (int): The id of the vehicle
                     route_distance (float): The distance of the route
                     fulfillment_rate (str): The fulfillment rate of the route
                     route_sequence (list[Node]): The list of node ids in the route
+                profile (dict): The profile of the solve stages, if given
         """
-        total_distance = round(sum([vehicle.route_distance for vehicle in data.vehicles]), 2)
+        total_distance = round(float(sum([vehicle.route_distance for vehicle in data.vehicles])), 2)
         output = {"total_distance": total_distance,
                   "unassigned_pickups": data.unassigned_pickups,
                   "unassigned_deliveries": data.unassigned_deliveries,
                   "minimum_required_vehicles": data.minimum_required_vehicles,
                   "unused_vehicles": data.unused_vehicles,
                   "elapsed_time": f"{round(elapsed_time, 2)} seconds",
+                  "time_limit_reached": time_limit_reached,
                   "routes": []}
 
         for vehicle in data.vehicles:
             route = {"vehicle_id": vehicle.id,
-                     "route_distance": vehicle.route_distance,
+                     "route_distance": float(vehicle.route_distance),
                      "capacity_utilization_rate": f"{round(vehicle.fulfillment_rate, 2)} %",
                      "number_of_nodes_visited": len(vehicle.route),
                      "route": vehicle.route_sequence}
             output["routes"].append(route)
+        if profile is not None:
+            output["profile"] = profile
 
         return output
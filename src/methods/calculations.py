@@ -4,6 +4,8 @@ from math import sqrt, atan2, degrees
 from src.models.node import Node
 from src.models.benefit import Benefit
 from src.models.cluster import Cluster
+from src.models.benefit_table import BenefitTable
+from src.methods.distance_matrix import DistanceMatrix
 
 
 class Calculations:
@@ -21,25 +23,21 @@ class Calculations:
         return sqrt((node_1.location.lat - node_2.location.lat) ** 2 + (node_1.location.lon - node_2.location.lon) ** 2)
 
     @staticmethod
-    def create_distance_matrix(nodes: list[Node]) -> np.ndarray:
+    def create_distance_matrix(nodes: list[Node],
+                               dtype: np.dtype = np.float64,
+                               round_to_int: bool = False) -> np.ndarray:
         """Create a distance matrix for the nodes
 
          Args:
             nodes (list[Node]): The list of nodes
+            dtype (np.dtype): The dtype of the distance matrix, float64 or float32
+            round_to_int (bool): Round the distances to the nearest integer (TSPLIB EUC_2D convention)
 
          Returns:
              np.ndarray: The distance matrix
          """
-        distance_matrix = np.zeros((len(nodes), len(nodes)))
-        for row_index in range(len(nodes)):
-            for column_index in range(len(nodes)):
-                if row_index == column_index:
-                    distance_matrix[row_index][column_index] = 0
-                    continue
-                distance = Calculations.calculate_distance(node_1=nodes[row_index], node_2=nodes[column_index])
-                distance_matrix[row_index][column_index] = distance
-                distance_matrix[column_index][row_index] = distance
-        return distance_matrix
+        coordinates = DistanceMatrix.get_coordinates(nodes=nodes)
+        return DistanceMatrix.create(coordinates=coordinates, dtype=dtype, round_to_int=round_to_int)
 
     @staticmethod
     def calculate_polar_angle(depot: Node, node: Node) -> float:
@@ -146,6 +144,65 @@ class Calculations:
                                                                            candidate_node=node)))
         return neighbors
 
+    @staticmethod
+    def calculate_benefit_table(clusters: dict[int, Cluster],
+                                nodes: list[Node],
+                                distance_matrix: np.ndarray,
+                                depot: Node,
+                                use_n_n: bool,
+                                seed_k: int = None,
+                                coordinates: np.ndarray = None) -> BenefitTable:
+        """Calculate the benefits of all nodes for all clusters as one array
+
+        The values are the same as calculate_nearest_neighbors_benefits (use_n_n) or calculate_savings_benefits,
+        gathered from the distance matrix with fancy indexing instead of one Benefit per pair.
+
+        Args:
+            clusters (dict[int, Cluster]): The dictionary of clusters
+            nodes (list[Node]): The list of nodes
+            distance_matrix (np.ndarray): The distance matrix
+            depot (Node): The depot node
+            use_n_n (bool): The nearest neighbor flag
+            seed_k (int): Only score the seed_k clusters with the nearest seed nodes of each node, see
+                CandidateBenefitTable. None, or at least the number of clusters, scores all clusters
+            coordinates (np.ndarray): The coordinates of all nodes indexed by node id, see NodeTable, the seed_k
+                candidates are found from them. None to collect them from the nodes
+
+        Returns:
+            BenefitTable: The benefit table with one row per node and one column per cluster
+        """
+        node_ids = [node.id for node in nodes]
+        seed_ids = [cluster.seed_node.id for cluster in clusters.values()]
+        if seed_k is not None and seed_k < len(seed_ids):
+            from src.methods.spatial_index import CandidateBenefitTable
+            if coordinates is None:
+                node_coordinates = DistanceMatrix.get_coordinates(nodes=nodes)
+                seed_coordinates = DistanceMatrix.get_coordinates(nodes=[cluster.seed_node
+                                                                         for cluster in clusters.values()])
+            else:
+                node_coordinates, seed_coordinates = coordinates[node_ids], coordinates[seed_ids]
+            return CandidateBenefitTable(node_ids=node_ids,
+                                         cluster_nos=[cluster.cluster_no for cluster in clusters.values()],
+                                         node_coordinates=node_coordinates,
+                                         seed_ids=seed_ids,
+                                         seed_coordinates=seed_coordinates,
+                                         distance_matrix=distance_matrix, depot_id=depot.id, ascending=use_n_n,
+                                         seed_k=seed_k)
+        seed_distances = DistanceMatrix.get_submatrix(distance_matrix=distance_matrix, row_ids=seed_ids,
+                                                      column_ids=node_ids).T
+        if use_n_n:
+            values = seed_distances
+        else:
+            seed_to_depot = DistanceMatrix.get_submatrix(distance_matrix=distance_matrix, row_ids=seed_ids,
+                                                         column_ids=[depot.id])[:, 0]
+            depot_to_node = DistanceMatrix.get_submatrix(distance_matrix=distance_matrix, row_ids=[depot.id],
+                                                         column_ids=node_ids)[0]
+            values = seed_to_depot[np.newaxis, :] + depot_to_node[:, np.newaxis] - seed_distances
+        return BenefitTable(node_ids=node_ids,
+                            cluster_nos=[cluster.cluster_no for cluster in clusters.values()],
+                            values=values.reshape(len(node_ids), len(seed_ids)),
+                            ascending=use_n_n)
+
     @staticmethod
     def calculate_route_distance(nodes: list[Node], distance_matrix: np.ndarray) -> int:
         """Calculate the total distance of a route
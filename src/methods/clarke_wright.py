@@ -0,0 +1,200 @@
+import heapq
+
+import numpy as np
+
+from src.models.node import Node
+from src.models.cluster import Cluster
+from src.utils.sorting import Sorting
+from src.methods.clustering import Clustering
+from src.methods.distance_matrix import DistanceMatrix
+
+
+class ClarkeWright:
+    """The Clarke and Wright (1964) savings constructor.
+
+    Every delivery starts on its own route. Two routes are merged by linking an end node i of one to an end node j
+    of the other, which saves s(i, j) = d(0, i) + d(0, j) - d(i, j). Savings are only computed for the pairs of
+    each node with its neighbor_k nearest nodes and are merged from a heap, best first, while the merged load fits
+    the capacity. A union-find of the routes finds the route of a node, and a node is an end node while it has
+    fewer than two route neighbors, so a merge never copies or reverses a route."""
+
+    @staticmethod
+    def get_savings(distance_matrix, node_ids: list[int], depot_id: int,
+                    neighbor_k: int) -> list[tuple[float, int, int]]:
+        """Get the positive savings of every node with its neighbor_k nearest nodes as a heap
+
+        Args:
+            distance_matrix (np.ndarray | DistanceProvider): The distance matrix
+            node_ids (list[int]): The node ids
+            depot_id (int): The depot node id
+            neighbor_k (int): The number of nearest nodes paired with each node
+
+        Returns:
+            list[tuple[float, int, int]]: The heap of (-saving, i, j) with i < j, the best saving first
+        """
+        neighbor_lists = DistanceMatrix.get_neighbor_lists(distance_matrix=distance_matrix, node_ids=node_ids,
+                                                           neighbor_k=neighbor_k)
+        pairs = {(min(i, j), max(i, j)) for i, neighbors in neighbor_lists.items() for j in neighbors}
+        if not pairs:
+            return []
+        pairs = np.array(sorted(pairs), dtype=np.intp)
+        depot_distances = np.zeros(max(node_ids) + 1)
+        depot_distances[node_ids] = DistanceMatrix.get_submatrix(distance_matrix=distance_matrix, row_ids=[depot_id],
+                                                                 column_ids=node_ids)[0]
+        pair_distances = DistanceMatrix.get_pair_distances(distance_matrix=distance_matrix, row_ids=pairs[:, 0],
+                                                           column_ids=pairs[:, 1])
+        savings = depot_distances[pairs[:, 0]] + depot_distances[pairs[:, 1]] - pair_distances
+        positive = savings > 0
+        heap = list(zip((-savings[positive]).tolist(), pairs[positive, 0].tolist(), pairs[positive, 1].tolist()))
+        heapq.heapify(heap)
+        return heap
+
+    @staticmethod
+    def find(parents: dict[int, int], node_id: int) -> int:
+        """Find the route of a node, halving the path on the way
+
+        Args:
+            parents (dict[int, int]): The union-find parent of each node id
+            node_id (int): The node id
+
+        Returns:
+            int: The node id that represents the route
+        """
+        while parents[node_id] != node_id:
+            parents[node_id] = parents[parents[node_id]]
+            node_id = parents[node_id]
+        return node_id
+
+    @staticmethod
+    def build_routes(nodes: list[Node], distance_matrix, depot: Node, capacity: int,
+                     neighbor_k: int = 20) -> list[list[Node]]:
+        """Build routes by merging the routes of the nodes in savings order
+
+        Args:
+            nodes (list[Node]): The list of nodes
+            distance_matrix (np.ndarray | DistanceProvider): The distance matrix
+            depot (Node): The depot node
+            capacity (int): The capacity of the vehicles
+            neighbor_k (int): The number of nearest nodes paired with each node
+
+        Returns:
+            list[list[Node]]: The routes, in the order of their first end node in nodes
+        """
+        node_by_id = {node.id: node for node in nodes}
+        parents = {node.id: node.id for node in nodes}
+        sizes = {node.id: 1 for node in nodes}
+        loads = {node.id: node.demand for node in nodes}
+        links = {node.id: [] for node in nodes}
+        heap = ClarkeWright.get_savings(distance_matrix=distance_matrix, node_ids=list(node_by_id), depot_id=depot.id,
+                                        neighbor_k=neighbor_k)
+
+        while heap:
+            _, i, j = heapq.heappop(heap)
+            if len(links[i]) == 2 or len(links[j]) == 2:
+                continue
+            route_i, route_j = ClarkeWright.find(parents=parents, node_id=i), ClarkeWright.find(parents=parents,
+                                                                                                node_id=j)
+            if route_i == route_j or loads[route_i] + loads[route_j] > capacity:
+                continue
+            if sizes[route_i] < sizes[route_j]:
+                route_i, route_j = route_j, route_i
+            parents[route_j] = route_i
+            sizes[route_i] += sizes[route_j]
+            loads[route_i] += loads[route_j]
+            links[i].append(j)
+            links[j].append(i)
+
+        routes, visited = [], set()
+        for node in nodes:
+            # Walk every route once, from the first of its end nodes
+            if node.id in visited or len(links[node.id]) == 2:
+                continue
+            route, previous_id, current_id = [], None, node.id
+            while current_id is not None:
+                route.append(node_by_id[current_id])
+                visited.add(current_id)
+                next_ids = [link for link in links[current_id] if link != previous_id]
+                previous_id, current_id = current_id, next_ids[0] if next_ids else None
+            routes.append(route)
+        return routes
+
+    @staticmethod
+    def create_clusters(nodes: list[Node], distance_matrix, depot: Node, capacity: int, no_of_vehicles: int,
+                        neighbor_k: int = 20) -> tuple[dict[int, Cluster], list[Node]]:
+        """Build the Clarke-Wright routes as clusters, one per vehicle. If there are more routes than vehicles, the
+        routes with the highest loads are kept and the nodes of the others are inserted into the kept routes where
+        they fit, see insert_nodes, the nodes that fit nowhere are left unassigned
+
+        Args:
+            nodes (list[Node]): The list of nodes
+            distance_matrix (np.ndarray | DistanceProvider): The distance matrix
+            depot (Node): The depot node
+            capacity (int): The capacity of the vehicles
+            no_of_vehicles (int): The number of vehicles
+            neighbor_k (int): The number of nearest nodes paired with each node
+
+        Returns:
+            tuple[dict[int, Cluster], list[Node]]: The dictionary of clusters and the unassigned nodes
+        """
+        routes = ClarkeWright.build_routes(nodes=nodes, distance_matrix=distance_matrix, depot=depot,
+                                           capacity=capacity, neighbor_k=neighbor_k)
+        ranked = sorted(range(len(routes)), key=lambda index: -sum(node.demand for node in routes[index]))
+        kept = sorted(ranked[:no_of_vehicles])
+        clusters = {}
+        for cluster_no, index in enumerate(kept, start=1):
+            seed_node = Clustering.set_seed_node(nodes=routes[index])
+            clusters[cluster_no] = Cluster(cluster_no=cluster_no, seed_node=seed_node, nodes=routes[index],
+                                           capacity=capacity)
+        leftover_nodes = [node for index in ranked[no_of_vehicles:] for node in routes[index]]
+        unassigned_nodes = ClarkeWright.insert_nodes(
+            clusters=clusters, nodes=Sorting.get_sorted_nodes_by_descending_demand(nodes=leftover_nodes),
+            distance_matrix=distance_matrix, depot=depot)
+        return clusters, unassigned_nodes
+
+    @staticmethod
+    def insert_nodes(clusters: dict[int, Cluster], nodes: list[Node], distance_matrix, depot: Node) -> list[Node]:
+        """Insert each node, in the given order, at the cheapest position of any cluster route that still fits its
+        demand. The detour of a node p on the edge (a, b) of a route, the depot legs included, is
+        d(a, p) + d(p, b) - d(a, b), and the detours of all positions of a route are evaluated at once
+
+        Args:
+            clusters (dict[int, Cluster]): The dictionary of clusters
+            nodes (list[Node]): The list of nodes in insertion order
+            distance_matrix (np.ndarray | DistanceProvider): The distance matrix
+            depot (Node): The depot node
+
+        Returns:
+            list[Node]: The list of unassigned nodes
+        """
+        cluster_list = list(clusters.values())
+        route_ids = [np.asarray([depot.id] + [node.id for node in cluster.nodes] + [depot.id], dtype=np.intp)
+                     for cluster in cluster_list]
+        edge_distances = [DistanceMatrix.get_pair_distances(distance_matrix=distance_matrix, row_ids=ids[:-1],
+                                                            column_ids=ids[1:]) for ids in route_ids]
+        unassigned_nodes = []
+
+        for node in nodes:
+            fitting = [index for index, cluster in enumerate(cluster_list) if cluster.remaining_capacity >= node.demand]
+            if not fitting:
+                unassigned_nodes.append(node)
+                continue
+            distances = DistanceMatrix.get_submatrix(distance_matrix=distance_matrix, row_ids=[node.id],
+                                                     column_ids=np.concatenate([route_ids[index]
+                                                                                for index in fitting]))[0]
+            best_detour, best_index, best_position, offset = np.inf, None, None, 0
+            for index in fitting:
+                route_distances = distances[offset:offset + len(route_ids[index])]
+                detours = route_distances[:-1] + route_distances[1:] - edge_distances[index]
+                position = int(np.argmin(detours))
+                if detours[position] < best_detour:
+                    best_detour, best_index, best_position = detours[position], index, position
+                offset += len(route_ids[index])
+            cluster = cluster_list[best_index]
+            cluster.nodes.insert(best_position, node)
+            cluster.remaining_capacity -= node.demand
+            cluster.total_demand += node.demand
+            route_ids[best_index] = np.insert(route_ids[best_index], best_position + 1, node.id)
+            edge_distances[best_index] = DistanceMatrix.get_pair_distances(
+                distance_matrix=distance_matrix, row_ids=route_ids[best_index][:-1],
+                column_ids=route_ids[best_index][1:])
+        return unassigned_nodes
@@ -1,12 +1,22 @@
 import math
-from copy import deepcopy
+import heapq
+import bisect
+import random
+
+import numpy as np
 
 from src.models.cluster import Cluster
 from src.utils.sorting import Sorting
 from src.models.node import Node
+from src.models.benefit_table import BenefitTable
+from src.models.route_loads import RouteLoads
+from src.methods.distance_matrix import DistanceMatrix
 
 
 class Clustering:
+    # The number of highest demand nodes a randomized seed node is chosen from
+    SEED_CANDIDATES = 3
+
     @staticmethod
     def get_interval(nodes: list[Node], no_of_vehicles: int) -> int:
         """Calculate the interval for the initial clusters
@@ -34,16 +44,21 @@ class Clustering:
         return [nodes[x:x + interval] for x in range(0, len(nodes), interval)]
 
     @staticmethod
-    def set_seed_node(nodes: list[Node]) -> Node:
+    def set_seed_node(nodes: list[Node], rng: random.Random = None) -> Node:
         """Set the seed node for a cluster
 
         Args:
             nodes (list[Node]): The list of nodes
+            rng (random.Random): If given, choose the seed node at random among the SEED_CANDIDATES nodes with
+                the highest demand instead of the first one
 
         Returns:
              Node: The seed node
         """
-        return Sorting.get_sorted_nodes_by_descending_demand(nodes=deepcopy(nodes))[0]
+        nodes_sorted_by_demand = Sorting.get_sorted_nodes_by_descending_demand(nodes=nodes)
+        if rng is not None:
+            return rng.choice(nodes_sorted_by_demand[:Clustering.SEED_CANDIDATES])
+        return nodes_sorted_by_demand[0]
 
     @staticmethod
     def delete_cluster_nodes(clusters: dict[int, Cluster]) -> None:
@@ -61,110 +76,561 @@ class Clustering:
     @staticmethod
     def initiate_clusters(nodes: list[Node],
                           no_of_vehicles: int,
-                          capacity: int) -> tuple[dict[int, Cluster], list[Node]]:
+                          capacity: int,
+                          start_angle: float = 0,
+                          rng: random.Random = None) -> tuple[dict[int, Cluster], list[Node]]:
         """Initiate the clusters
 
         Args:
             nodes (list[Node]): The list of nodes
             no_of_vehicles (int): The number of vehicles
             capacity (int): The capacity of the vehicles
+            start_angle (float): The polar angle the sweep starts at
+            rng (random.Random): The random generator of a randomized seed node choice, None for the first node
 
         Returns:
              tuple[dict[int, Cluster], list[Node]]: The dictionary of clusters and the remaining nodes
         """
         clusters = {}
-        nodes_sorted_by_polar_angle = Sorting.get_sorted_nodes_by_polar_angle(nodes=deepcopy(nodes))
+        seed_node_ids = set()
+        nodes_sorted_by_polar_angle = Sorting.get_sorted_nodes_by_polar_angle(nodes=nodes, start_angle=start_angle)
         interval = Clustering.get_interval(nodes=nodes_sorted_by_polar_angle, no_of_vehicles=no_of_vehicles)
         initial_clusters = Clustering.get_initial_clusters(nodes=nodes_sorted_by_polar_angle, interval=interval)
 
         for index, cluster in enumerate(initial_clusters):
-            seed_node = Clustering.set_seed_node(nodes=cluster)
+            seed_node = Clustering.set_seed_node(nodes=cluster, rng=rng)
             clusters.update({index + 1: (Cluster(cluster_no=index + 1,
                                                  seed_node=seed_node,
                                                  nodes=[seed_node],
                                                  capacity=capacity))})
-            nodes_sorted_by_polar_angle.remove(seed_node)
-        return clusters, nodes_sorted_by_polar_angle
+            seed_node_ids.add(seed_node.id)
+        return clusters, [node for node in nodes_sorted_by_polar_angle if node.id not in seed_node_ids]
+
+    @staticmethod
+    def get_ranked_cluster_nos(benefits: dict | BenefitTable, node: Node, use_n_n: bool) -> list[int]:
+        """Get the cluster numbers of a node from the best to the worst benefit
+
+        Args:
+            benefits (dict | BenefitTable): The benefit table or the dictionary of benefits
+            node (Node): The node
+            use_n_n (bool): The nearest neighbor flag, ranks a benefit dictionary ascending if set
+
+        Returns:
+            list[int]: The ranked cluster numbers
+        """
+        if isinstance(benefits, BenefitTable):
+            return benefits.get_ranked_cluster_nos(node_id=node.id)
+        if use_n_n:
+            sorted_benefits = Sorting.get_sorted_clusters_by_ascending_benefit_distances(
+                benefit=benefits["node_ids"][node.id])
+        else:
+            sorted_benefits = Sorting.get_sorted_clusters_by_descending_benefit_distances(
+                benefit=benefits["node_ids"][node.id])
+        return [benefit.cluster_no for benefit in sorted_benefits]
+
+    @staticmethod
+    def add_node_to_cluster(cluster: Cluster, node: Node, use_polar_angle: bool) -> None:
+        """Add a node to a cluster, before the seed node if it has a smaller polar angle and use_polar_angle is set
+
+        Args:
+            cluster (Cluster): The cluster
+            node (Node): The node
+            use_polar_angle (bool): The polar angle flag
+        """
+        if use_polar_angle and cluster.seed_node.polar_angle > node.polar_angle:
+            cluster.nodes.insert(0, node)
+        else:
+            cluster.nodes.append(node)
+        cluster.remaining_capacity -= node.demand
+        cluster.total_demand += node.demand
 
     @staticmethod
-    def finalize_clusters(clusters: dict[int, Cluster], nodes: list[Node], benefits: dict, use_n_n: bool,
-                          use_polar_angle: bool) -> list[Node]:
+    def finalize_clusters(clusters: dict[int, Cluster], nodes: list[Node], benefits: dict | BenefitTable,
+                          use_n_n: bool, use_polar_angle: bool, rng: random.Random = None,
+                          regret_k: int = None) -> list[Node]:
         """Finalize the clusters
 
+        In descending demand order, each node joins the best cluster that still fits it, or the nodes are assigned
+        in regret order, see get_assignment.
+
         Args:
             clusters (dict[int, Cluster]): The dictionary of clusters
             nodes (list[Node]): The list of nodes
-            benefits (dict): The dictionary of benefits
+            benefits (dict | BenefitTable): The benefit table or the dictionary of benefits
             use_n_n (bool): The nearest neighbor flag
             use_polar_angle (bool): The polar angle flag
+            rng (random.Random): If given, nodes of equal demand are assigned in random order
+            regret_k (int): Assign the nodes in regret order, see get_regret_assignment. Needs a benefit table
 
         Returns:
              list[Node]: The list of unassigned nodes
         """
-        assigned_nodes = []
-        nodes_sorted_by_demand = Sorting.get_sorted_nodes_by_descending_demand(nodes=deepcopy(nodes))
+        assigned_node_ids = set()
+        if rng is not None:
+            nodes = list(nodes)
+            rng.shuffle(nodes)
+        nodes_sorted_by_demand = Sorting.get_sorted_nodes_by_descending_demand(nodes=nodes)
+
+        if isinstance(benefits, BenefitTable):
+            ranked_clusters = [clusters[cluster_no] for cluster_no in benefits.cluster_nos]
+            remaining_capacities = np.array([cluster.remaining_capacity for cluster in ranked_clusters])
+            for index, column in Clustering.get_assignment(nodes=nodes_sorted_by_demand, benefits=benefits,
+                                                           remaining_capacities=remaining_capacities,
+                                                           regret_k=regret_k):
+                Clustering.add_node_to_cluster(cluster=ranked_clusters[column], node=nodes_sorted_by_demand[index],
+                                               use_polar_angle=use_polar_angle)
+                assigned_node_ids.add(nodes_sorted_by_demand[index].id)
+        elif regret_k is not None:
+            raise TypeError("The regret assignment needs a BenefitTable")
+        else:
+            for node in nodes_sorted_by_demand:
+                for cluster_no in Clustering.get_ranked_cluster_nos(benefits=benefits, node=node, use_n_n=use_n_n):
+                    cluster = clusters[cluster_no]
+                    if cluster.remaining_capacity >= node.demand:
+                        Clustering.add_node_to_cluster(cluster=cluster, node=node, use_polar_angle=use_polar_angle)
+                        assigned_node_ids.add(node.id)
+                        break
+
+        unassigned_nodes = [node for node in nodes_sorted_by_demand if node.id not in assigned_node_ids]
+        return unassigned_nodes
 
-        for node in nodes_sorted_by_demand:
-            if use_n_n:
-                sorted_benefits = Sorting.get_sorted_clusters_by_ascending_benefit_distances(
-                    benefit=benefits["node_ids"][node.id])
-            else:
-                sorted_benefits = Sorting.get_sorted_clusters_by_descending_benefit_distances(
-                    benefit=benefits["node_ids"][node.id])
-
-            for benefit in sorted_benefits:
-                cluster = clusters[benefit.cluster_no]
-
-                if cluster.remaining_capacity >= node.demand:
-                    if use_polar_angle:
-                        if cluster.seed_node.polar_angle > node.polar_angle:
-                            cluster.nodes.insert(0, node)
-                        else:
-                            cluster.nodes.append(node)
-                    else:
-                        cluster.nodes.append(node)
-                    cluster.remaining_capacity -= node.demand
-                    cluster.total_demand += node.demand
-                    assigned_nodes.append(node)
+    @staticmethod
+    def get_assignment(nodes: list[Node], benefits: BenefitTable, remaining_capacities: np.ndarray,
+                       regret_k: int = None, complete: bool = False) -> list[tuple[int, int]]:
+        """Assign the nodes to the cluster columns of a benefit table, in the order of the nodes or in regret order.
+        The regret order is kept unless it leaves nodes out that the order of the nodes assigns
+
+        Args:
+            nodes (list[Node]): The list of nodes
+            benefits (BenefitTable): The benefit table
+            remaining_capacities (np.ndarray): The remaining capacity of each cluster column, updated in place.
+                A negative capacity keeps every node out of a column
+            regret_k (int): The rank of the cluster the best one is compared with, None for the order of the nodes
+            complete (bool): Stop at the first node that does not fit when only a complete assignment is of use
+
+        Returns:
+            list[tuple[int, int]]: The index of each assigned node and its cluster column, in assignment order
+        """
+        if regret_k is None:
+            return Clustering.get_first_fit_assignment(nodes=nodes, benefits=benefits,
+                                                       remaining_capacities=remaining_capacities, complete=complete)
+        regret_capacities = remaining_capacities.copy()
+        assignment = Clustering.get_regret_assignment(nodes=nodes, benefits=benefits,
+                                                      remaining_capacities=regret_capacities, regret_k=regret_k)
+        if len(assignment) < len(nodes):
+            first_fit_capacities = remaining_capacities.copy()
+            first_fit_assignment = Clustering.get_first_fit_assignment(nodes=nodes, benefits=benefits,
+                                                                       remaining_capacities=first_fit_capacities,
+                                                                       complete=complete)
+            if len(first_fit_assignment) > len(assignment):
+                assignment, regret_capacities = first_fit_assignment, first_fit_capacities
+        remaining_capacities[:] = regret_capacities
+        return assignment
+
+    @staticmethod
+    def get_first_fit_assignment(nodes: list[Node], benefits: BenefitTable, remaining_capacities: np.ndarray,
+                                 complete: bool = False) -> list[tuple[int, int]]:
+        """Assign each node, in the order of the nodes, to the best cluster column that still fits it
+
+        Args:
+            nodes (list[Node]): The list of nodes
+            benefits (BenefitTable): The benefit table
+            remaining_capacities (np.ndarray): The remaining capacity of each cluster column, updated in place
+            complete (bool): Stop at the first node that does not fit
+
+        Returns:
+            list[tuple[int, int]]: The index of each assigned node and its cluster column, in assignment order
+        """
+        assignment = []
+        for index, node in enumerate(nodes):
+            column = Clustering.get_first_fit(benefits=benefits, row=benefits.rows[node.id],
+                                              remaining_capacities=remaining_capacities, demand=node.demand)
+            if column is None:
+                if complete:
                     break
+                continue
+            remaining_capacities[column] -= node.demand
+            assignment.append((index, column))
+        return assignment
 
-        unassigned_nodes = list(filter(lambda i: i not in assigned_nodes, nodes_sorted_by_demand))
-        return unassigned_nodes
+    @staticmethod
+    def get_first_fit(benefits: BenefitTable, row: int, remaining_capacities: np.ndarray, demand: int) -> int | None:
+        """Get the best cluster that still fits a node, with one mask over the ranked remaining capacities.
+        A partial benefit table only scores all clusters when none of its candidates fits
+
+        Args:
+            benefits (BenefitTable): The benefit table
+            row (int): The row of the node
+            remaining_capacities (np.ndarray): The remaining capacity of each cluster column
+            demand (int): The demand of the node
+
+        Returns:
+            int | None: The cluster column, None if no cluster fits
+        """
+        columns = benefits.get_ranked_columns(row=row)
+        fits = remaining_capacities[columns] >= demand
+        if fits.any():
+            return int(columns[fits.argmax()])
+        if benefits.partial:
+            fits = remaining_capacities >= demand
+            if fits.any():
+                return int(np.where(fits, benefits.get_costs(row=row), np.inf).argmin())
+        return None
 
     @staticmethod
-    def add_pickups_to_clusters(clusters: dict[int, Cluster], nodes: list[Node], benefits: dict, use_n_n: bool) -> list[
-        Node]:
-        """Add pickups to the clusters
+    def get_regret_options(benefits: BenefitTable, row: int, remaining_capacities: np.ndarray, demand: int,
+                           regret_k: int) -> tuple[np.ndarray, float]:
+        """Get the best clusters that still fit a node and its regret. A partial benefit table ranks the candidates
+        that fit, and only scores all clusters when none of its candidates fits
+
+        Args:
+            benefits (BenefitTable): The benefit table
+            row (int): The row of the node
+            remaining_capacities (np.ndarray): The remaining capacity of each cluster column
+            demand (int): The demand of the node
+            regret_k (int): The rank of the cluster the best one is compared with
+
+        Returns:
+            tuple[np.ndarray, float]: The columns of the regret_k best clusters that fit, best first, and the benefit
+                difference between the best and the regret_k-th of them, infinite if fewer than regret_k fit
+        """
+        columns = benefits.get_ranked_columns(row=row)
+        positions = np.flatnonzero(remaining_capacities[columns] >= demand)[:regret_k]
+        if len(positions) == regret_k:
+            values = benefits.get_ranked_values(row=row)
+            return columns[positions], abs(float(values[positions[-1]] - values[positions[0]]))
+        if len(positions) or not benefits.partial:
+            return columns[positions], math.inf
+
+        columns = np.flatnonzero(remaining_capacities >= demand)
+        costs = benefits.get_costs(row=row)[columns]
+        order = np.lexsort((columns, costs))[:regret_k]
+        if len(order) < regret_k:
+            return columns[order], math.inf
+        return columns[order], float(costs[order[-1]] - costs[order[0]])
+
+    @staticmethod
+    def get_regret_assignment(nodes: list[Node], benefits: BenefitTable, remaining_capacities: np.ndarray,
+                              regret_k: int) -> list[tuple[int, int]]:
+        """Assign the nodes to the cluster columns of a benefit table in regret order
+
+        The node that loses the most by not joining its best cluster now is assigned first: a heap holds the nodes
+        keyed by their regret, the cost difference between their best and their regret_k-th best cluster that
+        still fits. Nodes with fewer than regret_k options come first, ties go to the higher demand and then to
+        the order of the nodes. Only the regret_k options of a node can change its key, so when a cluster fills up
+        only the nodes watching it get a new key; older heap entries of a node are skipped when popped.
+
+        Args:
+            nodes (list[Node]): The list of nodes
+            benefits (BenefitTable): The benefit table
+            remaining_capacities (np.ndarray): The remaining capacity of each cluster column, updated in place.
+                A negative capacity keeps every node out of a column
+            regret_k (int): The rank of the cluster the best one is compared with, at least 2
+
+        Returns:
+            list[tuple[int, int]]: The index of each assigned node and its cluster column, in assignment order
+        """
+        watchers = [set() for _ in benefits.cluster_nos]
+        options, versions = [()] * len(nodes), [0] * len(nodes)
+        heap = []
+
+        def update(index: int) -> None:
+            for column in options[index]:
+                watchers[column].discard(index)
+            options[index], regret = Clustering.get_regret_options(benefits=benefits,
+                                                                   row=benefits.rows[nodes[index].id],
+                                                                   remaining_capacities=remaining_capacities,
+                                                                   demand=nodes[index].demand, regret_k=regret_k)
+            versions[index] += 1
+            for column in options[index]:
+                watchers[column].add(index)
+            if len(options[index]):
+                heapq.heappush(heap, (-regret, -nodes[index].demand, index, versions[index]))
+
+        for index in range(len(nodes)):
+            update(index)
+
+        assignment = []
+        while heap:
+            _, _, index, version = heapq.heappop(heap)
+            if version != versions[index]:
+                continue
+            column = options[index][0]
+            remaining_capacities[column] -= nodes[index].demand
+            assignment.append((index, column))
+            versions[index] += 1
+            for option in options[index]:
+                watchers[option].discard(index)
+            for watcher in [watcher for watcher in watchers[column]
+                            if nodes[watcher].demand > remaining_capacities[column]]:
+                update(watcher)
+        return assignment
+
+    @staticmethod
+    def get_pickup_order(nodes: list[Node], benefits: dict | BenefitTable,
+                         use_n_n: bool) -> list[tuple[Node, list[int]]]:
+        """Get the pickups in descending best benefit order with their ranked cluster numbers
 
         Args:
-            clusters (dict[int, Cluster]): The dictionary of clusters
             nodes (list[Node]): The list of nodes
-            benefits (dict): The dictionary of benefits
+            benefits (dict | BenefitTable): The benefit table or the dictionary of benefits
             use_n_n (bool): The nearest neighbor flag
 
         Returns:
-             list[Node]: The list of unassigned nodes
+            list[tuple[Node, list[int]]]: The nodes and their cluster numbers from the best to the worst benefit
         """
-        assigned_nodes = []
         node_benefits_list = []
 
-        for node, benefit in zip(nodes, benefits["node_ids"].values()):
-            if use_n_n:
-                sorted_benefits = Sorting.get_sorted_clusters_by_ascending_benefit_distances(benefit=benefit)
-            else:
-                sorted_benefits = Sorting.get_sorted_clusters_by_descending_benefit_distances(benefit=benefit)
+        if isinstance(benefits, BenefitTable):
+            for node in nodes:
+                node_benefits_list.append((node, benefits.get_best_benefit(node_id=node.id),
+                                           benefits.get_ranked_cluster_nos(node_id=node.id)))
+        else:
+            for node, benefit in zip(nodes, benefits["node_ids"].values()):
+                if use_n_n:
+                    sorted_benefits = Sorting.get_sorted_clusters_by_ascending_benefit_distances(benefit=benefit)
+                else:
+                    sorted_benefits = Sorting.get_sorted_clusters_by_descending_benefit_distances(benefit=benefit)
 
-            node_benefits_list.append((node, sorted_benefits))
+                node_benefits_list.append((node, sorted_benefits[0].distance,
+                                           [benefit.cluster_no for benefit in sorted_benefits]))
 
-        sorted_node_benefits_list = sorted(node_benefits_list, key=lambda x: x[1][0].distance, reverse=True)
+        sorted_node_benefits_list = sorted(node_benefits_list, key=lambda x: x[1], reverse=True)
+        return [(node, cluster_nos) for node, _, cluster_nos in sorted_node_benefits_list]
+
+    @staticmethod
+    def add_pickups_to_clusters(clusters: dict[int, Cluster], nodes: list[Node], benefits: dict | BenefitTable,
+                                use_n_n: bool, distance_matrix=None, depot: Node = None,
+                                max_pickups: int | None = 1) -> list[Node]:
+        """Add pickups to the clusters, at most max_pickups per cluster and only where the vehicle has room for them
+
+        Without a distance matrix, a pickup is appended to the end of its best cluster that can still take it.
+        With one, it is inserted at its cheapest feasible position, see insert_pickups.
+
+        Args:
+            clusters (dict[int, Cluster]): The dictionary of clusters
+            nodes (list[Node]): The list of nodes
+            benefits (dict | BenefitTable): The benefit table or the dictionary of benefits
+            use_n_n (bool): The nearest neighbor flag
+            distance_matrix (np.ndarray | DistanceProvider): The distance matrix, None to append the pickups
+            depot (Node): The depot node, needed with a distance matrix
+            max_pickups (int | None): The number of pickups a cluster can take, None for no limit
 
-        for node, sorted_benefits in sorted_node_benefits_list:
-            for benefit in sorted_benefits:
-                cluster = clusters[benefit.cluster_no]
-                if cluster.nodes[-1].node_type != 'pickup':
+        Returns:
+             list[Node]: The list of unassigned nodes
+        """
+        pickup_order = Clustering.get_pickup_order(nodes=nodes, benefits=benefits, use_n_n=use_n_n)
+        if distance_matrix is not None:
+            unassigned_node_ids = {node.id for node in Clustering.insert_pickups(
+                clusters=clusters, nodes=[node for node, _ in pickup_order], distance_matrix=distance_matrix,
+                depot=depot, max_pickups=max_pickups)}
+            return [node for node in nodes if node.id in unassigned_node_ids]
+        assigned_node_ids = set()
+        pickup_counts = {cluster_no: sum(node.node_type == 'pickup' for node in cluster.nodes)
+                         for cluster_no, cluster in clusters.items()}
+        route_loads = {}
+
+        for node, cluster_nos in pickup_order:
+            for cluster_no in cluster_nos:
+                cluster = clusters[cluster_no]
+                if max_pickups is not None and pickup_counts[cluster_no] >= max_pickups:
+                    continue
+                if cluster_no not in route_loads:
+                    route_loads[cluster_no] = RouteLoads(route=cluster.nodes, capacity=cluster.capacity)
+                if route_loads[cluster_no].is_insertion_feasible(position=len(cluster.nodes), node=node):
                     cluster.nodes.append(node)
-                    assigned_nodes.append(node)
+                    route_loads[cluster_no].set_route(route=cluster.nodes)
+                    pickup_counts[cluster_no] += 1
+                    assigned_node_ids.add(node.id)
                     break
 
-        unassigned_nodes = list(filter(lambda i: i not in assigned_nodes, nodes))
+        unassigned_nodes = [node for node in nodes if node.id not in assigned_node_ids]
+        return unassigned_nodes
+
+    @staticmethod
+    def get_insertion_edges(cluster: Cluster, cluster_index: int, depot: Node) -> tuple[np.ndarray, ...]:
+        """Get the insertion positions of a cluster route as edges, the depot legs included
+
+        Args:
+            cluster (Cluster): The cluster
+            cluster_index (int): The index of the cluster
+            depot (Node): The depot node
+
+        Returns:
+            tuple[np.ndarray, ...]: The from and to node ids, the cluster index and the route position of every edge,
+                and the largest pickup demand that fits there, negative where the route is already over capacity
+        """
+        loads = RouteLoads(route=cluster.nodes, capacity=cluster.capacity)
+        route_ids = [node.id for node in cluster.nodes]
+        start_loads = loads.start_load + np.asarray(loads.prefix_max)
+        slacks = cluster.capacity - loads.start_load - np.asarray(loads.suffix_max)
+        slacks[start_loads > cluster.capacity] = -1
+        return (np.asarray([depot.id] + route_ids, dtype=np.intp), np.asarray(route_ids + [depot.id], dtype=np.intp),
+                np.full(len(route_ids) + 1, cluster_index, dtype=np.intp), np.arange(len(route_ids) + 1), slacks)
+
+    @staticmethod
+    def insert_pickups(clusters: dict[int, Cluster], nodes: list[Node], distance_matrix, depot: Node,
+                       max_pickups: int | None = 1) -> list[Node]:
+        """Insert each pickup, in the given order, at the cheapest feasible position of any cluster that can still
+        take a pickup
+
+        Every edge of every route, the depot legs included, is a position. The detour of a pickup p on the edge
+        (a, b) is d(a, p) + d(p, b) - d(a, b), and the position is feasible if the vehicle has room for p there and
+        for the rest of the route, see RouteLoads. All positions are evaluated at once on flat arrays of the edges
+        and the pickup demand that fits at each of them. Only the edges of the route that gets a pickup are updated.
+
+        Args:
+            clusters (dict[int, Cluster]): The dictionary of clusters
+            nodes (list[Node]): The list of nodes in insertion order
+            distance_matrix (np.ndarray | DistanceProvider): The distance matrix
+            depot (Node): The depot node
+            max_pickups (int | None): The number of pickups a cluster can take, None for no limit
+
+        Returns:
+             list[Node]: The list of unassigned nodes
+        """
+        if not clusters:
+            return list(nodes)
+        cluster_list = list(clusters.values())
+        blocks = [Clustering.get_insertion_edges(cluster=cluster, cluster_index=cluster_index, depot=depot)
+                  for cluster_index, cluster in enumerate(cluster_list)]
+        from_ids, to_ids, edge_clusters, positions, slacks = (np.concatenate(arrays) for arrays in zip(*blocks))
+        edge_distances = DistanceMatrix.get_pair_distances(distance_matrix=distance_matrix, row_ids=from_ids,
+                                                           column_ids=to_ids)
+        offsets = np.cumsum([0] + [len(block[0]) for block in blocks])
+        pickup_counts = np.array([sum(node.node_type == 'pickup' for node in cluster.nodes)
+                                  for cluster in cluster_list], dtype=np.intp)
+        unassigned_nodes = []
+
+        for node in nodes:
+            distances = DistanceMatrix.get_submatrix(distance_matrix=distance_matrix, row_ids=[node.id],
+                                                     column_ids=np.concatenate([from_ids, to_ids]))[0]
+            detours = distances[:len(from_ids)] + distances[len(from_ids):] - edge_distances
+            infeasible = slacks < node.demand
+            if max_pickups is not None:
+                infeasible |= pickup_counts[edge_clusters] >= max_pickups
+            detours[infeasible] = np.inf
+            edge = int(np.argmin(detours))
+            if detours[edge] == np.inf:
+                unassigned_nodes.append(node)
+                continue
+            cluster_index = int(edge_clusters[edge])
+            cluster = cluster_list[cluster_index]
+            cluster.nodes.insert(int(positions[edge]), node)
+            pickup_counts[cluster_index] += 1
+            # Splice the edges of the changed route into the flat arrays
+            block = Clustering.get_insertion_edges(cluster=cluster, cluster_index=cluster_index, depot=depot)
+            block_distances = DistanceMatrix.get_pair_distances(distance_matrix=distance_matrix, row_ids=block[0],
+                                                                column_ids=block[1])
+            low, high = offsets[cluster_index], offsets[cluster_index + 1]
+            from_ids, to_ids, edge_clusters, positions, slacks, edge_distances = (
+                np.concatenate([array[:low], block_array, array[high:]])
+                for array, block_array in zip((from_ids, to_ids, edge_clusters, positions, slacks, edge_distances),
+                                              block + (block_distances,)))
+            offsets[cluster_index + 1:] += 1
+
         return unassigned_nodes
+
+    @staticmethod
+    def eliminate_empty_clusters(clusters: dict[int, Cluster],
+                                 nodes: list[Node],
+                                 benefits: BenefitTable,
+                                 use_polar_angle: bool,
+                                 regret_k: int = None) -> tuple[dict[int, Cluster], list[Node]]:
+        """Try to remove the clusters that only hold their seed node, in ascending seed node demand order
+
+        For each empty cluster, its seed node joins the remaining nodes and all remaining nodes are assigned again
+        to the other clusters like finalize_clusters does. The elimination is kept only if every node fits.
+        The trials share one demand-sorted node list, one array of the cluster column of every benefit table row and
+        the load of every cluster column. A trial writes its changes to them and logs the previous values, a failed
+        trial is rolled back from its change log. An accepted one drops the cluster column from the benefit table.
+        The cluster nodes are rebuilt once at the end.
+
+        Args:
+            clusters (dict[int, Cluster]): The dictionary of finalized clusters
+            nodes (list[Node]): The list of remaining nodes, without the seed nodes
+            benefits (BenefitTable): The benefit table, with rows for the remaining nodes and the seed nodes
+            use_polar_angle (bool): The polar angle flag
+            regret_k (int): Assign the nodes of a trial in regret order like finalize_clusters, None for demand order
+
+        Returns:
+             tuple[dict[int, Cluster], list[Node]]: The dictionary of clusters and the remaining nodes
+        """
+        empty_clusters = Sorting.get_sorted_clusters_by_ascending_seed_node_demand(
+            clusters=[cluster for cluster in clusters.values() if len(cluster.nodes) == 1])
+        if not empty_clusters:
+            return clusters, nodes
+        sorted_nodes = Sorting.get_sorted_nodes_by_descending_demand(nodes=nodes)
+        capacities = np.array([clusters[cluster_no].capacity for cluster_no in benefits.cluster_nos])
+        seed_loads = np.array([clusters[cluster_no].seed_node.demand for cluster_no in benefits.cluster_nos])
+        # The cluster column of every benefit table row, -1 while unassigned, and the load of every cluster column
+        assignment = [-1] * len(benefits.node_ids)
+        loads = seed_loads.tolist()
+        assigned_nodes = None
+
+        for empty_cluster in empty_clusters:
+            column = benefits.cluster_nos.index(empty_cluster.cluster_no)
+            seed_node = empty_cluster.seed_node
+            remaining_capacities = capacities - seed_loads
+            # The empty cluster takes no node
+            remaining_capacities[column] = -1
+            # After the nodes of equal demand, as sorting nodes + [seed_node] would place it
+            position = bisect.bisect_right(sorted_nodes, -seed_node.demand, key=lambda node: -node.demand)
+            sorted_nodes.insert(position, seed_node)
+            order = Clustering.get_assignment(nodes=sorted_nodes, benefits=benefits,
+                                              remaining_capacities=remaining_capacities, regret_k=regret_k,
+                                              complete=True)
+            change_log = []
+            for index, cluster_column in order:
+                node = sorted_nodes[index]
+                row = benefits.rows[node.id]
+                if assignment[row] != cluster_column:
+                    change_log.append((row, assignment[row], node.demand))
+                    Clustering.assign_row(assignment=assignment, loads=loads, row=row, column=cluster_column,
+                                          demand=node.demand)
+
+            if len(order) < len(sorted_nodes):
+                for row, previous_column, demand in reversed(change_log):
+                    Clustering.assign_row(assignment=assignment, loads=loads, row=row, column=previous_column,
+                                          demand=demand)
+                del sorted_nodes[position]
+                continue
+            nodes = nodes + [seed_node]
+            assigned_nodes = [sorted_nodes[index] for index, _ in order]
+            benefits.drop_cluster(cluster_no=empty_cluster.cluster_no)
+            capacities, seed_loads = np.delete(capacities, column), np.delete(seed_loads, column)
+            del loads[column]
+            assignment = [row_column - (row_column > column) for row_column in assignment]
+
+        if assigned_nodes is None:
+            return clusters, nodes
+
+        clusters = {cluster_no: clusters[cluster_no] for cluster_no in benefits.cluster_nos}
+        Clustering.delete_cluster_nodes(clusters=clusters)
+        for node in assigned_nodes:
+            cluster = clusters[benefits.cluster_nos[assignment[benefits.rows[node.id]]]]
+            if use_polar_angle and cluster.seed_node.polar_angle > node.polar_angle:
+                cluster.nodes.insert(0, node)
+            else:
+                cluster.nodes.append(node)
+        for cluster_no, load in zip(benefits.cluster_nos, loads):
+            clusters[cluster_no].total_demand = load
+            clusters[cluster_no].remaining_capacity = clusters[cluster_no].capacity - load
+        return clusters, nodes
+
+    @staticmethod
+    def assign_row(assignment: list[int], loads: list[int], row: int, column: int, demand: int) -> None:
+        """Move a benefit table row to a cluster column and move its demand with it
+
+        Args:
+            assignment (list[int]): The cluster column of every row, -1 for an unassigned row
+            loads (list[int]): The load of every cluster column
+            row (int): The row
+            column (int): The new cluster column, -1 to unassign the row
+            demand (int): The demand of the node of the row
+        """
+        if assignment[row] >= 0:
+            loads[assignment[row]] -= demand
+        if column >= 0:
+            loads[column] += demand
+        assignment[row] = column
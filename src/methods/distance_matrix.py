@@ -0,0 +1,209 @@
+import numpy as np
+
+from src.models.node import Node
+
+
+class DistanceMatrix:
+    @staticmethod
+    def get_coordinates(nodes: list[Node]) -> np.ndarray:
+        """Collect the node coordinates into a contiguous array
+
+        Args:
+            nodes (list[Node]): The list of nodes
+
+        Returns:
+            np.ndarray: The (n, 2) array of (lat, lon) coordinates, row i belongs to nodes[i]
+        """
+        coordinates = np.empty((len(nodes), 2), dtype=np.float64)
+        for index, node in enumerate(nodes):
+            coordinates[index, 0] = node.location.lat
+            coordinates[index, 1] = node.location.lon
+        return coordinates
+
+    @staticmethod
+    def create(coordinates: np.ndarray, dtype: np.dtype = np.float64, round_to_int: bool = False) -> np.ndarray:
+        """Create the full distance matrix in a single broadcast pass
+
+        The distances are always computed in float64 with the same operation order as
+        Calculations.calculate_distance, so the float64 result is bit-identical to the pairwise loop.
+
+        Args:
+            coordinates (np.ndarray): The (n, 2) array of (lat, lon) coordinates
+            dtype (np.dtype): The dtype of the returned matrix, float64 or float32
+            round_to_int (bool): Round the distances to the nearest integer (TSPLIB EUC_2D convention)
+
+        Returns:
+            np.ndarray: The (n, n) distance matrix
+        """
+        distance_matrix = DistanceMatrix.create_rows(coordinates=coordinates, row_start=0, row_stop=len(coordinates))
+        if round_to_int:
+            distance_matrix = DistanceMatrix.round_euc_2d(distances=distance_matrix)
+        return distance_matrix.astype(dtype, copy=False)
+
+    @staticmethod
+    def create_rows(coordinates: np.ndarray, row_start: int, row_stop: int) -> np.ndarray:
+        """Compute a block of rows of the distance matrix in float64
+
+        Args:
+            coordinates (np.ndarray): The (n, 2) array of (lat, lon) coordinates
+            row_start (int): The first row of the block
+            row_stop (int): The row after the last row of the block
+
+        Returns:
+            np.ndarray: The (row_stop - row_start, n) block of distances
+        """
+        lat = coordinates[:, 0]
+        lon = coordinates[:, 1]
+        delta_lat = lat[row_start:row_stop, np.newaxis] - lat[np.newaxis, :]
+        delta_lon = lon[row_start:row_stop, np.newaxis] - lon[np.newaxis, :]
+        delta_lat *= delta_lat
+        delta_lon *= delta_lon
+        delta_lat += delta_lon
+        return np.sqrt(delta_lat, out=delta_lat)
+
+    @staticmethod
+    def create_provider(coordinates: np.ndarray, mode: str = 'dense', **kwargs):
+        """Create a distance provider for the given memory mode
+
+        Modes:
+            dense: The full np.ndarray matrix, 8 * n^2 bytes in float64
+            lazy: Rows computed on demand with a bounded LRU cache of rows (kwargs: dtype, cache_size)
+            condensed: The upper triangle stored as a flat float32 array (kwargs: dtype, block_size)
+            memmap: The full matrix in an on-disk np.memmap (kwargs: dtype, path, block_size)
+
+        Args:
+            coordinates (np.ndarray): The (n, 2) array of (lat, lon) coordinates
+            mode (str): The memory mode
+
+        Returns:
+            np.ndarray | DistanceProvider: An object indexed as distance_matrix[i][j]
+        """
+        from src.methods.distance_providers import (LazyRowDistanceMatrix, CondensedDistanceMatrix,
+                                                    MemmapDistanceMatrix)
+        if mode == 'dense':
+            return DistanceMatrix.create(coordinates=coordinates, **kwargs)
+        if mode == 'lazy':
+            return LazyRowDistanceMatrix(coordinates=coordinates, **kwargs)
+        if mode == 'condensed':
+            return CondensedDistanceMatrix(coordinates=coordinates, **kwargs)
+        if mode == 'memmap':
+            return MemmapDistanceMatrix(coordinates=coordinates, **kwargs)
+        raise ValueError(f"Unknown distance mode: {mode}")
+
+    @staticmethod
+    def get_submatrix(distance_matrix, row_ids: list[int], column_ids: list[int]) -> np.ndarray:
+        """Gather the distances between two sets of node ids
+
+        Args:
+            distance_matrix (np.ndarray | DistanceProvider): The distance matrix
+            row_ids (list[int]): The row node ids
+            column_ids (list[int]): The column node ids
+
+        Returns:
+            np.ndarray: The (len(row_ids), len(column_ids)) block of distances
+        """
+        if isinstance(distance_matrix, np.ndarray):
+            return distance_matrix[np.ix_(row_ids, column_ids)]
+        column_ids = np.asarray(column_ids, dtype=np.intp)
+        rows = [np.asarray(distance_matrix[row_id])[column_ids] for row_id in row_ids]
+        return np.array(rows) if rows else np.empty((0, len(column_ids)))
+
+    @staticmethod
+    def get_pair_distances(distance_matrix, row_ids: np.ndarray, column_ids: np.ndarray) -> np.ndarray:
+        """Gather the distances of pairs of node ids
+
+        Args:
+            distance_matrix (np.ndarray | DistanceProvider): The distance matrix
+            row_ids (np.ndarray): The first node id of each pair
+            column_ids (np.ndarray): The second node id of each pair
+
+        Returns:
+            np.ndarray: The distance of each pair
+        """
+        if isinstance(distance_matrix, np.ndarray):
+            return distance_matrix[row_ids, column_ids].astype(np.float64)
+        return np.array([distance_matrix[row_id][column_id]
+                         for row_id, column_id in zip(np.asarray(row_ids).tolist(), np.asarray(column_ids).tolist())],
+                        dtype=np.float64)
+
+    @staticmethod
+    def get_neighbor_lists(distance_matrix, node_ids: list[int], neighbor_k: int,
+                           block_size: int = 512) -> dict[int, list[int]]:
+        """Get the neighbor_k nearest of the given nodes for each of them, computed in blocks of rows
+
+        Args:
+            distance_matrix (np.ndarray | DistanceProvider): The distance matrix
+            node_ids (list[int]): The node ids
+            neighbor_k (int): The number of neighbors per node
+            block_size (int): The number of rows gathered at once
+
+        Returns:
+            dict[int, list[int]]: The neighbor ids of each node id, nearest first
+        """
+        node_ids = list(node_ids)
+        k = min(neighbor_k, len(node_ids) - 1)
+        if k < 1:
+            return {node_id: [] for node_id in node_ids}
+        ids = np.asarray(node_ids, dtype=np.intp)
+        neighbor_lists = {}
+        for start in range(0, len(node_ids), block_size):
+            rows = node_ids[start:start + block_size]
+            distances = np.array(DistanceMatrix.get_submatrix(distance_matrix=distance_matrix, row_ids=rows,
+                                                              column_ids=node_ids), dtype=np.float64)
+            distances[np.arange(len(rows)), np.arange(start, start + len(rows))] = np.inf
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1, kind='stable')
+            nearest = ids[np.take_along_axis(nearest, order, axis=1)]
+            neighbor_lists.update(zip(rows, nearest.tolist()))
+        return neighbor_lists
+
+    @staticmethod
+    def get_memory_usage(distance_matrix) -> int:
+        """Get the number of bytes a distance matrix or provider holds in memory
+
+        Args:
+            distance_matrix (np.ndarray | DistanceProvider): The distance matrix
+
+        Returns:
+            int: The memory usage in bytes
+        """
+        if isinstance(distance_matrix, np.memmap):
+            return 0
+        if isinstance(distance_matrix, np.ndarray):
+            return distance_matrix.nbytes
+        return distance_matrix.memory_usage
+
+    @staticmethod
+    def estimate_memory_usage(no_of_nodes: int, mode: str = 'dense', **kwargs) -> int:
+        """Estimate the memory a distance mode needs before building it
+
+        Args:
+            no_of_nodes (int): The number of nodes, including the depot
+            mode (str): The memory mode, see create_provider
+
+        Returns:
+            int: The estimated memory usage in bytes
+        """
+        from src.methods.distance_providers import (LazyRowDistanceMatrix, CondensedDistanceMatrix,
+                                                    MemmapDistanceMatrix)
+        if mode == 'dense':
+            return no_of_nodes * no_of_nodes * np.dtype(kwargs.get("dtype", np.float64)).itemsize
+        if mode == 'lazy':
+            return LazyRowDistanceMatrix.estimate_memory_usage(no_of_nodes=no_of_nodes, **kwargs)
+        if mode == 'condensed':
+            return CondensedDistanceMatrix.estimate_memory_usage(no_of_nodes=no_of_nodes, **kwargs)
+        if mode == 'memmap':
+            return MemmapDistanceMatrix.estimate_memory_usage(no_of_nodes=no_of_nodes, **kwargs)
+        raise ValueError(f"Unknown distance mode: {mode}")
+
+    @staticmethod
+    def round_euc_2d(distances: np.ndarray) -> np.ndarray:
+        """Round the distances with the TSPLIB EUC_2D nint convention, nint(x) = (int)(x + 0.5)
+
+        Args:
+            distances (np.ndarray): The Euclidean distances
+
+        Returns:
+            np.ndarray: The rounded distances
+        """
+        return np.floor(distances + 0.5)
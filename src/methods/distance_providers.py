@@ -0,0 +1,227 @@
+import os
+import weakref
+import tempfile
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import numpy as np
+
+from src.methods.distance_matrix import DistanceMatrix
+
+
+class DistanceProvider(ABC):
+    """Base class for the memory-bounded alternatives to the dense distance matrix.
+
+    A provider is indexed like the dense np.ndarray it replaces: provider[i] returns row i,
+    so provider[i][j] and provider[i, j] both return the distance between node i and node j.
+    Providers that hold external resources release them in close, also when used as a context manager."""
+
+    def __init__(self, coordinates: np.ndarray, dtype: np.dtype):
+        self.coordinates = np.ascontiguousarray(coordinates, dtype=np.float64)
+        self.dtype = np.dtype(dtype)
+        self.no_of_nodes = len(self.coordinates)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.no_of_nodes, self.no_of_nodes
+
+    def __len__(self) -> int:
+        return self.no_of_nodes
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            row_index, column_index = key
+            return self.row(int(row_index))[column_index]
+        return self.row(int(key))
+
+    def __enter__(self) -> 'DistanceProvider':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the resources of the provider, it must not be used afterwards"""
+
+    @abstractmethod
+    def row(self, index: int) -> np.ndarray:
+        """Get the distances from one node to all nodes
+
+        Args:
+            index (int): The node index
+
+        Returns:
+            np.ndarray: The distance row
+        """
+
+    def compute_rows(self, row_start: int, row_stop: int) -> np.ndarray:
+        """Compute a block of rows from the coordinates
+
+        Args:
+            row_start (int): The first row of the block
+            row_stop (int): The row after the last row of the block
+
+        Returns:
+            np.ndarray: The (row_stop - row_start, n) block of distances
+        """
+        return DistanceMatrix.create_rows(coordinates=self.coordinates, row_start=row_start, row_stop=row_stop)
+
+    @property
+    @abstractmethod
+    def memory_usage(self) -> int:
+        """The number of bytes held in memory by the provider"""
+
+
+class LazyRowDistanceMatrix(DistanceProvider):
+    """Computes rows on demand and keeps the most recently used ones in a bounded LRU cache."""
+
+    def __init__(self, coordinates: np.ndarray, dtype: np.dtype = np.float64, cache_size: int = 1024):
+        super().__init__(coordinates=coordinates, dtype=dtype)
+        self.cache_size = cache_size
+        self.rows = OrderedDict()
+
+    def row(self, index: int) -> np.ndarray:
+        row = self.rows.get(index)
+        if row is not None:
+            self.rows.move_to_end(index)
+            return row
+        row = self.compute_rows(row_start=index, row_stop=index + 1)[0].astype(self.dtype, copy=False)
+        self.rows[index] = row
+        if len(self.rows) > self.cache_size:
+            self.rows.popitem(last=False)
+        return row
+
+    @property
+    def memory_usage(self) -> int:
+        return self.coordinates.nbytes + len(self.rows) * self.no_of_nodes * self.dtype.itemsize
+
+    @staticmethod
+    def estimate_memory_usage(no_of_nodes: int, dtype: np.dtype = np.float64, cache_size: int = 1024) -> int:
+        return no_of_nodes * 16 + min(cache_size, no_of_nodes) * no_of_nodes * np.dtype(dtype).itemsize
+
+
+class CondensedDistanceMatrix(DistanceProvider):
+    """Stores only the strict upper triangle, n * (n - 1) / 2 entries, as a flat array."""
+
+    def __init__(self, coordinates: np.ndarray, dtype: np.dtype = np.float32, block_size: int = 512):
+        super().__init__(coordinates=coordinates, dtype=dtype)
+        n = self.no_of_nodes
+        self.data = np.empty(n * (n - 1) // 2, dtype=self.dtype)
+        for row_start in range(0, n, block_size):
+            row_stop = min(row_start + block_size, n)
+            block = self.compute_rows(row_start=row_start, row_stop=row_stop)
+            for offset, row in enumerate(block):
+                row_index = row_start + offset
+                start = self.get_condensed_index(row_index, row_index + 1)
+                self.data[start:start + n - row_index - 1] = row[row_index + 1:]
+
+    def get_condensed_index(self, row_index, column_index):
+        """Get the position of (row_index, column_index), row_index < column_index, in the flat array"""
+        return self.no_of_nodes * row_index - row_index * (row_index + 1) // 2 + column_index - row_index - 1
+
+    def row(self, index: int) -> np.ndarray:
+        row = np.empty(self.no_of_nodes, dtype=self.dtype)
+        row[index] = 0
+        row[:index] = self.data[self.get_condensed_index(np.arange(index), index)]
+        start = self.get_condensed_index(index, index + 1)
+        row[index + 1:] = self.data[start:start + self.no_of_nodes - index - 1]
+        return row
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            row_index, column_index = int(key[0]), int(key[1])
+            if row_index == column_index:
+                return self.dtype.type(0)
+            lower, upper = min(row_index, column_index), max(row_index, column_index)
+            return self.data[self.get_condensed_index(lower, upper)]
+        return CondensedRow(matrix=self, index=int(key))
+
+    @property
+    def memory_usage(self) -> int:
+        return self.coordinates.nbytes + self.data.nbytes
+
+    @staticmethod
+    def estimate_memory_usage(no_of_nodes: int, dtype: np.dtype = np.float32) -> int:
+        return no_of_nodes * 16 + no_of_nodes * (no_of_nodes - 1) // 2 * np.dtype(dtype).itemsize
+
+
+class CondensedRow:
+    """A row view of a CondensedDistanceMatrix, so that matrix[i][j] reads one entry instead of
+    materializing the whole row. Array indexing and np.asarray materialize the row."""
+
+    def __init__(self, matrix: CondensedDistanceMatrix, index: int):
+        self.matrix = matrix
+        self.index = index
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.matrix[self.index, key]
+        return self.matrix.row(self.index)[key]
+
+    def __len__(self) -> int:
+        return self.matrix.no_of_nodes
+
+    def __array__(self, dtype=None, copy=None):
+        row = self.matrix.row(self.index)
+        return row if dtype is None else row.astype(dtype)
+
+
+class MemmapDistanceMatrix(DistanceProvider):
+    """Keeps the full matrix in an on-disk np.memmap; only the pages in use are resident.
+
+    Without a path the matrix goes to a temporary file, which is deleted by close or, at the latest, when the
+    provider is garbage collected. A file at a given path is kept."""
+
+    def __init__(self,
+                 coordinates: np.ndarray,
+                 dtype: np.dtype = np.float64,
+                 path: str = None,
+                 block_size: int = 512):
+        super().__init__(coordinates=coordinates, dtype=dtype)
+        n = self.no_of_nodes
+        self.finalizer = None
+        if path is None:
+            handle, path = tempfile.mkstemp(prefix="distance_matrix_", suffix=".dat")
+            os.close(handle)
+            self.finalizer = weakref.finalize(self, MemmapDistanceMatrix.remove_file, path)
+        self.path = path
+        self.data = np.memmap(path, dtype=self.dtype, mode="w+", shape=(n, n))
+        for row_start in range(0, n, block_size):
+            row_stop = min(row_start + block_size, n)
+            self.data[row_start:row_stop] = self.compute_rows(row_start=row_start, row_stop=row_stop)
+        self.data.flush()
+        self.array = self.data.view(np.ndarray)
+
+    def row(self, index: int) -> np.ndarray:
+        return self.array[index]
+
+    def __getitem__(self, key):
+        return self.array[key]
+
+    @staticmethod
+    def remove_file(path: str) -> None:
+        """Delete a temporary matrix file if it still exists
+
+        Args:
+            path (str): The file path
+        """
+        if os.path.exists(path):
+            os.remove(path)
+
+    def close(self) -> None:
+        """Delete the backing file if the provider created it"""
+        if self.finalizer is not None:
+            self.finalizer()
+
+    @property
+    def memory_usage(self) -> int:
+        return self.coordinates.nbytes
+
+    @property
+    def disk_usage(self) -> int:
+        """The number of bytes of the backing file"""
+        return self.data.nbytes
+
+    @staticmethod
+    def estimate_memory_usage(no_of_nodes: int, dtype: np.dtype = np.float64) -> int:
+        return no_of_nodes * 16
@@ -0,0 +1,240 @@
+from collections import deque
+
+from src.models.node import Node
+from src.models.vehicle import Vehicle
+from src.models.route_loads import RouteLoads
+from src.methods.two_opt import TwoOpt
+from src.utils.deadline import Deadline
+from src.methods.calculations import Calculations
+from src.methods.distance_matrix import DistanceMatrix
+
+
+class LocalSearch:
+    """Inter-route local search with relocate, Or-opt and swap moves between vehicles.
+
+    A node u is only moved next to one of its neighbor_k nearest nodes v of another route: relocate and Or-opt
+    move a segment of up to MAX_SEGMENT_LENGTH deliveries that starts or ends at u to the edge before or after v,
+    swap exchanges u with a delivery next to v. Moves are scored by the change of the edges they replace and
+    checked with the route loads; the first improving feasible move around u is applied.
+
+    Pickups stay in their routes, which can hold any number of them. A route is feasible while the highest load of
+    its vehicle fits the capacity, which is Vehicle.is_route_feasible written with the route loads, see RouteLoads."""
+
+    MAX_SEGMENT_LENGTH = 3
+
+    @staticmethod
+    def improve(vehicles: list[Vehicle],
+                distance_matrix,
+                neighbor_k: int = 10,
+                time_limit: float = None,
+                deadline: Deadline = None) -> tuple[int, int]:
+        """Improve the routes of the vehicles with inter-route moves, then apply 2-opt to the changed routes.
+        Routes can be emptied, their vehicles are left with an empty route.
+
+        Args:
+            vehicles (list[Vehicle]): The vehicles, their routes, demands and distances are updated in place
+            distance_matrix (np.ndarray | DistanceProvider): The distance matrix
+            neighbor_k (int): The number of neighbors a node can be moved next to
+            time_limit (float): The time budget of the moves in seconds, None for no limit
+            deadline (Deadline): The deadline of the whole improvement, the moves and the 2-opt stop at it
+
+        Returns:
+            tuple[int, int]: The number of moves evaluated and the number of moves accepted, the 2-opt moves of the
+                changed routes included
+        """
+        time_budget = Deadline(time_limit=time_limit)
+        routes = [list(vehicle.route) for vehicle in vehicles]
+        states = [LocalSearch.get_route_state(route=route, capacity=vehicle.capacity)
+                  for route, vehicle in zip(routes, vehicles)]
+        route_of, position_of = {}, {}
+        for route_index, route in enumerate(routes):
+            LocalSearch.set_positions(route=route, route_index=route_index, route_of=route_of,
+                                      position_of=position_of)
+        deliveries = [node.id for route in routes for node in route if node.node_type == 'delivery']
+        neighbor_lists = DistanceMatrix.get_neighbor_lists(distance_matrix=distance_matrix, node_ids=deliveries,
+                                                           neighbor_k=neighbor_k)
+        queue = deque(deliveries)
+        queued = set(deliveries)
+        changed = set()
+        evaluated, accepted = 0, 0
+
+        while queue:
+            if time_budget.reached() or (deadline is not None and deadline.reached()):
+                break
+            node_id = queue.popleft()
+            queued.discard(node_id)
+            move, node_evaluated = LocalSearch.find_move(node_id=node_id, routes=routes, states=states,
+                                                         route_of=route_of, position_of=position_of,
+                                                         neighbors=neighbor_lists[node_id],
+                                                         distance_matrix=distance_matrix)
+            evaluated += node_evaluated
+            if move is None:
+                continue
+            accepted += 1
+            for route_index in LocalSearch.apply_move(move=move, routes=routes):
+                route = routes[route_index]
+                states[route_index] = LocalSearch.get_route_state(route=route,
+                                                                  capacity=vehicles[route_index].capacity)
+                LocalSearch.set_positions(route=route, route_index=route_index, route_of=route_of,
+                                          position_of=position_of)
+                changed.add(route_index)
+                for node in route:
+                    if node.node_type == 'delivery' and node.id not in queued:
+                        queue.append(node.id)
+                        queued.add(node.id)
+
+        for route_index in sorted(changed):
+            vehicle = vehicles[route_index]
+            vehicle.route = routes[route_index]
+            vehicle.total_demand = states[route_index][1].start_load
+            vehicle.remaining_capacity = vehicle.capacity - vehicle.total_demand
+            vehicle.set_route_sequence()
+            vehicle.set_fulfilment_rate()
+            if not vehicle.route:
+                vehicle.route_distance = 0
+                continue
+            vehicle.route_distance = Calculations.calculate_route_distance(nodes=vehicle.route,
+                                                                           distance_matrix=distance_matrix)
+            two_opt_evaluated, two_opt_accepted = TwoOpt.delta_two_opt(vehicle=vehicle,
+                                                                       distance_matrix=distance_matrix,
+                                                                       deadline=deadline)
+            evaluated += two_opt_evaluated
+            accepted += two_opt_accepted
+        return evaluated, accepted
+
+    @staticmethod
+    def get_route_state(route: list[Node], capacity: int) -> tuple[list[int], RouteLoads]:
+        """Get the depot-padded node ids and the load profile of a route
+
+        Args:
+            route (list[Node]): The route
+            capacity (int): The capacity of the vehicle
+
+        Returns:
+            tuple[list[int], RouteLoads]: The tour and the route loads
+        """
+        tour = [0] + [node.id for node in route] + [0]
+        return tour, RouteLoads(route=route, capacity=capacity)
+
+    @staticmethod
+    def set_positions(route: list[Node], route_index: int, route_of: dict[int, int],
+                      position_of: dict[int, int]) -> None:
+        """Record the route and the position of every node of a route
+
+        Args:
+            route (list[Node]): The route
+            route_index (int): The index of the route
+            route_of (dict[int, int]): The route index of each node id
+            position_of (dict[int, int]): The route position of each node id
+        """
+        for position, node in enumerate(route):
+            route_of[node.id] = route_index
+            position_of[node.id] = position
+
+    @staticmethod
+    def find_move(node_id: int, routes: list[list[Node]], states: list[tuple], route_of: dict[int, int],
+                  position_of: dict[int, int], neighbors: list[int], distance_matrix) -> tuple[tuple | None, int]:
+        """Find the first improving and feasible relocate, Or-opt or swap move of a node
+
+        Returns:
+            tuple[tuple | None, int]: The move, None if there is no such move, and the number of moves evaluated
+        """
+        evaluated = 0
+        route_index = route_of[node_id]
+        route, state = routes[route_index], states[route_index]
+        tour, loads = state
+        position = position_of[node_id]
+        segments = {(position - length + 1, position) for length in range(1, LocalSearch.MAX_SEGMENT_LENGTH + 1)}
+        segments |= {(position, position + length - 1) for length in range(1, LocalSearch.MAX_SEGMENT_LENGTH + 1)}
+
+        for start, end in sorted(segments, key=lambda segment: (segment[1] - segment[0], segment)):
+            if start < 0 or end >= len(route):
+                continue
+            if any(node.node_type != 'delivery' for node in route[start:end + 1]):
+                continue
+            segment = loads.get_segment(start=start, end=end)
+            if not loads.is_replacement_feasible(start=start, end=end, segment=(0, 0, 0)):
+                continue
+            first_id, last_id = route[start].id, route[end].id
+            other_id = last_id if node_id == first_id else first_id
+            previous_id, next_id = tour[start], tour[end + 2]
+            removal_gain = (distance_matrix[previous_id, first_id] + distance_matrix[last_id, next_id]
+                            - distance_matrix[previous_id, next_id])
+
+            for neighbor_id in neighbors:
+                target_index = route_of.get(neighbor_id)
+                if target_index is None or target_index == route_index:
+                    continue
+                target_route, target_state = routes[target_index], states[target_index]
+                target_tour, target_loads = target_state
+                neighbor_position = position_of[neighbor_id]
+                # Insert the segment between x and y, after the neighbor and then before it, with the node next to it
+                for insert_after, insert_position, x_id, y_id in (
+                        (True, neighbor_position + 1, neighbor_id, target_tour[neighbor_position + 2]),
+                        (False, neighbor_position, target_tour[neighbor_position], neighbor_id)):
+                    evaluated += 1
+                    if insert_after:
+                        insertion_cost = distance_matrix[x_id, node_id] + distance_matrix[other_id, y_id]
+                        reverse = node_id != first_id
+                    else:
+                        insertion_cost = distance_matrix[x_id, other_id] + distance_matrix[node_id, y_id]
+                        reverse = node_id != last_id
+                    delta = insertion_cost - distance_matrix[x_id, y_id] - removal_gain
+                    if delta >= -TwoOpt.TIE_TOLERANCE:
+                        continue
+                    if target_loads.is_replacement_feasible(start=insert_position, end=insert_position - 1,
+                                                            segment=segment):
+                        return ('relocate', route_index, start, end, target_index, insert_position, reverse), \
+                            evaluated
+
+        if route[position].node_type != 'delivery':
+            return None, evaluated
+        node_segment = RouteLoads.get_node_segment(node=route[position])
+        previous_id, next_id = tour[position], tour[position + 2]
+        for neighbor_id in neighbors:
+            target_index = route_of.get(neighbor_id)
+            if target_index is None or target_index == route_index:
+                continue
+            target_route, target_state = routes[target_index], states[target_index]
+            target_tour, target_loads = target_state
+            neighbor_position = position_of[neighbor_id]
+            for swap_position in (neighbor_position - 1, neighbor_position + 1):
+                if not 0 <= swap_position < len(target_route) or target_route[swap_position].node_type != 'delivery':
+                    continue
+                evaluated += 1
+                swap_id = target_route[swap_position].id
+                target_previous_id, target_next_id = target_tour[swap_position], target_tour[swap_position + 2]
+                delta = (distance_matrix[previous_id, swap_id] + distance_matrix[swap_id, next_id]
+                         - distance_matrix[previous_id, node_id] - distance_matrix[node_id, next_id]
+                         + distance_matrix[target_previous_id, node_id] + distance_matrix[node_id, target_next_id]
+                         - distance_matrix[target_previous_id, swap_id] - distance_matrix[swap_id, target_next_id])
+                if delta >= -TwoOpt.TIE_TOLERANCE:
+                    continue
+                swap_segment = RouteLoads.get_node_segment(node=target_route[swap_position])
+                if loads.is_replacement_feasible(start=position, end=position, segment=swap_segment) and \
+                        target_loads.is_replacement_feasible(start=swap_position, end=swap_position,
+                                                             segment=node_segment):
+                    return ('swap', route_index, position, target_index, swap_position), evaluated
+        return None, evaluated
+
+    @staticmethod
+    def apply_move(move: tuple, routes: list[list[Node]]) -> tuple[int, int]:
+        """Apply a move found by find_move
+
+        Args:
+            move (tuple): The move
+            routes (list[list[Node]]): The routes, updated in place
+
+        Returns:
+            tuple[int, int]: The indices of the two changed routes
+        """
+        if move[0] == 'relocate':
+            _, route_index, start, end, target_index, insert_position, reverse = move
+            segment = routes[route_index][start:end + 1]
+            del routes[route_index][start:end + 1]
+            routes[target_index][insert_position:insert_position] = segment[::-1] if reverse else segment
+        else:
+            _, route_index, position, target_index, swap_position = move
+            routes[route_index][position], routes[target_index][swap_position] = \
+                routes[target_index][swap_position], routes[route_index][position]
+        return route_index, target_index
@@ -0,0 +1,150 @@
+import numpy as np
+from copy import copy
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.models.vehicle import Vehicle
+from src.methods.two_opt import TwoOpt
+from src.utils.deadline import Deadline
+from src.methods.distance_providers import MemmapDistanceMatrix
+
+# The distance matrix of a worker process, attached once by ParallelTwoOpt.initialize_worker
+worker_distance_matrix = None
+worker_shared_memory = None
+
+
+class ParallelTwoOpt:
+    """Runs the per-vehicle 2-opt on a thread or process pool. Every route is improved independently with
+    the same TwoOpt.delta_two_opt call as the serial loop, so the result does not depend on the pool."""
+
+    @staticmethod
+    def initialize_worker(source: tuple) -> None:
+        """Attach the shared distance matrix in a worker process
+
+        Args:
+            source (tuple): The description of the shared matrix, see get_matrix_source
+        """
+        global worker_distance_matrix, worker_shared_memory
+        kind = source[0]
+        if kind == 'shared_memory':
+            _, name, shape, dtype = source
+            worker_shared_memory = shared_memory.SharedMemory(name=name)
+            worker_distance_matrix = np.ndarray(shape, dtype=dtype, buffer=worker_shared_memory.buf)
+        elif kind == 'memmap':
+            _, path, shape, dtype = source
+            worker_distance_matrix = np.memmap(path, dtype=dtype, mode='r', shape=shape).view(np.ndarray)
+        else:
+            worker_distance_matrix = source[1]
+
+    @staticmethod
+    def get_matrix_source(distance_matrix) -> tuple[tuple, shared_memory.SharedMemory | None]:
+        """Describe how worker processes reach the distance matrix without pickling it per task
+
+        Dense matrices are copied once into a shared memory block and memmap matrices are reopened from
+        their file. Other providers are sent once per worker.
+
+        Args:
+            distance_matrix (np.ndarray | DistanceProvider): The distance matrix
+
+        Returns:
+            tuple[tuple, SharedMemory | None]: The source passed to the workers and the shared memory block to release
+        """
+        if isinstance(distance_matrix, MemmapDistanceMatrix):
+            return ('memmap', distance_matrix.path, distance_matrix.shape, distance_matrix.dtype.str), None
+        if isinstance(distance_matrix, np.ndarray):
+            block = shared_memory.SharedMemory(create=True, size=max(distance_matrix.nbytes, 1))
+            shared_matrix = np.ndarray(distance_matrix.shape, dtype=distance_matrix.dtype, buffer=block.buf)
+            shared_matrix[:] = distance_matrix
+            return ('shared_memory', block.name, distance_matrix.shape, distance_matrix.dtype.str), block
+        return ('object', distance_matrix), None
+
+    @staticmethod
+    def improve_route(vehicle: Vehicle, best_improvement: bool, neighbor_k: int,
+                      deadline: Deadline = None) -> tuple[list[int], float, int, int, bool]:
+        """Apply 2-opt to a vehicle in a worker process
+
+        Args:
+            vehicle (Vehicle): The vehicle
+            best_improvement (bool): The best improvement flag of the 2-opt
+            neighbor_k (int): The neighbor list size of the 2-opt
+            deadline (Deadline): The deadline of the 2-opt
+
+        Returns:
+            tuple[list[int], float, int, int, bool]: The new order of the route as positions in the old route, the
+                route distance, the number of moves evaluated and accepted and whether the deadline expired
+        """
+        return ParallelTwoOpt.two_opt_order(vehicle=vehicle, distance_matrix=worker_distance_matrix,
+                                            best_improvement=best_improvement, neighbor_k=neighbor_k,
+                                            deadline=deadline)
+
+    @staticmethod
+    def two_opt_order(vehicle: Vehicle,
+                      distance_matrix: np.ndarray,
+                      best_improvement: bool,
+                      neighbor_k: int,
+                      deadline: Deadline = None) -> tuple[list[int], float, int, int, bool]:
+        """Apply 2-opt to a copy of the vehicle route and return the new order
+
+        Returns:
+            tuple[list[int], float, int, int, bool]: The new order of the route as positions in the old route, the
+                route distance, the number of moves evaluated and accepted and whether the deadline expired
+        """
+        positions = {id(node): position for position, node in enumerate(vehicle.route)}
+        worker_vehicle = copy(vehicle)
+        worker_vehicle.route = list(vehicle.route)
+        evaluated, accepted = TwoOpt.delta_two_opt(vehicle=worker_vehicle, distance_matrix=distance_matrix,
+                                                   best_improvement=best_improvement, neighbor_k=neighbor_k,
+                                                   deadline=deadline)
+        order = [positions[id(node)] for node in worker_vehicle.route]
+        expired = deadline is not None and deadline.expired
+        return order, worker_vehicle.route_distance, evaluated, accepted, expired
+
+    @staticmethod
+    def two_opt_vehicles(vehicles: list[Vehicle],
+                         distance_matrix: np.ndarray,
+                         workers: int,
+                         executor: str = 'process',
+                         best_improvement: bool = False,
+                         neighbor_k: int = None,
+                         deadline: Deadline = None) -> tuple[int, int]:
+        """Apply 2-opt to all vehicles on a pool of workers
+
+        Args:
+            vehicles (list[Vehicle]): The vehicles
+            distance_matrix (np.ndarray): The distance matrix
+            workers (int): The number of workers
+            executor (str): The pool type, process or thread
+            best_improvement (bool): The best improvement flag of the 2-opt
+            neighbor_k (int): The neighbor list size of the 2-opt
+            deadline (Deadline): The deadline of the 2-opt, marked expired if it cut a worker short
+
+        Returns:
+            tuple[int, int]: The number of moves evaluated and the number of moves accepted over all vehicles
+        """
+        if executor == 'thread':
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(lambda vehicle: ParallelTwoOpt.two_opt_order(
+                    vehicle=vehicle, distance_matrix=distance_matrix, best_improvement=best_improvement,
+                    neighbor_k=neighbor_k, deadline=deadline), vehicles))
+        elif executor == 'process':
+            source, block = ParallelTwoOpt.get_matrix_source(distance_matrix=distance_matrix)
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=ParallelTwoOpt.initialize_worker,
+                                         initargs=(source,)) as pool:
+                    results = list(pool.map(ParallelTwoOpt.improve_route, vehicles,
+                                            [best_improvement] * len(vehicles), [neighbor_k] * len(vehicles),
+                                            [deadline] * len(vehicles)))
+            finally:
+                if block is not None:
+                    block.close()
+                    block.unlink()
+        else:
+            raise ValueError(f"Unknown executor: {executor}")
+
+        for vehicle, (order, route_distance, _, _, _) in zip(vehicles, results):
+            vehicle.route = [vehicle.route[position] for position in order]
+            vehicle.set_route_sequence()
+            vehicle.route_distance = route_distance
+        if deadline is not None and any(result[4] for result in results):
+            deadline.expired = True
+        return sum(result[2] for result in results), sum(result[3] for result in results)
@@ -0,0 +1,288 @@
+import math
+
+import numpy as np
+
+from src.models.benefit import Benefit
+from src.models.benefit_table import BenefitTable
+from src.methods.distance_matrix import DistanceMatrix
+
+
+class SpatialIndex:
+    """A uniform grid over a set of points that answers k nearest point queries.
+
+    The cells are squares sized so that a cell holds about points_per_cell points. A query looks at the square of
+    cells around the cell of a point and grows it ring by ring until the k-th nearest point found is closer than
+    the edge of the square, so the result is exact. Points can be removed, e.g. the seeds of dropped clusters."""
+
+    def __init__(self, coordinates: np.ndarray, points_per_cell: int = 2):
+        """
+        Args:
+            coordinates (np.ndarray): The (n, 2) array of point coordinates
+            points_per_cell (int): The average number of points per cell
+        """
+        self.coordinates = np.ascontiguousarray(coordinates, dtype=np.float64)
+        self.active = np.ones(len(self.coordinates), dtype=bool)
+        self.origin = self.coordinates.min(axis=0)
+        extent = float((self.coordinates.max(axis=0) - self.origin).max())
+        self.shape = max(1, math.ceil(math.sqrt(len(self.coordinates) / points_per_cell)))
+        self.cell_size = extent / self.shape if extent > 0 else 1.0
+        self.cells = {}
+        for index, cell in enumerate(map(tuple, self.get_cells(points=self.coordinates).tolist())):
+            self.cells.setdefault(cell, []).append(index)
+
+    @property
+    def size(self) -> int:
+        """The number of points in the index"""
+        return int(self.active.sum())
+
+    def get_cells(self, points: np.ndarray) -> np.ndarray:
+        """Get the grid cells of points, points outside the grid get the nearest border cell
+
+        Args:
+            points (np.ndarray): The (m, 2) array of point coordinates
+
+        Returns:
+            np.ndarray: The (m, 2) array of cell indices
+        """
+        cells = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, self.shape - 1)
+
+    def remove(self, index: int) -> None:
+        """Remove a point from the index
+
+        Args:
+            index (int): The index of the point
+        """
+        self.active[index] = False
+        self.cells[tuple(self.get_cells(points=self.coordinates[index:index + 1])[0].tolist())].remove(index)
+
+    def query(self, points: np.ndarray, k: int) -> np.ndarray:
+        """Find the k nearest indexed points of each point, ties go to the lower index
+
+        Args:
+            points (np.ndarray): The (m, 2) array of query coordinates
+            k (int): The number of nearest points, at most the number of points in the index
+
+        Returns:
+            np.ndarray: The (m, k) array of point indices, nearest first
+        """
+        points = np.asarray(points, dtype=np.float64)
+        nearest = np.empty((len(points), k), dtype=np.intp)
+        query_cells = self.get_cells(points=points)
+        order = np.lexsort((query_cells[:, 1], query_cells[:, 0]))
+        groups = np.flatnonzero(np.any(np.diff(query_cells[order], axis=0) != 0, axis=1)) + 1
+        for group in np.split(order, groups):
+            cell_x, cell_y = query_cells[group[0]].tolist()
+            pending = group
+            radius = 0
+            while len(pending):
+                low_x, high_x = max(cell_x - radius, 0), min(cell_x + radius, self.shape - 1)
+                low_y, high_y = max(cell_y - radius, 0), min(cell_y + radius, self.shape - 1)
+                whole_grid = low_x == 0 and low_y == 0 and high_x == self.shape - 1 and high_y == self.shape - 1
+                candidates = [index for x in range(low_x, high_x + 1) for y in range(low_y, high_y + 1)
+                              for index in self.cells.get((x, y), ())]
+                if len(candidates) >= k:
+                    candidates = np.sort(np.asarray(candidates, dtype=np.intp))
+                    delta = points[pending, np.newaxis, :] - self.coordinates[np.newaxis, candidates, :]
+                    distances = np.sqrt((delta * delta).sum(axis=2))
+                    ranked = np.argsort(distances, axis=1, kind='stable')[:, :k]
+                    kth_distances = np.take_along_axis(distances, ranked[:, -1:], axis=1)[:, 0]
+                    # The square of cells covers every point closer than the distance to its edge
+                    low = self.origin + np.array([low_x, low_y]) * self.cell_size
+                    high = self.origin + np.array([high_x + 1, high_y + 1]) * self.cell_size
+                    edges = np.concatenate([points[pending] - low, high - points[pending]], axis=1)
+                    edges[:, [low_x == 0, low_y == 0, high_x == self.shape - 1, high_y == self.shape - 1]] = np.inf
+                    done = whole_grid | (kth_distances <= edges.min(axis=1))
+                    nearest[pending[done]] = candidates[ranked[done]]
+                    pending = pending[~done]
+                radius += 1
+        return nearest
+
+
+class CandidateBenefitTable(BenefitTable):
+    """A benefit table that only scores the seed_k nearest seeds of every node, found with a SpatialIndex.
+
+    The values and the ranking hold the seed_k candidate clusters of each node from the best to the worst benefit.
+    A node is only scored for all clusters when its candidates are full, see get_costs.
+    Nearest neighbor benefits rank the nearest seeds first, so the candidates are the best clusters; savings are
+    ranked within the nearest seeds, which keeps the clusters compact."""
+
+    partial = True
+
+    def __init__(self, node_ids: list[int], cluster_nos: list[int], node_coordinates: np.ndarray,
+                 seed_ids: list[int], seed_coordinates: np.ndarray, distance_matrix, depot_id: int, ascending: bool,
+                 seed_k: int):
+        """
+        Args:
+            node_ids (list[int]): The node ids of the rows
+            cluster_nos (list[int]): The cluster numbers of the columns
+            node_coordinates (np.ndarray): The (n, 2) coordinates of the nodes
+            seed_ids (list[int]): The seed node id of each cluster
+            seed_coordinates (np.ndarray): The (clusters, 2) coordinates of the seed nodes
+            distance_matrix (np.ndarray | DistanceProvider): The distance matrix
+            depot_id (int): The depot node id
+            ascending (bool): Nearest neighbor benefits if set, savings otherwise
+            seed_k (int): The number of candidate clusters per node
+        """
+        super().__init__(node_ids=node_ids, cluster_nos=list(cluster_nos), ascending=ascending)
+        self.node_coordinates = node_coordinates
+        self.seed_ids = list(seed_ids)
+        self.node_id_array = np.asarray(node_ids, dtype=np.intp)
+        self.seed_id_array = np.asarray(seed_ids, dtype=np.intp)
+        self.distance_matrix = distance_matrix
+        self.depot_id = depot_id
+        self.seed_k = seed_k
+        self.index = SpatialIndex(coordinates=seed_coordinates)
+        self.seed_columns = np.arange(len(seed_ids))
+        self.seed_to_depot = DistanceMatrix.get_submatrix(distance_matrix=distance_matrix, row_ids=self.seed_ids,
+                                                          column_ids=[depot_id])[:, 0]
+        self.depot_to_node = DistanceMatrix.get_submatrix(distance_matrix=distance_matrix, row_ids=[depot_id],
+                                                          column_ids=node_ids)[0]
+        self.ranking = np.empty((len(node_ids), 0), dtype=np.intp)
+        self.values = np.empty((len(node_ids), 0))
+        self.set_candidates(rows=np.arange(len(node_ids)))
+
+    def get_benefits(self, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """Get the benefits of the nodes of rows for the clusters of columns, pair by pair
+
+        Args:
+            rows (np.ndarray): The (m, k) rows
+            columns (np.ndarray): The (m, k) columns
+
+        Returns:
+            np.ndarray: The (m, k) benefits
+        """
+        node_ids = self.node_id_array[rows]
+        seed_ids = self.seed_id_array[columns]
+        if isinstance(self.distance_matrix, np.ndarray):
+            distances = self.distance_matrix[node_ids, seed_ids].astype(np.float64)
+        else:
+            distances = np.array([np.asarray(self.distance_matrix[node_id])[row_seed_ids]
+                                  for node_id, row_seed_ids in zip(node_ids[:, 0].tolist(), seed_ids)],
+                                 dtype=np.float64).reshape(seed_ids.shape)
+        if self.ascending:
+            return distances
+        return self.seed_to_depot[columns] + self.depot_to_node[rows] - distances
+
+    def rank(self, columns: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Sort the columns of each row from the best to the worst benefit, ties go to the lower column
+
+        Args:
+            columns (np.ndarray): The (m, k) columns
+            values (np.ndarray): The (m, k) benefits
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The sorted columns and benefits
+        """
+        order = np.lexsort((columns, values if self.ascending else -values), axis=-1)
+        return np.take_along_axis(columns, order, axis=-1), np.take_along_axis(values, order, axis=-1)
+
+    def set_candidates(self, rows: np.ndarray) -> None:
+        """Find the candidate clusters of rows with the spatial index and score them
+
+        Args:
+            rows (np.ndarray): The rows
+        """
+        k = min(self.seed_k, self.index.size)
+        if k != self.ranking.shape[1]:
+            rows = np.arange(len(self.node_ids))
+            self.ranking = np.empty((len(self.node_ids), k), dtype=np.intp)
+            self.values = np.empty((len(self.node_ids), k))
+        if not len(rows):
+            return
+        columns = self.seed_columns[self.index.query(points=self.node_coordinates[rows], k=k)]
+        values = self.get_benefits(rows=np.repeat(rows[:, np.newaxis], k, axis=1), columns=columns)
+        self.ranking[rows], self.values[rows] = self.rank(columns=columns, values=values)
+
+    def get_ranking(self) -> np.ndarray:
+        """Get the candidate clusters of every node from the best to the worst benefit
+
+        Returns:
+            np.ndarray: The (nodes, seed_k) array of column indices
+        """
+        return self.ranking
+
+    def get_ranked_values(self, row: int) -> np.ndarray:
+        """Get the benefits of the candidates of a node from the best to the worst
+
+        Args:
+            row (int): The row of the node
+
+        Returns:
+            np.ndarray: The benefits
+        """
+        return self.values[row]
+
+    def get_costs(self, row: int) -> np.ndarray:
+        """Score a node for all clusters, for the nodes none of whose candidates fits any more
+
+        Args:
+            row (int): The row of the node
+
+        Returns:
+            np.ndarray: The benefit of each cluster column as a cost, lower is better
+        """
+        columns = np.arange(len(self.cluster_nos))[np.newaxis, :]
+        values = self.get_benefits(rows=np.full(columns.shape, row), columns=columns)[0]
+        return values if self.ascending else -values
+
+    def get_ranked_cluster_nos(self, node_id: int) -> list[int]:
+        """Get the cluster numbers of a node, the candidates from the best to the worst benefit and then the others
+
+        Args:
+            node_id (int): The node id
+
+        Returns:
+            list[int]: The ranked cluster numbers
+        """
+        row = self.rows[node_id]
+        candidates = self.ranking[row].tolist()
+        others = set(range(len(self.cluster_nos))) - set(candidates)
+        ranking = np.argsort(self.get_costs(row=row), kind='stable').tolist()
+        columns = candidates + [column for column in ranking if column in others]
+        return [self.cluster_nos[column] for column in columns]
+
+    def get_best_benefit(self, node_id: int) -> float:
+        """Get the best benefit of a node among its candidates
+
+        Args:
+            node_id (int): The node id
+
+        Returns:
+            float: The best benefit
+        """
+        return self.values[self.rows[node_id]][0]
+
+    def drop_cluster(self, cluster_no: int) -> None:
+        """Drop the column of a cluster, the nodes that had it as a candidate get the next nearest seed instead
+
+        Args:
+            cluster_no (int): The cluster number
+        """
+        column = self.cluster_nos.index(cluster_no)
+        seed = int(np.flatnonzero(self.seed_columns == column)[0])
+        self.index.remove(index=seed)
+        self.seed_columns[seed] = -1
+        affected = np.flatnonzero((self.ranking == column).any(axis=1))
+        self.seed_columns = np.where(self.seed_columns > column, self.seed_columns - 1, self.seed_columns)
+        self.ranking = np.where(self.ranking > column, self.ranking - 1, self.ranking)
+        self.cluster_nos = self.cluster_nos[:column] + self.cluster_nos[column + 1:]
+        self.seed_ids = self.seed_ids[:column] + self.seed_ids[column + 1:]
+        self.seed_id_array = np.delete(self.seed_id_array, column)
+        self.seed_to_depot = np.delete(self.seed_to_depot, column)
+        self.set_candidates(rows=affected)
+
+    def to_benefits(self) -> dict[str, dict]:
+        """Convert to the dictionary of Benefit lists used by Calculations.calculate_*_benefits. Every cluster is
+        scored, not only the candidates, so the dictionary is the same as the one of a full table
+
+        Returns:
+            dict[str, dict]: The dictionary of benefits
+        """
+        columns = np.arange(len(self.cluster_nos))
+        benefits = {"node_ids": {}}
+        for row, node_id in enumerate(self.node_ids):
+            values = self.get_benefits(rows=np.full((1, len(columns)), row), columns=columns[np.newaxis, :])[0]
+            benefits["node_ids"][node_id] = [Benefit(cluster_no=cluster_no, distance=distance)
+                                             for cluster_no, distance in zip(self.cluster_nos, values.tolist())]
+        return benefits
@@ -1,10 +1,13 @@
 import numpy as np
+from collections import deque
 from dataclasses import dataclass
-from copy import deepcopy
 
 from src.models.node import Node
 from src.models.vehicle import Vehicle
+from src.models.route_loads import RouteLoads
+from src.utils.deadline import Deadline
 from src.methods.calculations import Calculations
+from src.methods.distance_matrix import DistanceMatrix
 
 
 @dataclass
@@ -12,6 +15,8 @@ class TwoOpt:
     """The 2-opt algorithm is a local search algorithm commonly used to improve
     solutions for the Traveling Salesman Problem (TSP). It iteratively performs
     a series of node swaps to reduce the total route distance."""
+    TIE_TOLERANCE = 1e-6
+
     @staticmethod
     def two_opt_swap(route: list[Node], index_1: int, index_2: int) -> list[Node]:
         """Swap two nodes in a route
@@ -35,7 +40,7 @@ class TwoOpt:
             vehicle (Vehicle): The vehicle
             distance_matrix (np.ndarray): The distance matrix
         """
-        route = deepcopy(vehicle.route)
+        route = list(vehicle.route)
         current_distance = Calculations.calculate_route_distance(nodes=route, distance_matrix=distance_matrix)
         improved = True
 
@@ -56,3 +61,221 @@ class TwoOpt:
         vehicle.route = route
         vehicle.set_route_sequence()
         vehicle.route_distance = current_distance
+
+    @staticmethod
+    def delta_two_opt(vehicle: Vehicle,
+                      distance_matrix: np.ndarray,
+                      best_improvement: bool = False,
+                      neighbor_k: int = None,
+                      deadline: Deadline = None) -> tuple[int, int]:
+        """Apply the 2-opt algorithm to a route with constant time move evaluation
+
+        A move is scored by the change of its two replaced edges and checked with the route loads, see RouteLoads,
+        the route is only reversed when a move is accepted. With first improvement the moves are
+        scanned in the same order as two_opt, and moves whose delta is within rounding noise of zero
+        are decided by re-summing the route as two_opt does, so the same local optimum is returned.
+
+        Args:
+            vehicle (Vehicle): The vehicle
+            distance_matrix (np.ndarray): The distance matrix
+            best_improvement (bool): Apply the best move of each pass instead of the first improving one
+            neighbor_k (int): If given, restrict the search to the neighbor_k nearest neighbors of each node
+                (see neighbor_two_opt)
+            deadline (Deadline): Stop at the deadline, the route keeps the improving moves applied until then
+
+        Returns:
+            tuple[int, int]: The number of moves evaluated and the number of moves accepted
+        """
+        if neighbor_k:
+            return TwoOpt.neighbor_two_opt(vehicle=vehicle, distance_matrix=distance_matrix, neighbor_k=neighbor_k,
+                                           deadline=deadline)
+        route = list(vehicle.route)
+        route_length = len(route)
+        ids = [0] + [node.id for node in route]
+        distances = DistanceMatrix.get_submatrix(distance_matrix=distance_matrix, row_ids=ids, column_ids=ids).tolist()
+        # Route positions are shifted by one, position 0 and route_length + 1 are the depot
+        tour = [0] + list(range(1, route_length + 1)) + [0]
+        loads = RouteLoads(route=route, capacity=vehicle.capacity)
+        current_distance = Calculations.calculate_route_distance(nodes=route, distance_matrix=distance_matrix)
+        tolerance = TwoOpt.TIE_TOLERANCE * max(current_distance, 1)
+        evaluated, accepted = 0, 0
+        improved = True
+
+        while improved:
+            improved = False
+            best_move, best_delta = None, 0
+            for index_1 in range(0, route_length - 1):
+                if deadline is not None and deadline.reached():
+                    break
+                evaluated += route_length - index_1 - 1
+                for index_2 in range(index_1 + 1, route_length):
+                    previous_node, first_node = tour[index_1], tour[index_1 + 1]
+                    last_node, next_node = tour[index_2 + 1], tour[index_2 + 2]
+                    delta = (distances[previous_node][last_node] + distances[first_node][next_node]
+                             - distances[previous_node][first_node] - distances[last_node][next_node])
+                    if delta >= tolerance or (best_improvement and delta >= min(best_delta, -tolerance)):
+                        continue
+                    if not loads.is_reversal_feasible(index_1=index_1, index_2=index_2):
+                        continue
+                    if best_improvement:
+                        best_move, best_delta = (index_1, index_2), delta
+                        continue
+                    if delta > -tolerance:
+                        new_distance = Calculations.calculate_route_distance(
+                            nodes=TwoOpt.two_opt_swap(route=route, index_1=index_1, index_2=index_2),
+                            distance_matrix=distance_matrix)
+                        if not new_distance < current_distance:
+                            continue
+                    TwoOpt.apply_swap(route=route, tour=tour, index_1=index_1, index_2=index_2)
+                    loads.reverse(index_1=index_1, index_2=index_2)
+                    current_distance = Calculations.calculate_route_distance(nodes=route,
+                                                                             distance_matrix=distance_matrix)
+                    tolerance = TwoOpt.TIE_TOLERANCE * max(current_distance, 1)
+                    improved = True
+                    accepted += 1
+            if best_move:
+                TwoOpt.apply_swap(route=route, tour=tour, index_1=best_move[0], index_2=best_move[1])
+                loads.reverse(index_1=best_move[0], index_2=best_move[1])
+                current_distance = Calculations.calculate_route_distance(nodes=route, distance_matrix=distance_matrix)
+                tolerance = TwoOpt.TIE_TOLERANCE * max(current_distance, 1)
+                improved = True
+                accepted += 1
+
+        vehicle.route = route
+        vehicle.set_route_sequence()
+        vehicle.route_distance = current_distance
+        return evaluated, accepted
+
+    @staticmethod
+    def apply_swap(route: list[Node], tour: list[int], index_1: int, index_2: int) -> None:
+        """Reverse route[index_1:index_2 + 1] in place, together with the depot-padded tour positions
+
+        Args:
+            route (list[Node]): The route
+            tour (list[int]): The route positions padded with the depot at both ends
+            index_1 (int): The first index of the reversed segment
+            index_2 (int): The last index of the reversed segment
+        """
+        route[index_1:index_2 + 1] = route[index_1:index_2 + 1][::-1]
+        tour[index_1 + 1:index_2 + 2] = tour[index_1 + 1:index_2 + 2][::-1]
+
+    @staticmethod
+    def neighbor_two_opt(vehicle: Vehicle, distance_matrix: np.ndarray, neighbor_k: int,
+                         deadline: Deadline = None) -> tuple[int, int]:
+        """Apply the 2-opt algorithm restricted to K-nearest neighbor candidates with don't-look bits
+
+        The candidate lists are built once per route from the distance matrix and hold the neighbor_k nearest
+        nodes of the same route, the nearest nodes of the whole instance mostly belong to other routes.
+        For a node a, only moves that create an edge (a, c) for a candidate c are tried, and only while d(a, c)
+        is shorter than the edge of a that the move removes. Nodes without an improving move are not looked at
+        again until a move changes one of their edges.
+
+        Args:
+            vehicle (Vehicle): The vehicle
+            distance_matrix (np.ndarray): The distance matrix
+            neighbor_k (int): The number of candidates per node
+            deadline (Deadline): Stop at the deadline, the route keeps the improving moves applied until then
+
+        Returns:
+            tuple[int, int]: The number of moves evaluated and the number of moves accepted
+        """
+        route = list(vehicle.route)
+        route_length = len(route)
+        # Local ids follow the route positions, the depot is both 0 (start) and route_length + 1 (end)
+        ids = [0] + [node.id for node in route] + [0]
+        distances = DistanceMatrix.get_submatrix(distance_matrix=distance_matrix, row_ids=ids, column_ids=ids)
+        candidates = TwoOpt.get_candidate_lists(distances=distances, neighbor_k=neighbor_k)
+        distances = distances.tolist()
+        tour = list(range(route_length + 2))
+        positions = list(range(route_length + 2))
+        loads = RouteLoads(route=route, capacity=vehicle.capacity)
+        tolerance = TwoOpt.TIE_TOLERANCE * max(vehicle.route_distance, 1)
+        queue = deque(range(route_length + 2))
+        queued = [True] * (route_length + 2)
+        evaluated, accepted = 0, 0
+
+        while queue:
+            if deadline is not None and deadline.reached():
+                break
+            node = queue.popleft()
+            queued[node] = False
+            move, node_evaluated = TwoOpt.find_neighbor_move(tour=tour, positions=positions, distances=distances,
+                                                             candidates=candidates, node=node, loads=loads,
+                                                             tolerance=tolerance)
+            evaluated += node_evaluated
+            if move is None:
+                continue
+            accepted += 1
+            index_1, index_2 = move
+            endpoints = (tour[index_1 - 1], tour[index_1], tour[index_2], tour[index_2 + 1])
+            TwoOpt.apply_swap(route=route, tour=tour, index_1=index_1 - 1, index_2=index_2 - 1)
+            loads.reverse(index_1=index_1 - 1, index_2=index_2 - 1)
+            for position in range(index_1, index_2 + 1):
+                positions[tour[position]] = position
+            for endpoint in (node,) + endpoints:
+                if not queued[endpoint]:
+                    queue.append(endpoint)
+                    queued[endpoint] = True
+
+        vehicle.route = route
+        vehicle.set_route_sequence()
+        vehicle.route_distance = Calculations.calculate_route_distance(nodes=route, distance_matrix=distance_matrix)
+        return evaluated, accepted
+
+    @staticmethod
+    def get_candidate_lists(distances: np.ndarray, neighbor_k: int) -> list[list[int]]:
+        """Get the neighbor_k nearest route nodes of every local id, nearest first
+
+        Args:
+            distances (np.ndarray): The route distances, local id 0 and the last local id are the depot
+            neighbor_k (int): The number of candidates per node
+
+        Returns:
+            list[list[int]]: The candidate local ids of every local id, the depot is never a candidate
+        """
+        no_of_route_nodes = len(distances) - 2
+        if no_of_route_nodes < 1:
+            return [[] for _ in range(len(distances))]
+        route_distances = np.asarray(distances, dtype=np.float64)[:, 1:-1].copy()
+        route_distances[np.arange(1, no_of_route_nodes + 1), np.arange(no_of_route_nodes)] = np.inf
+        k = min(neighbor_k, no_of_route_nodes)
+        nearest = np.argsort(route_distances, axis=1, kind='stable')[:, :k] + 1
+        return [[int(candidate) for candidate in row if candidate != local_id]
+                for local_id, row in enumerate(nearest)]
+
+    @staticmethod
+    def find_neighbor_move(tour: list[int], positions: list[int], distances: list[list[float]],
+                           candidates: list[list[int]], node: int, loads: RouteLoads,
+                           tolerance: float) -> tuple[tuple[int, int] | None, int]:
+        """Find the first improving and feasible neighbor move around a node
+
+        Returns:
+            tuple[tuple[int, int] | None, int]: The tour positions of the segment to reverse, None if there is no
+                such move, and the number of moves evaluated
+        """
+        position = positions[node]
+        evaluated = 0
+        for direction in (1, -1):
+            if not 0 <= position + direction < len(tour):
+                continue
+            adjacent_distance = distances[node][tour[position + direction]]
+            for candidate in candidates[node]:
+                if distances[node][candidate] >= adjacent_distance:
+                    break
+                candidate_position = positions[candidate]
+                if direction == 1:
+                    if candidate_position <= position + 1:
+                        continue
+                    index_1, index_2 = position + 1, candidate_position
+                else:
+                    if candidate_position >= position - 1:
+                        continue
+                    index_1, index_2 = candidate_position, position - 1
+                evaluated += 1
+                previous_node, first_node = tour[index_1 - 1], tour[index_1]
+                last_node, next_node = tour[index_2], tour[index_2 + 1]
+                delta = (distances[previous_node][last_node] + distances[first_node][next_node]
+                         - distances[previous_node][first_node] - distances[last_node][next_node])
+                if delta < -tolerance and loads.is_reversal_feasible(index_1=index_1 - 1, index_2=index_2 - 1):
+                    return (index_1, index_2), evaluated
+        return None, evaluated
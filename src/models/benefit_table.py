@@ -0,0 +1,104 @@
+import numpy as np
+from pydantic import Field
+from dataclasses import dataclass
+
+from src.models.benefit import Benefit
+
+
+@dataclass
+class BenefitTable:
+    """The benefits of all (node, cluster) pairs as one array, values[row][column] is the benefit of
+    node_ids[row] for cluster_nos[column]. Nearest neighbor benefits rank ascending, savings descending."""
+    node_ids: list[int] = Field(default_factory=list)
+    cluster_nos: list[int] = Field(default_factory=list)
+    values: np.ndarray = None
+    ascending: bool = True
+
+    # The rows hold every cluster, see CandidateBenefitTable for a table that only holds the nearest ones
+    partial = False
+
+    def __post_init__(self):
+        self.rows = {node_id: row for row, node_id in enumerate(self.node_ids)}
+        self.ranking = None
+
+    def get_ranking(self) -> np.ndarray:
+        """Rank the clusters of every node from the best to the worst benefit, ties keep the cluster order
+
+        Returns:
+            np.ndarray: The (nodes, clusters) array of column indices
+        """
+        if self.ranking is None:
+            keys = self.values if self.ascending else -self.values
+            self.ranking = np.argsort(keys, axis=1, kind='stable')
+        return self.ranking
+
+    def get_ranked_columns(self, row: int) -> np.ndarray:
+        """Get the clusters of a node from the best to the worst benefit
+
+        Args:
+            row (int): The row of the node
+
+        Returns:
+            np.ndarray: The column indices
+        """
+        return self.get_ranking()[row]
+
+    def get_ranked_values(self, row: int) -> np.ndarray:
+        """Get the benefits of a node from the best to the worst, in the order of get_ranked_columns
+
+        Args:
+            row (int): The row of the node
+
+        Returns:
+            np.ndarray: The benefits
+        """
+        return self.values[row][self.get_ranking()[row]]
+
+    def get_ranked_cluster_nos(self, node_id: int) -> list[int]:
+        """Get the cluster numbers of a node from the best to the worst benefit
+
+        Args:
+            node_id (int): The node id
+
+        Returns:
+            list[int]: The ranked cluster numbers
+        """
+        ranking = self.get_ranking()[self.rows[node_id]]
+        return [self.cluster_nos[column] for column in ranking]
+
+    def get_best_benefit(self, node_id: int) -> float:
+        """Get the best benefit of a node
+
+        Args:
+            node_id (int): The node id
+
+        Returns:
+            float: The best benefit
+        """
+        row = self.rows[node_id]
+        return self.values[row][self.get_ranking()[row][0]]
+
+    def drop_cluster(self, cluster_no: int) -> None:
+        """Drop the column of a cluster, the ranking is kept by removing the column from each row
+
+        Args:
+            cluster_no (int): The cluster number
+        """
+        column = self.cluster_nos.index(cluster_no)
+        ranking = self.get_ranking()
+        ranking = ranking[ranking != column].reshape(len(self.node_ids), len(self.cluster_nos) - 1)
+        self.ranking = ranking - (ranking > column)
+        self.values = np.delete(self.values, column, axis=1)
+        self.cluster_nos = self.cluster_nos[:column] + self.cluster_nos[column + 1:]
+
+    def to_benefits(self) -> dict[str, dict]:
+        """Convert to the dictionary of Benefit lists used by Calculations.calculate_*_benefits
+
+        Returns:
+            dict[str, dict]: The dictionary of benefits
+        """
+        benefits = {"node_ids": {}}
+        for node_id, row in zip(self.node_ids, self.values.tolist()):
+            benefits["node_ids"][node_id] = [Benefit(cluster_no=cluster_no, distance=distance)
+                                             for cluster_no, distance in zip(self.cluster_nos, row)]
+        return benefits
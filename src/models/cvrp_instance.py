@@ -0,0 +1,19 @@
+import numpy as np
+from pydantic import Field
+from dataclasses import dataclass
+
+
+@dataclass
+class CVRPInstance:
+    """A parsed CVRPLIB instance, row i of the arrays belongs to node i and node 0 is the depot"""
+    name: str = None
+    dimension: int = 0
+    capacity: int = None
+    edge_weight_type: str = None
+    depot_ids: list[int] = Field(default_factory=list)
+    coordinates: np.ndarray = None
+    demand: np.ndarray = None
+
+    @property
+    def no_of_customers(self) -> int:
+        return self.dimension - 1
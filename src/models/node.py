@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from src.models.location import Location
 
 
-@dataclass
+@dataclass(slots=True)
 class Node:
     id: int = None
     location: Location = None
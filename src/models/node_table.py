@@ -0,0 +1,135 @@
+import math
+import numpy as np
+from dataclasses import dataclass
+
+from src.models.node import Node
+from src.models.location import Location
+
+
+class NodeView(Node):
+    """A Node that reads its location, demand, type and polar angle from its row of a NodeTable, the nodes of an
+    instance share the table arrays instead of holding their own copies of the fields. Views are read only"""
+    __slots__ = ('table',)
+
+    def __init__(self, table: 'NodeTable', node_id: int):
+        self.table = table
+        self.id = node_id
+
+    def __reduce__(self):
+        return NodeView, (self.table, self.id)
+
+    @property
+    def location(self) -> Location:
+        return Location(lat=self.table.coordinate_view[self.id, 0], lon=self.table.coordinate_view[self.id, 1])
+
+    @property
+    def demand(self) -> int:
+        return self.table.demand_view[self.id]
+
+    @property
+    def node_type(self) -> str:
+        return NodeTable.NODE_TYPES[self.table.node_type_view[self.id]]
+
+    @property
+    def polar_angle(self) -> float:
+        return self.table.polar_angle_view[self.id]
+
+
+@dataclass
+class NodeTable:
+    """The nodes of an instance as contiguous arrays indexed by node id.
+    Node Types: 1 - Depot, 2 - Pickup, 3 - Delivery"""
+    coordinates: np.ndarray = None
+    demand: np.ndarray = None
+    node_type: np.ndarray = None
+    polar_angle: np.ndarray = None
+
+    DEPOT = 1
+    PICKUP = 2
+    DELIVERY = 3
+    NODE_TYPES = {DEPOT: 'depot', PICKUP: 'pickup', DELIVERY: 'delivery'}
+
+    def __post_init__(self):
+        if self.polar_angle is None:
+            self.polar_angle = np.zeros(len(self.coordinates), dtype=np.float64)
+        self.set_views()
+
+    def set_views(self) -> None:
+        """Set the memoryviews the NodeView objects read from, indexing them gives Python numbers without copying
+        the arrays"""
+        self.coordinate_view = memoryview(self.coordinates)
+        self.demand_view = memoryview(self.demand)
+        self.node_type_view = memoryview(self.node_type)
+        self.polar_angle_view = memoryview(self.polar_angle)
+
+    def __getstate__(self) -> dict:
+        return {name: getattr(self, name) for name in ('coordinates', 'demand', 'node_type', 'polar_angle')}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.set_views()
+
+    def __len__(self) -> int:
+        return len(self.coordinates)
+
+    @property
+    def lat(self) -> np.ndarray:
+        return self.coordinates[:, 0]
+
+    @property
+    def lon(self) -> np.ndarray:
+        return self.coordinates[:, 1]
+
+    @staticmethod
+    def create(coordinates: np.ndarray, demand: np.ndarray, no_of_pickups: int) -> 'NodeTable':
+        """Create the node table, node 0 is the depot and the next no_of_pickups nodes are the pickups
+
+        Args:
+            coordinates (np.ndarray): The (n, 2) array of (lat, lon) coordinates
+            demand (np.ndarray): The demands
+            no_of_pickups (int): The number of pickups
+
+        Returns:
+            NodeTable: The node table
+        """
+        node_type = np.full(len(coordinates), NodeTable.DELIVERY, dtype=np.int8)
+        node_type[0] = NodeTable.DEPOT
+        node_type[1:no_of_pickups + 1] = NodeTable.PICKUP
+        return NodeTable(coordinates=np.ascontiguousarray(coordinates, dtype=np.float64),
+                         demand=np.ascontiguousarray(demand, dtype=np.int64),
+                         node_type=node_type)
+
+    def set_polar_angles(self, depot_id: int = 0) -> None:
+        """Set the polar angles of all nodes around the depot in place, the depot keeps 0
+
+        The angles equal Calculations.calculate_polar_angle, atan2 is evaluated with math.atan2 because
+        np.arctan2 can differ from it in the last bit, which would change the sweep order of ties.
+
+        Args:
+            depot_id (int): The depot node id
+        """
+        delta_lon = (self.lon[depot_id] - self.lon).tolist()
+        delta_lat = (self.lat[depot_id] - self.lat).tolist()
+        radian = np.fromiter(map(math.atan2, delta_lon, delta_lat), dtype=np.float64, count=len(self))
+        angle = np.degrees(radian)
+        self.polar_angle[:] = np.where(angle >= 0, angle, angle + 360)
+        self.polar_angle[depot_id] = 0
+
+    def get_total_demand(self, node_type: int) -> int:
+        """Get the total demand of the nodes of a type
+
+        Args:
+            node_type (int): The node type code
+
+        Returns:
+            int: The total demand
+        """
+        return int(self.demand[self.node_type == node_type].sum())
+
+    def to_nodes(self) -> list[Node]:
+        """Create the node views of the table
+
+        Returns:
+            list[Node]: The NodeView objects, nodes[i].id == i
+        """
+        return [NodeView(table=self, node_id=node_id) for node_id in range(len(self))]
@@ -0,0 +1,259 @@
+import itertools
+
+from src.models.node import Node
+
+
+class RouteLoads:
+    """The load profile of a route, for constant time capacity checks of route changes.
+
+    A vehicle leaves the depot with the demand of all deliveries of its route on board, drops the demand of each
+    delivery and takes on the demand of each pickup, so a route can hold any number of pickups. With net[i] the load
+    change over the first i nodes, the load after them is start_load + net[i], and the route is feasible while its
+    highest load fits the capacity. The prefix and suffix maxima of net and sparse tables of its range minima and
+    maxima tell in O(1) whether replacing a segment of the route (an insertion, a removal or a swap) or reversing
+    one keeps it feasible. A reversal is applied in place, the other changes rebuild the profile with set_route.
+
+    The maxima and the range tables are built on first use. A route with at most one pickup, the common case of
+    2-opt, checks and applies reversals from the prefix loads and the pickup position alone and never builds them."""
+
+    def __init__(self, route: list[Node], capacity: int):
+        """
+        Args:
+            route (list[Node]): The route
+            capacity (int): The capacity of the vehicle
+        """
+        self.capacity = capacity
+        self.set_route(route=route)
+
+    def set_route(self, route: list[Node]) -> None:
+        """Build the profile of a route
+
+        Args:
+            route (list[Node]): The route
+        """
+        self.delivered, self.picked, self.net = [0], [0], [0]
+        self.pickup_positions = []
+        for index, node in enumerate(route):
+            if node.node_type == 'pickup':
+                self.pickup_positions.append(index)
+                self.delivered.append(self.delivered[-1])
+                self.picked.append(self.picked[-1] + node.demand)
+            else:
+                self.delivered.append(self.delivered[-1] + node.demand)
+                self.picked.append(self.picked[-1])
+            self.net.append(self.picked[-1] - self.delivered[-1])
+        self.start_load = self.delivered[-1]
+        self.maxima = None
+        self.ranges = None
+        self.feasible = None
+
+    def get_maxima(self) -> tuple[list[int], list[int]]:
+        """Get the prefix and suffix maxima of net, built on first use
+
+        Returns:
+            tuple[list[int], list[int]]: The prefix maxima and the suffix maxima
+        """
+        if self.maxima is None:
+            prefix_max = list(itertools.accumulate(self.net, max))
+            suffix_max = list(itertools.accumulate(reversed(self.net), max))[::-1]
+            self.maxima = prefix_max, suffix_max
+        return self.maxima
+
+    @property
+    def prefix_max(self) -> list[int]:
+        """The highest net[0..i] of every profile position i"""
+        return self.get_maxima()[0]
+
+    @property
+    def suffix_max(self) -> list[int]:
+        """The highest net[i..] of every profile position i"""
+        return self.get_maxima()[1]
+
+    def get_ranges(self) -> tuple[list[list[int]], list[list[int]]]:
+        """Get the sparse tables of the range minima and maxima of net, built on first use. Level l holds the
+        minimum and maximum of net[i..i + 2^l - 1] of every position i
+
+        Returns:
+            tuple[list[list[int]], list[list[int]]]: The range minima and the range maxima tables
+        """
+        if self.ranges is None:
+            range_min, range_max = [list(self.net)], [list(self.net)]
+            width = 1
+            while 2 * width <= len(self.net):
+                minima, maxima = range_min[-1], range_max[-1]
+                range_min.append(list(map(min, minima[:-width], minima[width:])))
+                range_max.append(list(map(max, maxima[:-width], maxima[width:])))
+                width *= 2
+            self.ranges = range_min, range_max
+        return self.ranges
+
+    @property
+    def range_min(self) -> list[list[int]]:
+        """The sparse table of the range minima of net"""
+        return self.get_ranges()[0]
+
+    @property
+    def range_max(self) -> list[list[int]]:
+        """The sparse table of the range maxima of net"""
+        return self.get_ranges()[1]
+
+    def get_range(self, start: int, stop: int) -> tuple[int, int]:
+        """Get the lowest and the highest net[start..stop]
+
+        Args:
+            start (int): The first profile position
+            stop (int): The last profile position
+
+        Returns:
+            tuple[int, int]: The range minimum and maximum
+        """
+        range_min, range_max = self.get_ranges()
+        level = (stop - start + 1).bit_length() - 1
+        other = stop - (1 << level) + 1
+        return (min(range_min[level][start], range_min[level][other]),
+                max(range_max[level][start], range_max[level][other]))
+
+    @property
+    def max_load(self) -> int:
+        """The highest load of the vehicle on the route"""
+        if not self.pickup_positions:
+            return self.start_load
+        if len(self.pickup_positions) == 1:
+            return self.start_load + max(self.net[self.pickup_positions[0] + 1], 0)
+        return self.start_load + self.prefix_max[-1]
+
+    def is_feasible(self) -> bool:
+        """Check if the route fits the capacity
+
+        Returns:
+            bool: True if the highest load fits the capacity, False otherwise
+        """
+        if self.feasible is None:
+            self.feasible = self.max_load <= self.capacity
+        return self.feasible
+
+    def get_segment(self, start: int, end: int, reverse: bool = False) -> tuple[int, int, int]:
+        """Get the delivered demand, the picked up demand and the peak load change of route[start:end + 1]
+
+        Args:
+            start (int): The first index of the segment
+            end (int): The last index of the segment
+            reverse (bool): Describe the segment in reverse order
+
+        Returns:
+            tuple[int, int, int]: The delivered demand, the picked up demand and the highest load change from the
+                start of the segment, at least 0
+        """
+        lowest, highest = self.get_range(start=start, stop=end + 1)
+        peak = self.net[end + 1] - lowest if reverse else highest - self.net[start]
+        return (self.delivered[end + 1] - self.delivered[start], self.picked[end + 1] - self.picked[start], peak)
+
+    @staticmethod
+    def get_node_segment(node: Node) -> tuple[int, int, int]:
+        """Get the delivered demand, the picked up demand and the peak load change of a single node
+
+        Args:
+            node (Node): The node
+
+        Returns:
+            tuple[int, int, int]: The segment of the node, see get_segment
+        """
+        if node.node_type == 'pickup':
+            return 0, node.demand, node.demand
+        return node.demand, 0, 0
+
+    def is_replacement_feasible(self, start: int, end: int, segment: tuple[int, int, int]) -> bool:
+        """Check if replacing route[start:end + 1] with a segment keeps the route feasible. An insertion before
+        position start has end = start - 1 and a removal has the empty segment (0, 0, 0)
+
+        Args:
+            start (int): The first index of the replaced nodes
+            end (int): The last index of the replaced nodes
+            segment (tuple[int, int, int]): The new nodes, see get_segment
+
+        Returns:
+            bool: True if the changed route fits the capacity, False otherwise
+        """
+        delivered, picked, peak = segment
+        start_load = self.start_load - self.delivered[end + 1] + self.delivered[start] + delivered
+        after_load = self.start_load - self.picked[end + 1] + self.picked[start] + picked
+        return max(start_load + self.prefix_max[start], start_load + self.net[start] + peak,
+                   after_load + self.suffix_max[end + 1]) <= self.capacity
+
+    def is_insertion_feasible(self, position: int, node: Node) -> bool:
+        """Check if inserting a node before route[position] keeps the route feasible
+
+        Args:
+            position (int): The insertion position, the length of the route to append
+            node (Node): The node
+
+        Returns:
+            bool: True if the changed route fits the capacity, False otherwise
+        """
+        return self.is_replacement_feasible(start=position, end=position - 1,
+                                            segment=RouteLoads.get_node_segment(node=node))
+
+    def is_reversal_feasible(self, index_1: int, index_2: int) -> bool:
+        """Check if reversing route[index_1:index_2 + 1] keeps the route feasible
+
+        Args:
+            index_1 (int): The first index of the reversed segment
+            index_2 (int): The last index of the reversed segment
+
+        Returns:
+            bool: True if the reversed route fits the capacity, False otherwise
+        """
+        if len(self.pickup_positions) <= 1:
+            if not self.pickup_positions or not index_1 <= self.pickup_positions[0] <= index_2:
+                return self.is_feasible()
+            # The pickup moves within the segment and only the deliveries made before it change
+            position = self.pickup_positions[0]
+            delivered = self.delivered[index_1] + self.delivered[index_2 + 1] - self.delivered[position + 1]
+            return self.start_load + max(self.picked[-1] - delivered, 0) <= self.capacity
+        lowest, _ = self.get_range(start=index_1, stop=index_2 + 1)
+        prefix_max, suffix_max = self.get_maxima()
+        return self.start_load + max(prefix_max[index_1], suffix_max[index_2 + 1],
+                                     self.net[index_1] + self.net[index_2 + 1] - lowest) <= self.capacity
+
+    def reverse(self, index_1: int, index_2: int) -> None:
+        """Update the profile for the reversal of route[index_1:index_2 + 1], only the profile positions within
+        the segment and the maxima and range tables that cover them are recomputed, tables that were not built yet
+        are left to be built on first use
+
+        Args:
+            index_1 (int): The first index of the reversed segment
+            index_2 (int): The last index of the reversed segment
+        """
+        stop = index_2 + 1
+        # A segment of deliveries only keeps the picked up demand and the highest load of the route
+        moves_pickups = any(index_1 <= position <= index_2 for position in self.pickup_positions)
+        for values in (self.delivered, self.picked, self.net) if moves_pickups else (self.delivered, self.net):
+            values[index_1 + 1:stop] = [values[index_1] + values[stop] - value
+                                        for value in values[stop - 1:index_1:-1]]
+        if moves_pickups:
+            self.pickup_positions = sorted(index_1 + index_2 - position if index_1 <= position <= index_2
+                                           else position for position in self.pickup_positions)
+            self.feasible = None
+        if self.maxima is not None:
+            prefix_max, suffix_max = self.maxima
+            for index in range(index_1 + 1, len(self.net)):
+                value = max(prefix_max[index - 1], self.net[index])
+                if index >= stop and value == prefix_max[index]:
+                    break
+                prefix_max[index] = value
+            for index in range(stop - 1, -1, -1):
+                value = max(suffix_max[index + 1], self.net[index])
+                if index <= index_1 and value == suffix_max[index]:
+                    break
+                suffix_max[index] = value
+        if self.ranges is not None:
+            range_min, range_max = self.ranges
+            range_min[0][index_1 + 1:stop] = range_max[0][index_1 + 1:stop] = self.net[index_1 + 1:stop]
+            width = 1
+            for level in range(1, len(range_min)):
+                minima, maxima = range_min[level - 1], range_max[level - 1]
+                first, last = max(index_1 + 2 - 2 * width, 0), min(index_2, len(range_min[level]) - 1) + 1
+                if first < last:
+                    range_min[level][first:last] = map(min, minima[first:last], minima[first + width:last + width])
+                    range_max[level][first:last] = map(max, maxima[first:last], maxima[first + width:last + width])
+                width *= 2
@@ -20,21 +20,20 @@ class Vehicle:
         self.remaining_capacity = self.capacity - self.total_demand
 
     def is_route_feasible(self, route: list[Node]) -> bool:
-        """Check if the route is feasible for pickup task to be made
+        """Check if the route is feasible for the pickup tasks to be made, i.e. every pickup fits next to the
+        deliveries still on board when it is made
 
         Returns:
-            bool: True if the route is feasible for pickup task to be made, False otherwise
+            bool: True if the route is feasible for the pickup tasks to be made, False otherwise
         """
-        pickup_node = None
         current_available_capacity = self.remaining_capacity
         for node in route:
             if node.node_type == 'pickup':
-                pickup_node = node
-                break
+                current_available_capacity -= node.demand
+                if current_available_capacity < 0:
+                    return False
             else:
                 current_available_capacity += node.demand
-        if pickup_node:
-            return current_available_capacity >= pickup_node.demand
         return True
 
     def set_route_sequence(self) -> None:
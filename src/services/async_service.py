@@ -0,0 +1,247 @@
+import os
+import json
+import asyncio
+import hashlib
+from collections import OrderedDict
+from multiprocessing.sharedctypes import RawArray
+from concurrent.futures import ProcessPoolExecutor
+
+from src.configs.config import Config
+from src.utils.deadline import Deadline
+from src.models.cvrp_instance import CVRPInstance
+from src.data.instance_cache import InstanceCache
+from src.data.instance_generator import InstanceGenerator
+from src.methods.distance_matrix import DistanceMatrix
+from src.methods.distance_providers import DistanceProvider
+from src.services.service import RoutingService
+
+# The state of a worker process, created once by AsyncRoutingService.initialize_worker
+worker_cache = None
+worker_instances = None
+worker_max_instances = 0
+worker_cancel_flags = None
+
+
+class CancellableDeadline(Deadline):
+    """A deadline that is also reached when the request in its slot is cancelled.
+
+    The cancel flags are shared memory inherited by the worker processes, so a cancelled request stops at the next
+    deadline check of its improvement stages. Outside the pool workers it is a plain deadline."""
+
+    def __init__(self, slot: int, time_limit: float = None):
+        super().__init__(time_limit=time_limit)
+        self.slot = slot
+
+    def reached(self) -> bool:
+        """Check if the deadline has passed or the request was cancelled, and remember it if so
+
+        Returns:
+            bool: True if the deadline has passed or the request was cancelled, False otherwise
+        """
+        if worker_cancel_flags is not None and worker_cancel_flags[self.slot]:
+            self.expired = True
+        return super().reached()
+
+
+class AsyncRoutingService:
+    """An asyncio facade of RoutingService that solves requests concurrently on a managed pool of worker processes.
+
+    At most max_concurrency requests run at once, the others wait in arrival order. A request can be cancelled or
+    given a timeout: it is dropped while it waits, and a running solve stops at the next deadline check of its
+    improvement stages, so its worker is free again soon. The construction of a running solve always completes.
+
+    Instances are shared between the requests: each worker keeps the parsed instances and distance matrices of the
+    last max_instances instances in memory, and dense matrices of instance files are memory mapped from the
+    InstanceCache, so the workers share their pages.
+
+        async with AsyncRoutingService(workers=4) as service:
+            output = await service.solve(instance=Instance.instances[1], no_of_vehicles=25, no_of_pickups=10,
+                                         capacity=206, use_n_n=True, timeout=5)
+    """
+
+    def __init__(self,
+                 workers: int = None,
+                 max_concurrency: int = None,
+                 max_instances: int = 8,
+                 cache_directory: str = Config.CACHE_DIRECTORY):
+        """
+        Args:
+            workers (int): The number of worker processes, None for the number of CPUs
+            max_concurrency (int): The number of requests solved at once, None for the number of workers
+            max_instances (int): The number of instances each worker keeps in memory
+            cache_directory (str): The instance cache directory
+        """
+        workers = workers or os.cpu_count()
+        self.max_concurrency = max_concurrency or workers
+        self.cancel_flags = RawArray('b', self.max_concurrency)
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=AsyncRoutingService.initialize_worker,
+                                        initargs=(cache_directory, max_instances, self.cancel_flags))
+        self.free_slots = list(range(self.max_concurrency - 1, -1, -1))
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def __aenter__(self) -> 'AsyncRoutingService':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @staticmethod
+    def initialize_worker(cache_directory: str, max_instances: int, cancel_flags) -> None:
+        """Create the instance cache and the instance store of a worker process
+
+        Args:
+            cache_directory (str): The instance cache directory
+            max_instances (int): The number of instances kept in memory
+            cancel_flags (RawArray): The cancel flag of every request slot
+        """
+        global worker_cache, worker_instances, worker_max_instances, worker_cancel_flags
+        worker_cache = InstanceCache(directory=cache_directory)
+        worker_instances = OrderedDict()
+        worker_max_instances = max_instances
+        worker_cancel_flags = cancel_flags
+
+    @staticmethod
+    def get_instance_key(instance: dict, distance_mode: str) -> str:
+        """Get the key an instance and its distance matrix are kept under
+
+        Args:
+            instance (dict): The instance, see DataPreparation.get_instance_data
+            distance_mode (str): The distance matrix memory mode
+
+        Returns:
+            str: The key, the content hash for instance files and instance data
+        """
+        if "data" in instance:
+            data = instance["data"]
+            digest = hashlib.sha256(data.coordinates.tobytes())
+            digest.update(data.demand.tobytes())
+            digest.update(str(data.capacity).encode())
+            return f"data-{digest.hexdigest()}-{distance_mode}"
+        if "generator" in instance:
+            return f"generator-{json.dumps(instance['generator'], sort_keys=True)}-{distance_mode}"
+        return f"path-{worker_cache.get_key(path=instance['path'])}-{distance_mode}"
+
+    @staticmethod
+    def load_instance(instance: dict, distance_mode: str) -> tuple[CVRPInstance, object]:
+        """Get the instance data and the distance matrix of an instance from the store of the worker,
+        loading them on a miss and dropping the least recently used instance when the store is full
+
+        Args:
+            instance (dict): The instance, see DataPreparation.get_instance_data
+            distance_mode (str): The distance matrix memory mode
+
+        Returns:
+            tuple[CVRPInstance, np.ndarray | DistanceProvider]: The instance data and the distance matrix
+        """
+        key = AsyncRoutingService.get_instance_key(instance=instance, distance_mode=distance_mode)
+        if key in worker_instances:
+            worker_instances.move_to_end(key)
+            return worker_instances[key]
+
+        if "data" in instance:
+            instance_data = instance["data"]
+        elif "generator" in instance:
+            instance_data = InstanceGenerator.generate(**instance["generator"])
+        else:
+            instance_data = worker_cache.load_instance(path=instance["path"])
+        if "data" not in instance and "generator" not in instance and distance_mode == 'dense':
+            distance_matrix = worker_cache.load_distance_matrix(path=instance["path"],
+                                                                coordinates=instance_data.coordinates)
+        else:
+            distance_matrix = DistanceMatrix.create_provider(coordinates=instance_data.coordinates, mode=distance_mode)
+        worker_instances[key] = instance_data, distance_matrix
+        while len(worker_instances) > worker_max_instances:
+            _, (_, evicted_matrix) = worker_instances.popitem(last=False)
+            if isinstance(evicted_matrix, DistanceProvider):
+                evicted_matrix.close()
+        return instance_data, distance_matrix
+
+    @staticmethod
+    def run_request(slot: int, instance: dict, arguments: dict) -> dict | None:
+        """Solve one request in a worker process
+
+        Args:
+            slot (int): The request slot, its cancel flag stops the solve
+            instance (dict): The instance, see DataPreparation.get_instance_data
+            arguments (dict): The other solve_routing arguments
+
+        Returns:
+            dict | None: The output, None if the request was cancelled before it started
+        """
+        if worker_cancel_flags[slot]:
+            return None
+        instance_data, distance_matrix = AsyncRoutingService.load_instance(
+            instance=instance, distance_mode=arguments.get("distance_mode", 'dense'))
+        deadline = CancellableDeadline(slot=slot, time_limit=arguments.pop("time_limit", None))
+        return RoutingService.solve_routing(instance={"data": instance_data}, distance_matrix=distance_matrix,
+                                            deadline=deadline, plot=False, verbose=False, **arguments)
+
+    async def solve(self,
+                    instance: dict,
+                    no_of_vehicles: int,
+                    no_of_pickups: int,
+                    capacity: int,
+                    use_n_n: bool,
+                    timeout: float = None,
+                    **arguments) -> dict:
+        """Solve the routing problem on the worker pool, see RoutingService.solve_routing
+
+        Args:
+            instance (dict): The instance, see DataPreparation.get_instance_data
+            no_of_vehicles (int): The number of vehicles
+            no_of_pickups (int): The number of pickups
+            capacity (int): The capacity of the vehicles
+            use_n_n (bool): The nearest neighbor flag
+            timeout (float): The time in seconds the request may wait and run, None for no limit. Unlike
+                time_limit, which returns the best solution found so far, the request fails when it passes
+            **arguments: The other solve_routing arguments, the callback must be picklable
+
+        Raises:
+            TimeoutError: If the timeout passes before the output is ready
+            asyncio.CancelledError: If the request is cancelled
+            RuntimeError: If the service is closed
+
+        Returns:
+            dict: The output with the prepared solution information
+        """
+        arguments.update(no_of_vehicles=no_of_vehicles, no_of_pickups=no_of_pickups, capacity=capacity,
+                         use_n_n=use_n_n)
+        async with asyncio.timeout(timeout):
+            await self.semaphore.acquire()
+            slot = self.free_slots.pop()
+            self.cancel_flags[slot] = 0
+            loop = asyncio.get_running_loop()
+            try:
+                future = self.pool.submit(AsyncRoutingService.run_request, slot, instance, arguments)
+            except RuntimeError:
+                self.release(slot=slot)
+                raise
+            # The slot is only free again when the worker is done with it, not when the request gives up
+            future.add_done_callback(lambda _: loop.call_soon_threadsafe(self.release, slot))
+            try:
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                self.cancel_flags[slot] = 1
+                future.cancel()
+                raise
+
+    def release(self, slot: int) -> None:
+        """Free the slot of a finished request and let the next waiting request run
+
+        Args:
+            slot (int): The request slot
+        """
+        self.free_slots.append(slot)
+        self.semaphore.release()
+
+    async def close(self, cancel: bool = False) -> None:
+        """Shut the worker pool down after the running requests
+
+        Args:
+            cancel (bool): Stop the running solves at their next deadline check and drop the submitted ones
+        """
+        if cancel:
+            for slot in range(self.max_concurrency):
+                self.cancel_flags[slot] = 1
+        await asyncio.get_running_loop().run_in_executor(None, lambda: self.pool.shutdown(wait=True,
+                                                                                       cancel_futures=cancel))
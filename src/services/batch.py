@@ -0,0 +1,204 @@
+import sys
+import json
+import time
+import itertools
+from typing import TextIO
+from concurrent.futures import ProcessPoolExecutor
+
+from src.configs.config import Config, Instance
+from src.data.instance_cache import InstanceCache
+from src.services.service import RoutingService
+
+# The instance cache of a worker process, created once by BatchRunner.initialize_worker
+worker_cache = None
+
+
+class BatchRunner:
+    """Runs many routing scenarios without interaction and streams one JSON line per scenario.
+
+    A scenario is a dict with the solve_routing arguments. The instance is either an Instance.instances
+    number or a {"path": ...} dict / path string of any CVRPLIB file. Parsed instances and distance matrices
+    are shared between the scenarios through an InstanceCache that is filled before the workers start.
+    Batch runs never plot or print, so the plot, verbose and cache arguments of a scenario are overridden."""
+
+    SUMMARY_KEYS = ("total_distance", "minimum_required_vehicles", "unused_vehicles", "time_limit_reached")
+
+    @staticmethod
+    def parse_bool(value) -> bool:
+        """Parse a boolean given as a bool or as text such as True/False, yes/no, 1/0
+
+        Args:
+            value (bool | str | int): The value
+
+        Returns:
+            bool: The parsed value
+        """
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in ('true', 't', 'yes', 'y', '1'):
+            return True
+        if text in ('false', 'f', 'no', 'n', '0'):
+            return False
+        raise ValueError(f"Not a boolean: {value}")
+
+    @staticmethod
+    def get_instance(instance) -> dict:
+        """Resolve the instance of a scenario
+
+        Args:
+            instance (int | str | dict): The instance number, the path of an instance file or an instance dict
+
+        Returns:
+            dict: The instance dict with at least the path
+        """
+        if isinstance(instance, dict):
+            return instance
+        if isinstance(instance, int) or str(instance).isdigit():
+            return Instance.instances[int(instance)]
+        return {"path": str(instance)}
+
+    @staticmethod
+    def load_scenarios(path: str) -> list[dict]:
+        """Load scenarios from a JSON file holding a list of scenarios or from a JSON lines file
+
+        Args:
+            path (str): The path of the scenario file
+
+        Returns:
+            list[dict]: The scenarios
+        """
+        with open(path) as file:
+            text = file.read()
+        if text.lstrip().startswith('['):
+            return json.loads(text)
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    @staticmethod
+    def expand_grid(grid: dict[str, list]) -> list[dict]:
+        """Expand a parameter grid to the scenarios of all combinations, the last parameter varies fastest
+
+        Args:
+            grid (dict[str, list]): The values of each parameter, single values are used as is
+
+        Returns:
+            list[dict]: The scenarios
+        """
+        keys = list(grid)
+        values = [value if isinstance(value, list) else [value] for value in grid.values()]
+        return [dict(zip(keys, combination)) for combination in itertools.product(*values)]
+
+    @staticmethod
+    def initialize_worker(cache_directory: str) -> None:
+        """Create the instance cache of a worker process
+
+        Args:
+            cache_directory (str): The instance cache directory
+        """
+        global worker_cache
+        worker_cache = InstanceCache(directory=cache_directory)
+
+    @staticmethod
+    def run_scenario(scenario: dict, include_routes: bool = False) -> dict:
+        """Solve one scenario
+
+        Args:
+            scenario (dict): The scenario
+            include_routes (bool): Add the routes to the result
+
+        Returns:
+            dict: The scenario and its results, or the error if the scenario failed
+        """
+        result = {"scenario": scenario}
+        t_start = time.perf_counter()
+        try:
+            arguments = dict(scenario)
+            instance = BatchRunner.get_instance(arguments.pop("instance"))
+            for key in ("use_n_n", "use_polar_angle", "best_improvement", "local_search"):
+                if key in arguments:
+                    arguments[key] = BatchRunner.parse_bool(arguments[key])
+            arguments.update(instance=instance, cache=worker_cache, plot=False, verbose=False)
+            output = RoutingService.solve_routing(**arguments)
+        except Exception as error:
+            result["error"] = f"{type(error).__name__}: {error}"
+            return result
+
+        result.update({key: output[key] for key in BatchRunner.SUMMARY_KEYS})
+        result["number_of_routes"] = len(output["routes"])
+        result["unassigned_pickups"] = len(output["unassigned_pickups"])
+        result["unassigned_deliveries"] = len(output["unassigned_deliveries"])
+        result["elapsed_time"] = round(time.perf_counter() - t_start, 4)
+        result["profile"] = output["profile"]
+        if include_routes:
+            result["routes"] = output["routes"]
+        return result
+
+    @staticmethod
+    def warm_cache(scenarios: list[dict], cache: InstanceCache) -> None:
+        """Parse each distinct instance and build its distance matrix once, before the workers start.
+        Instances that fail to load are left to the scenarios, which report the error.
+
+        Args:
+            scenarios (list[dict]): The scenarios
+            cache (InstanceCache): The instance cache
+        """
+        paths = set()
+        for scenario in scenarios:
+            try:
+                paths.add(BatchRunner.get_instance(scenario["instance"])["path"])
+            except (KeyError, TypeError):
+                continue
+        for path in sorted(paths):
+            try:
+                instance = cache.load_instance(path=path)
+            except (OSError, ValueError, KeyError):
+                continue
+            cache.load_distance_matrix(path=path, coordinates=instance.coordinates)
+
+    @staticmethod
+    def run(scenarios: list[dict],
+            workers: int = 1,
+            output: TextIO = sys.stdout,
+            include_routes: bool = False,
+            cache_directory: str = Config.CACHE_DIRECTORY) -> list[dict]:
+        """Run the scenarios on a pool of worker processes and stream one JSON line per scenario, in scenario order
+
+        Args:
+            scenarios (list[dict]): The scenarios
+            workers (int): The number of worker processes, 1 runs the scenarios in this process
+            output (TextIO): The stream the JSON lines are written to, None to only return the results
+            include_routes (bool): Add the routes to the results
+            cache_directory (str): The instance cache directory
+
+        Returns:
+            list[dict]: The results
+        """
+        BatchRunner.warm_cache(scenarios=scenarios, cache=InstanceCache(directory=cache_directory))
+        results = []
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=BatchRunner.initialize_worker,
+                                     initargs=(cache_directory,)) as pool:
+                for result in pool.map(BatchRunner.run_scenario, scenarios, [include_routes] * len(scenarios)):
+                    results.append(BatchRunner.write_result(result=result, output=output))
+        else:
+            BatchRunner.initialize_worker(cache_directory=cache_directory)
+            for scenario in scenarios:
+                result = BatchRunner.run_scenario(scenario=scenario, include_routes=include_routes)
+                results.append(BatchRunner.write_result(result=result, output=output))
+        return results
+
+    @staticmethod
+    def write_result(result: dict, output: TextIO) -> dict:
+        """Write a result as one JSON line
+
+        Args:
+            result (dict): The result
+            output (TextIO): The output stream, None to skip writing
+
+        Returns:
+            dict: The result
+        """
+        if output is not None:
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+        return result
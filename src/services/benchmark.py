@@ -0,0 +1,173 @@
+import os
+import math
+import json
+import tracemalloc
+
+from src.configs.config import Config, Instance
+from src.data.instance_generator import InstanceGenerator
+from src.services.service import RoutingService
+
+
+class Benchmark:
+    """Runs solve_routing over a fixed matrix of instances and parameters and tracks regressions against a baseline.
+
+    Every scenario is solved repeat times; the wall time of the solve and of each stage (see Profiler) is the
+    fastest of the repeats. The peak memory is the peak traced memory of one more solve under tracemalloc.
+    Distances and unassigned counts are deterministic and always compared, up to the distance tolerance. Times and
+    memory depend on the machine, so they are only compared on request and the comparison is only valid on the
+    machine that recorded the baseline."""
+
+    SYNTHETIC_INSTANCE = {"no_of_customers": 2000, "depot_position": 'C', "customer_position": 'RC',
+                          "demand_distribution": '1-10', "route_size": 20, "seed": 1}
+    # Vehicles beyond the minimum the synthetic instance needs
+    SYNTHETIC_VEHICLE_SLACK = 1.1
+
+    @staticmethod
+    def get_scenarios(synthetic: bool = True) -> dict[str, dict]:
+        """Get the benchmark scenarios, both cluster benefit types on every bundled instance and a synthetic one
+
+        Args:
+            synthetic (bool): Include the synthetic instance of InstanceGenerator
+
+        Returns:
+            dict[str, dict]: The solve_routing arguments of every scenario by scenario name
+        """
+        instances = {os.path.splitext(os.path.basename(instance["path"]))[0]: (
+                         {"path": instance["path"]}, instance["number_of_vehicles"], instance["capacity"])
+                     for instance in Instance.instances.values()}
+        if synthetic:
+            generated = InstanceGenerator.generate(**Benchmark.SYNTHETIC_INSTANCE)
+            no_of_vehicles = math.ceil(Benchmark.SYNTHETIC_VEHICLE_SLACK * generated.demand.sum() / generated.capacity)
+            instances[f"synthetic-n{generated.dimension}"] = ({"generator": Benchmark.SYNTHETIC_INSTANCE},
+                                                              no_of_vehicles, generated.capacity)
+        scenarios = {}
+        for name, (instance, no_of_vehicles, capacity) in instances.items():
+            for use_n_n in (True, False):
+                scenarios[f"{name}-{'nn' if use_n_n else 'savings'}"] = {"instance": instance,
+                                                                         "no_of_vehicles": no_of_vehicles,
+                                                                         "no_of_pickups": 10,
+                                                                         "capacity": capacity,
+                                                                         "use_n_n": use_n_n}
+        return scenarios
+
+    @staticmethod
+    def run_scenario(scenario: dict, repeat: int = 3) -> dict:
+        """Benchmark one scenario
+
+        Args:
+            scenario (dict): The solve_routing arguments
+            repeat (int): The number of timed solves
+
+        Returns:
+            dict: The elapsed time, the stage times, the peak memory in bytes, the total distance and the number of
+                unassigned pickups and deliveries
+        """
+        elapsed_time, stage_times = float('inf'), {}
+        for _ in range(repeat):
+            output = RoutingService.solve_routing(plot=False, verbose=False, **scenario)
+            profile = output["profile"]
+            elapsed_time = min(elapsed_time, profile["elapsed_time"])
+            for stage, seconds in profile["stage_times"].items():
+                stage_times[stage] = min(stage_times.get(stage, float('inf')), seconds)
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        RoutingService.solve_routing(plot=False, verbose=False, **scenario)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+
+        return {"elapsed_time": elapsed_time,
+                "stage_times": stage_times,
+                "peak_memory": peak_memory,
+                "total_distance": output["total_distance"],
+                "unassigned_pickups": len(output["unassigned_pickups"]),
+                "unassigned_deliveries": len(output["unassigned_deliveries"])}
+
+    @staticmethod
+    def run(names: list[str] = None, repeat: int = 3, synthetic: bool = True) -> dict[str, dict]:
+        """Benchmark the scenarios
+
+        Args:
+            names (list[str]): The names of the scenarios to run, None for all
+            repeat (int): The number of timed solves per scenario
+            synthetic (bool): Include the synthetic instance
+
+        Returns:
+            dict[str, dict]: The results by scenario name
+        """
+        scenarios = Benchmark.get_scenarios(synthetic=synthetic)
+        return {name: Benchmark.run_scenario(scenario=scenario, repeat=repeat)
+                for name, scenario in scenarios.items() if names is None or name in names}
+
+    @staticmethod
+    def compare(results: dict[str, dict], baseline: dict[str, dict], time_tolerance: float = 0.5,
+                memory_tolerance: float = 0.25, distance_tolerance: float = 1e-6, minimum_time: float = 0.01,
+                timings: bool = False) -> list[str]:
+        """Compare benchmark results with a baseline
+
+        Args:
+            results (dict[str, dict]): The results by scenario name
+            baseline (dict[str, dict]): The baseline results by scenario name
+            time_tolerance (float): The allowed relative slowdown of the solve and of every stage
+            memory_tolerance (float): The allowed relative growth of the peak memory
+            distance_tolerance (float): The allowed relative growth of the total distance
+            minimum_time (float): Times below this many seconds are too noisy and are not compared
+            timings (bool): Also compare the times and the peak memory, only valid on the machine that recorded
+                the baseline
+
+        Returns:
+            list[str]: The regressions, empty if there are none
+        """
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            expected = baseline[name]
+            times = []
+            if timings:
+                times = [("elapsed_time", result["elapsed_time"], expected["elapsed_time"])]
+                times += [(f"stage_times.{stage}", seconds, expected["stage_times"][stage])
+                          for stage, seconds in result["stage_times"].items() if stage in expected["stage_times"]]
+            for metric, seconds, expected_seconds in times:
+                if seconds > minimum_time and seconds > expected_seconds * (1 + time_tolerance):
+                    regressions.append(f"{name}: {metric} {seconds:.4f}s > {expected_seconds:.4f}s")
+            if timings and result["peak_memory"] > expected["peak_memory"] * (1 + memory_tolerance):
+                regressions.append(f"{name}: peak_memory {result['peak_memory']} > {expected['peak_memory']}")
+            if result["total_distance"] > expected["total_distance"] * (1 + distance_tolerance):
+                regressions.append(f"{name}: total_distance {result['total_distance']} > "
+                                   f"{expected['total_distance']}")
+            for metric in ("unassigned_pickups", "unassigned_deliveries"):
+                if result[metric] > expected[metric]:
+                    regressions.append(f"{name}: {metric} {result[metric]} > {expected[metric]}")
+        return regressions
+
+    @staticmethod
+    def load_baseline(path: str = Config.BENCHMARK_BASELINE) -> dict[str, dict]:
+        """Load a baseline file
+
+        Args:
+            path (str): The path of the baseline file
+
+        Returns:
+            dict[str, dict]: The baseline results by scenario name, empty if the file does not exist
+        """
+        if not os.path.exists(path):
+            return {}
+        with open(path) as file:
+            return json.load(file)
+
+    @staticmethod
+    def save_baseline(results: dict[str, dict], path: str = Config.BENCHMARK_BASELINE) -> None:
+        """Save results as the baseline file
+
+        Args:
+            results (dict[str, dict]): The results by scenario name
+            path (str): The path of the baseline file
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+            file.write("\n")
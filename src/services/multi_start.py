@@ -0,0 +1,185 @@
+import os
+import time
+import random
+from typing import Callable
+from concurrent.futures import ProcessPoolExecutor
+
+from src.utils.deadline import Deadline
+from src.visuals.graph import Plotting
+from src.models.vehicle import Vehicle
+from src.services.profiler import Profiler
+from src.methods import parallel_two_opt
+from src.data.data_preparation import DataPreparation
+from src.methods.parallel_two_opt import ParallelTwoOpt
+from src.methods.distance_providers import DistanceProvider
+from src.services.service import RoutingService
+
+
+class MultiStart:
+    """Solves an instance from several randomized constructions and keeps the best solution.
+
+    Start 0 is the deterministic construction, the other starts randomize the sweep start angle, the seed node choice
+    and the tie-breaking with construction seeds drawn from the multi-start seed, so the result only depends on the
+    seed. The starts run on a pool of worker processes that share one distance matrix, see ParallelTwoOpt."""
+
+    @staticmethod
+    def get_construction_seeds(starts: int, seed: int) -> list[int | None]:
+        """Get the construction seed of every start
+
+        Args:
+            starts (int): The number of starts
+            seed (int): The multi-start seed
+
+        Returns:
+            list[int | None]: The construction seeds, None for the deterministic first start
+        """
+        rng = random.Random(seed)
+        return [None] + [rng.getrandbits(32) for _ in range(starts - 1)]
+
+    @staticmethod
+    def run_start(arguments: dict, construction_seed: int | None, deadline: Deadline, distance_matrix=None,
+                  profiler: Profiler = None) -> dict:
+        """Solve one start, in a worker process the shared distance matrix of the worker is used
+
+        Args:
+            arguments (dict): The solve_routing arguments
+            construction_seed (int | None): The construction seed of the start
+            deadline (Deadline): The deadline of the multi-start
+            distance_matrix (np.ndarray | DistanceProvider): The distance matrix, None in a worker process
+            profiler (Profiler): The profiler of the start, None for a default one
+
+        Returns:
+            dict: The output of the start
+        """
+        if distance_matrix is None:
+            distance_matrix = parallel_two_opt.worker_distance_matrix
+        return RoutingService.solve_routing(**dict(arguments, distance_matrix=distance_matrix),
+                                            construction_seed=construction_seed, deadline=deadline,
+                                            profiler=profiler, plot=False, verbose=False)
+
+    @staticmethod
+    def plot_output(data: DataPreparation, output: dict, plot_directory: str = None) -> None:
+        """Plot the final routes of an output
+
+        Args:
+            data (DataPreparation): The data preparation object of the instance
+            output (dict): The output
+            plot_directory (str): Render the plot to an image file in this directory instead of showing it
+        """
+        data.vehicles = [Vehicle(id=route["vehicle_id"], capacity=data.capacity,
+                                 route=[data.nodes[node_id] for node_id in route["route"]])
+                         for route in output["routes"]]
+        data.unassigned_pickups = output["unassigned_pickups"]
+        data.unassigned_deliveries = output["unassigned_deliveries"]
+        if plot_directory:
+            os.makedirs(plot_directory, exist_ok=True)
+        Plotting.plot_route(data=data, clusters={}, header="Final Route(s)",
+                            path=os.path.join(plot_directory, "final_routes.png") if plot_directory else None)
+
+    @staticmethod
+    def solve(arguments: dict,
+              starts: int,
+              seed: int = 0,
+              workers: int = None,
+              time_limit: float = None,
+              deadline: Deadline = None,
+              callback: Callable[[dict], None] = None,
+              plot: bool = False,
+              plot_directory: str = None,
+              profiler: Profiler = None,
+              verbose: bool = False) -> dict:
+        """Solve all starts and return the output of the best one
+
+        The best start assigns the most nodes and then has the shortest total distance, ties go to the lower start.
+        The plot and the profile are the ones of the best start, only its final routes are plotted.
+
+        Args:
+            arguments (dict): The solve_routing arguments shared by the starts
+            starts (int): The number of starts
+            seed (int): The multi-start seed
+            workers (int): The number of worker processes, None or 1 to solve the starts one after another
+            time_limit (float): The time budget of all starts in seconds, None for no limit
+            deadline (Deadline): The deadline of all starts instead of one built from time_limit
+            callback (Callable[[dict], None]): Called with the output of every start that improves on the best one
+                so far, in start order, with "multi_start" as "stage"
+            plot (bool): Plot the final routes of the best start
+            plot_directory (str): Render the plot to an image file in this directory instead of showing it
+            profiler (Profiler): Filled with the stage times, peak memory and counts of the best start. Its hook
+                runs in every start, the snapshots of the best start are kept when the starts run serially
+            verbose (bool): Print the output
+
+        Returns:
+            dict: The output of the best start with the elapsed time of all starts, the per-start results as
+                "starts" and the best start as "best_start"
+        """
+        t_start = time.perf_counter()
+        deadline = deadline or Deadline(time_limit=time_limit)
+        construction_seeds = MultiStart.get_construction_seeds(starts=starts, seed=seed)
+        distance_matrix = arguments.get("distance_matrix")
+        owns_distance_matrix = distance_matrix is None
+        data = None
+        if distance_matrix is None or plot:
+            data = DataPreparation(instance=arguments["instance"], no_of_vehicles=arguments["no_of_vehicles"],
+                                   no_of_pickups=arguments["no_of_pickups"], capacity=arguments["capacity"],
+                                   cache=arguments.get("cache"))
+        if distance_matrix is None:
+            distance_matrix = RoutingService.get_distance_matrix(data=data,
+                                                                 distance_mode=arguments.get("distance_mode", 'dense'),
+                                                                 cache=arguments.get("cache"))
+        arguments = dict(arguments, distance_matrix=None)
+
+        hook = profiler.hook if profiler is not None else None
+        if workers and workers > 1:
+            source, block = ParallelTwoOpt.get_matrix_source(distance_matrix=distance_matrix)
+            start_profilers = None
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=ParallelTwoOpt.initialize_worker,
+                                         initargs=(source,)) as pool:
+                    outputs = list(pool.map(MultiStart.run_start, [arguments] * starts, construction_seeds,
+                                            [deadline] * starts, [None] * starts,
+                                            [Profiler(hook=hook) if hook else None] * starts))
+            finally:
+                if block is not None:
+                    block.close()
+                    block.unlink()
+        else:
+            start_profilers = [Profiler(hook=hook) for _ in construction_seeds]
+            outputs = [MultiStart.run_start(arguments=arguments, construction_seed=construction_seed,
+                                            deadline=deadline, distance_matrix=distance_matrix,
+                                            profiler=start_profiler)
+                       for construction_seed, start_profiler in zip(construction_seeds, start_profilers)]
+        if owns_distance_matrix and isinstance(distance_matrix, DistanceProvider):
+            distance_matrix.close()
+
+        best_start, best_key = None, None
+        for start, output in enumerate(outputs):
+            key = (len(output["unassigned_deliveries"]) + len(output["unassigned_pickups"]), output["total_distance"])
+            if best_key is None or key < best_key:
+                best_start, best_key = start, key
+                if callback is not None:
+                    callback(dict(output, stage="multi_start"))
+
+        output = outputs[best_start]
+        output["time_limit_reached"] = any(start_output["time_limit_reached"] for start_output in outputs)
+        output["elapsed_time"] = f"{round(time.perf_counter() - t_start, 2)} seconds"
+        output["best_start"] = best_start
+        output["starts"] = [{"start": start,
+                             "construction_seed": construction_seed,
+                             "total_distance": start_output["total_distance"],
+                             "unassigned_pickups": len(start_output["unassigned_pickups"]),
+                             "unassigned_deliveries": len(start_output["unassigned_deliveries"]),
+                             "elapsed_time": start_output["profile"]["elapsed_time"],
+                             "stage_times": start_output["profile"]["stage_times"]}
+                            for start, (construction_seed, start_output) in enumerate(zip(construction_seeds,
+                                                                                           outputs))]
+        if profiler is not None:
+            profiler.stage_times.update(output["profile"]["stage_times"])
+            profiler.stage_peak_memory.update(output["profile"]["stage_peak_memory"])
+            profiler.counts.update(output["profile"]["counts"])
+            if start_profilers is not None:
+                profiler.snapshots.update(start_profilers[best_start].snapshots)
+        if verbose:
+            print(output)
+        if plot:
+            MultiStart.plot_output(data=data, output=output, plot_directory=plot_directory)
+        return output
@@ -0,0 +1,108 @@
+import sys
+import time
+import pstats
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class Profiler:
+    """Records the wall time and peak memory of the solve stages and named call counts.
+
+    The default profiler only reads the clock, so it is always on; the summary adds the peak resident set size of
+    the process, which is not split by stage. With hook='cprofile' every stage is run under cProfile and with
+    hook='tracemalloc' the Python allocations of every stage are traced, which gives the peak memory of each stage
+    from a peak reset at its start; the pstats.Stats or tracemalloc.Snapshot of each stage is kept in snapshots.
+    Tracing is started for each stage and stopped after it unless it was already running."""
+
+    HOOKS = (None, 'cprofile', 'tracemalloc')
+
+    def __init__(self, hook: str = None):
+        if hook not in Profiler.HOOKS:
+            raise ValueError(f"Unknown profiler hook: {hook}")
+        self.hook = hook
+        self.stage_times = {}
+        self.stage_peak_memory = {}
+        self.counts = {}
+        self.snapshots = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage, the times and counts of a stage that runs more than once are added up
+
+        Args:
+            name (str): The name of the stage
+        """
+        profile = None
+        started_tracing = False
+        if self.hook == 'cprofile':
+            profile = cProfile.Profile()
+            profile.enable()
+        elif self.hook == 'tracemalloc':
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        t_start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed_time = time.perf_counter() - t_start
+            self.stage_times[name] = self.stage_times.get(name, 0.0) + elapsed_time
+            if profile is not None:
+                profile.disable()
+                self.snapshots[name] = pstats.Stats(profile)
+            if self.hook == 'tracemalloc':
+                self.stage_peak_memory[name] = max(self.stage_peak_memory.get(name, 0),
+                                                   tracemalloc.get_traced_memory()[1])
+                self.snapshots[name] = tracemalloc.take_snapshot()
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add to a call count
+
+        Args:
+            name (str): The name of the count
+            value (int): The value to add
+        """
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    @staticmethod
+    def get_peak_memory() -> int:
+        """Get the peak resident set size of the process
+
+        Returns:
+            int: The peak memory in bytes, 0 if the platform does not report it
+        """
+        if resource is None:
+            return 0
+        peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak_memory if sys.platform == 'darwin' else peak_memory * 1024
+
+    def get_summary(self, elapsed_time: float) -> dict:
+        """Get the numeric summary of the profile
+
+        Args:
+            elapsed_time (float): The elapsed time of the whole solve
+
+        Returns:
+            dict: The summary with the following keys:
+                elapsed_time (float): The elapsed time in seconds
+                stage_times (dict[str, float]): The wall time of every stage in seconds
+                stage_peak_memory (dict[str, int]): The peak traced memory of every stage in bytes, only recorded
+                    with the tracemalloc hook
+                process_peak_memory (int): The peak resident set size of the process in bytes
+                counts (dict[str, int]): The call counts
+        """
+        return {"elapsed_time": round(elapsed_time, 6),
+                "stage_times": {name: round(seconds, 6) for name, seconds in self.stage_times.items()},
+                "stage_peak_memory": dict(self.stage_peak_memory),
+                "process_peak_memory": Profiler.get_peak_memory(),
+                "counts": dict(self.counts)}
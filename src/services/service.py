@@ -1,133 +1,309 @@
+import os
 import time
-from copy import deepcopy
+import random
+from typing import Callable
 
 from src.visuals.graph import Plotting
-from src.utils.sorting import Sorting
 from src.models.vehicle import Vehicle
+from src.services.profiler import Profiler
+from src.utils.deadline import Deadline
 from src.methods.two_opt import TwoOpt
+from src.methods.local_search import LocalSearch
+from src.methods.parallel_two_opt import ParallelTwoOpt
 from src.methods.clustering import Clustering
+from src.methods.clarke_wright import ClarkeWright
 from src.data.output_preparation import Output
+from src.data.instance_cache import InstanceCache
 from src.methods.calculations import Calculations
+from src.methods.distance_matrix import DistanceMatrix
+from src.methods.distance_providers import DistanceProvider
 from src.data.data_preparation import DataPreparation
 
 
 class RoutingService:
+    CONSTRUCTIONS = ('sweep', 'clarke_wright')
+    PICKUP_INSERTIONS = ('append', 'cheapest')
+
     @staticmethod
     def solve_routing(instance: dict,
                       no_of_vehicles: int,
                       no_of_pickups: int,
                       capacity: int,
                       use_n_n: bool,
-                      use_polar_angle: bool = True) -> dict:
+                      use_polar_angle: bool = True,
+                      regret_k: int = None,
+                      seed_k: int = None,
+                      construction: str = 'sweep',
+                      clarke_wright_neighbors: int = 20,
+                      pickup_insertion: str = 'append',
+                      max_pickups: int | None = 1,
+                      distance_mode: str = 'dense',
+                      best_improvement: bool = False,
+                      neighbor_k: int = None,
+                      workers: int = None,
+                      executor: str = 'process',
+                      local_search: bool = False,
+                      local_search_neighbors: int = 10,
+                      local_search_time_limit: float = None,
+                      time_limit: float = None,
+                      deadline: Deadline = None,
+                      callback: Callable[[dict], None] = None,
+                      starts: int = 1,
+                      seed: int = 0,
+                      construction_seed: int = None,
+                      distance_matrix=None,
+                      cache: InstanceCache = None,
+                      plot: bool = True,
+                      plot_directory: str = None,
+                      profiler: Profiler = None,
+                      verbose: bool = True) -> dict:
         """Solve the routing problem
 
         Args:
-            instance (dict): The instance
+            instance (dict): The instance, see DataPreparation.get_instance_data
             no_of_vehicles (int): The number of vehicles
             no_of_pickups (int): The number of pickups
             capacity (int): The capacity of the vehicles
             use_n_n (bool): The nearest neighbor flag
             use_polar_angle (bool): The polar angle flag
+            regret_k (int): Assign the nodes to the clusters in regret-k order instead of in descending demand
+                order, see Clustering.get_regret_assignment. None keeps the demand order
+            seed_k (int): Only score the seed_k clusters with the nearest seed nodes of each node, found with a
+                spatial index, see CandidateBenefitTable. None scores all clusters
+            construction (str): The route construction, sweep for the polar angle sweep and cluster benefits or
+                clarke_wright for the savings constructor, see ClarkeWright
+            clarke_wright_neighbors (int): The number of nearest nodes each node is paired with in clarke_wright
+            pickup_insertion (str): Where a pickup joins its route, append for the end of the route or cheapest for
+                the position with the smallest detour that fits, see Clustering.insert_pickups
+            max_pickups (int | None): The number of pickups a vehicle can make, None for no limit. A pickup is only
+                added where the vehicle has room for it for the rest of its route, see RouteLoads
+            distance_mode (str): The distance matrix memory mode: dense, lazy, condensed or memmap
+            best_improvement (bool): Use best improvement instead of first improvement in 2-opt
+            neighbor_k (int): Restrict 2-opt to the neighbor_k nearest neighbors of each node, None for all moves
+            workers (int): The number of workers for the 2-opt stage, or for the starts of a multi-start,
+                None or 1 to work serially
+            executor (str): The worker pool type of the 2-opt stage, process or thread
+            local_search (bool): Improve the routes with inter-route relocate, Or-opt and swap moves after 2-opt
+            local_search_neighbors (int): The number of nearest neighbors a node can be moved next to
+            local_search_time_limit (float): The time budget of the local search in seconds, None for no limit
+            time_limit (float): The time budget of the solve in seconds, None for no limit. The construction always
+                completes, the improvement stages stop at the deadline and keep the best solution found so far
+            deadline (Deadline): The deadline of the solve instead of one built from time_limit, e.g. one that can
+                also be cancelled from outside
+            callback (Callable[[dict], None]): Called with the output of every improved intermediate solution,
+                with the stage that produced it as "stage"
+            starts (int): The number of construction starts, more than one solves with MultiStart and keeps the
+                best solution
+            seed (int): The random seed of the multi-start
+            construction_seed (int): The random seed of a randomized construction (sweep start angle, seed node
+                choice and tie-breaking), None for the deterministic construction
+            distance_matrix (np.ndarray | DistanceProvider): A distance matrix of the instance to use instead of
+                building one, e.g. shared by the starts of a multi-start
+            cache (InstanceCache): The cache of parsed instances and dense distance matrices, None to disable
+            plot (bool): Plot the initial and the final routes, False solves headless without importing matplotlib
+            plot_directory (str): Render the plots to image files in this directory instead of showing them
+            profiler (Profiler): The profiler of the stages, e.g. with a cProfile or tracemalloc hook, None for a
+                default one. Its numeric summary is returned as output["profile"]
+            verbose (bool): Print the output
 
         Returns:
             output (dict): The output with the prepared solution information
         """
+        if starts > 1:
+            from src.services.multi_start import MultiStart
+            return MultiStart.solve(starts=starts, seed=seed, workers=workers, time_limit=time_limit,
+                                    deadline=deadline, callback=callback, plot=plot, plot_directory=plot_directory,
+                                    profiler=profiler, verbose=verbose,
+                                    arguments=dict(instance=instance, no_of_vehicles=no_of_vehicles,
+                                                   no_of_pickups=no_of_pickups, capacity=capacity,
+                                                   use_n_n=use_n_n, construction=construction,
+                                                   clarke_wright_neighbors=clarke_wright_neighbors,
+                                                   pickup_insertion=pickup_insertion, max_pickups=max_pickups,
+                                                   use_polar_angle=use_polar_angle,
+                                                   regret_k=regret_k, seed_k=seed_k,
+                                                   distance_mode=distance_mode, best_improvement=best_improvement,
+                                                   neighbor_k=neighbor_k, local_search=local_search,
+                                                   local_search_neighbors=local_search_neighbors,
+                                                   local_search_time_limit=local_search_time_limit,
+                                                   distance_matrix=distance_matrix, cache=cache))
+
+        if construction not in RoutingService.CONSTRUCTIONS:
+            raise ValueError(f"Unknown construction: {construction}")
+        if pickup_insertion not in RoutingService.PICKUP_INSERTIONS:
+            raise ValueError(f"Unknown pickup insertion: {pickup_insertion}")
+        if plot and plot_directory:
+            os.makedirs(plot_directory, exist_ok=True)
         t_start = time.perf_counter()
-        data = DataPreparation(instance=instance,
-                               no_of_vehicles=no_of_vehicles,
-                               no_of_pickups=no_of_pickups,
-                               capacity=capacity)
+        deadline = deadline or Deadline(time_limit=time_limit)
+        profiler = profiler or Profiler()
+        rng = None if construction_seed is None else random.Random(construction_seed)
+        with profiler.stage("data_preparation"):
+            data = DataPreparation(instance=instance,
+                                   no_of_vehicles=no_of_vehicles,
+                                   no_of_pickups=no_of_pickups,
+                                   capacity=capacity,
+                                   cache=cache)
 
-        distance_matrix = Calculations.create_distance_matrix(nodes=data.nodes)
+        # A matrix built here is released at the end, e.g. the temporary file of a memmap matrix
+        owns_distance_matrix = distance_matrix is None
+        with profiler.stage("distance_matrix"):
+            if distance_matrix is None:
+                distance_matrix = RoutingService.get_distance_matrix(data=data, distance_mode=distance_mode,
+                                                                     cache=cache)
 
-        for node in data.nodes:
-            if node.node_type != 'depot':
-                node.polar_angle = Calculations.calculate_polar_angle(depot=data.depot, node=node)
+        if construction == 'clarke_wright':
+            with profiler.stage("clarke_wright"):
+                clusters, unassigned_deliveries = ClarkeWright.create_clusters(
+                    nodes=data.eligible_deliveries, distance_matrix=distance_matrix, depot=data.depot,
+                    capacity=data.capacity, no_of_vehicles=data.no_of_vehicles, neighbor_k=clarke_wright_neighbors)
+        else:
+            with profiler.stage("initiate_clusters"):
+                data.node_table.set_polar_angles(depot_id=data.depot.id)
+                clusters, remaining_deliveries = Clustering.initiate_clusters(
+                    nodes=data.eligible_deliveries, no_of_vehicles=data.no_of_vehicles, capacity=data.capacity,
+                    start_angle=0 if rng is None else rng.uniform(0, 360), rng=rng)
 
-        clusters, remaining_deliveries = Clustering.initiate_clusters(nodes=data.eligible_deliveries,
-                                                                      no_of_vehicles=data.no_of_vehicles,
-                                                                      capacity=data.capacity)
+            with profiler.stage("benefits"):
+                seed_nodes = [cluster.seed_node for cluster in clusters.values()]
+                benefits = Calculations.calculate_benefit_table(clusters=clusters,
+                                                                nodes=remaining_deliveries + seed_nodes,
+                                                                distance_matrix=distance_matrix, depot=data.depot,
+                                                                use_n_n=use_n_n, seed_k=seed_k,
+                                                                coordinates=data.node_table.coordinates)
 
-        if use_n_n:
-            benefits = Calculations.calculate_nearest_neighbors_benefits(clusters=clusters, nodes=remaining_deliveries,
-                                                                         distance_matrix=distance_matrix)
-        else:
-            benefits = Calculations.calculate_savings_benefits(clusters=clusters, nodes=remaining_deliveries,
-                                                               distance_matrix=distance_matrix, depot=data.depot)
-
-        unassigned_deliveries = Clustering.finalize_clusters(clusters=clusters, nodes=remaining_deliveries,
-                                                             benefits=benefits, use_n_n=use_n_n,
-                                                             use_polar_angle=use_polar_angle)
-        Plotting.plot_route(data=data, clusters=clusters, header="Initial Route(s)")
-        if not unassigned_deliveries:
-            empty_clusters = [cluster for cluster in clusters.values() if len(cluster.nodes) == 1]
-
-            if empty_clusters:
-
-                sorted_empty_clusters = Sorting.get_sorted_clusters_by_ascending_seed_node_demand(
-                    clusters=empty_clusters)
-
-                for cluster in sorted_empty_clusters:
-                    temporary_clusters = deepcopy(clusters)
-                    Clustering.delete_cluster_nodes(clusters=temporary_clusters)
-                    temporary_remaining_deliveries = deepcopy(remaining_deliveries)
-                    temporary_remaining_deliveries.append(cluster.seed_node)
-                    del temporary_clusters[cluster.cluster_no]
-
-                    if use_n_n:
-                        new_benefits = Calculations.calculate_nearest_neighbors_benefits(clusters=temporary_clusters,
-                                                                                         nodes=temporary_remaining_deliveries,
-                                                                                         distance_matrix=distance_matrix)
-                    else:
-                        new_benefits = Calculations.calculate_savings_benefits(clusters=temporary_clusters,
-                                                                               nodes=temporary_remaining_deliveries,
+            with profiler.stage("finalize_clusters"):
+                unassigned_deliveries = Clustering.finalize_clusters(clusters=clusters, nodes=remaining_deliveries,
+                                                                     benefits=benefits, use_n_n=use_n_n,
+                                                                     use_polar_angle=use_polar_angle, rng=rng,
+                                                                     regret_k=regret_k)
+        if plot:
+            Plotting.plot_route(data=data, clusters=clusters, header="Initial Route(s)",
+                                path=os.path.join(plot_directory, "initial_routes.png") if plot_directory else None)
+        if not unassigned_deliveries and construction == 'sweep':
+            with profiler.stage("eliminate_empty_clusters"):
+                no_of_clusters = len(clusters)
+                clusters, remaining_deliveries = Clustering.eliminate_empty_clusters(clusters=clusters,
+                                                                                     nodes=remaining_deliveries,
+                                                                                     benefits=benefits,
+                                                                                     use_polar_angle=use_polar_angle,
+                                                                                     regret_k=regret_k)
+                profiler.count("clusters_eliminated", no_of_clusters - len(clusters))
+
+        with profiler.stage("pickup_benefits"):
+            benefits_for_pickups = Calculations.calculate_benefit_table(clusters=clusters, nodes=data.eligible_pickups,
+                                                                        distance_matrix=distance_matrix,
+                                                                        depot=data.depot, use_n_n=use_n_n,
+                                                                        seed_k=seed_k,
+                                                                        coordinates=data.node_table.coordinates)
+
+        with profiler.stage("add_pickups"):
+            unassigned_pickups = Clustering.add_pickups_to_clusters(
+                clusters=clusters, nodes=data.eligible_pickups, benefits=benefits_for_pickups, use_n_n=use_n_n,
+                distance_matrix=distance_matrix if pickup_insertion == 'cheapest' else None, depot=data.depot,
+                max_pickups=max_pickups)
+        data.unassigned_pickups = [node.id for node in unassigned_pickups]
+        data.unassigned_deliveries += [node.id for node in unassigned_deliveries]
+
+        with profiler.stage("create_vehicles"):
+            for index, cluster in enumerate(clusters.values()):
+                vehicle = Vehicle(id=index + 1,  capacity=cluster.capacity, route=cluster.nodes,
+                                  total_demand=cluster.total_demand, remaining_capacity=cluster.remaining_capacity)
+                data.vehicles.append(vehicle)
+                vehicle.set_route_sequence()
+                vehicle.set_fulfilment_rate()
+                vehicle.route_distance = Calculations.calculate_route_distance(nodes=vehicle.route,
+                                                                               distance_matrix=distance_matrix)
+        best_distance = RoutingService.report_solution(data=data, stage="construction", t_start=t_start,
+                                                       best_distance=None, callback=callback)
+
+        with profiler.stage("two_opt"):
+            if workers and workers > 1:
+                evaluated, accepted = ParallelTwoOpt.two_opt_vehicles(vehicles=data.vehicles,
+                                                                      distance_matrix=distance_matrix,
+                                                                      workers=workers, executor=executor,
+                                                                      best_improvement=best_improvement,
+                                                                      neighbor_k=neighbor_k, deadline=deadline)
+            else:
+                evaluated, accepted = 0, 0
+                for vehicle in data.vehicles:
+                    vehicle_evaluated, vehicle_accepted = TwoOpt.delta_two_opt(vehicle=vehicle,
                                                                                distance_matrix=distance_matrix,
-                                                                               depot=data.depot)
-
-                    new_unassigned_deliveries = Clustering.finalize_clusters(clusters=temporary_clusters,
-                                                                             nodes=temporary_remaining_deliveries,
-                                                                             benefits=new_benefits, use_n_n=use_n_n,
-                                                                             use_polar_angle=use_polar_angle)
-
-                    if new_unassigned_deliveries:
-                        continue
-                    else:
-                        clusters = temporary_clusters
-                        remaining_deliveries = temporary_remaining_deliveries
-                        unassigned_deliveries = new_unassigned_deliveries
-
-        if use_n_n:
-            benefits_for_pickups = Calculations.calculate_nearest_neighbors_benefits(clusters=clusters,
-                                                                                     nodes=data.eligible_pickups,
-                                                                                     distance_matrix=distance_matrix)
-        else:
-            benefits_for_pickups = Calculations.calculate_savings_benefits(clusters=clusters,
-                                                                           nodes=data.eligible_pickups,
-                                                                           distance_matrix=distance_matrix,
-                                                                           depot=data.depot)
-
-        unassigned_pickups = Clustering.add_pickups_to_clusters(clusters=clusters, nodes=data.eligible_pickups,
-                                                                benefits=benefits_for_pickups, use_n_n=use_n_n)
-
-        for index, cluster in enumerate(clusters.values()):
-            vehicle = Vehicle(id=index + 1,  capacity=cluster.capacity, route=cluster.nodes,
-                              total_demand=cluster.total_demand, remaining_capacity=cluster.remaining_capacity)
-            data.vehicles.append(vehicle)
-            vehicle.set_route_sequence()
-            vehicle.set_fulfilment_rate()
-            vehicle.route_distance = Calculations.calculate_route_distance(nodes=vehicle.route,
-                                                                           distance_matrix=distance_matrix)
-
-        for vehicle in data.vehicles:
-            TwoOpt.two_opt(vehicle=vehicle, distance_matrix=distance_matrix)
+                                                                               best_improvement=best_improvement,
+                                                                               neighbor_k=neighbor_k,
+                                                                               deadline=deadline)
+                    evaluated += vehicle_evaluated
+                    accepted += vehicle_accepted
+            profiler.count("two_opt_moves_evaluated", evaluated)
+            profiler.count("two_opt_moves_accepted", accepted)
+        best_distance = RoutingService.report_solution(data=data, stage="two_opt", t_start=t_start,
+                                                       best_distance=best_distance, callback=callback)
+
+        if local_search:
+            with profiler.stage("local_search"):
+                evaluated, accepted = LocalSearch.improve(vehicles=data.vehicles, distance_matrix=distance_matrix,
+                                                          neighbor_k=local_search_neighbors,
+                                                          time_limit=local_search_time_limit, deadline=deadline)
+                data.vehicles = [vehicle for vehicle in data.vehicles if vehicle.route]
+                for index, vehicle in enumerate(data.vehicles):
+                    vehicle.id = index + 1
+                profiler.count("local_search_moves_evaluated", evaluated)
+                profiler.count("local_search_moves_accepted", accepted)
+            RoutingService.report_solution(data=data, stage="local_search", t_start=t_start,
+                                           best_distance=best_distance, callback=callback)
 
         t_end = time.perf_counter()
         elapsed_time = t_end - t_start
-        data.unassigned_pickups = [node.id for node in unassigned_pickups]
-        data.unassigned_deliveries += [node.id for node in unassigned_deliveries]
         data.set_unused_vehicles()
-        output = Output.prepare_output(data=data, elapsed_time=elapsed_time)
-        print(output)
-        Plotting.plot_route(data=data, clusters=clusters, header="Final Route(s)")
+        output = Output.prepare_output(data=data, elapsed_time=elapsed_time,
+                                       profile=profiler.get_summary(elapsed_time=elapsed_time),
+                                       time_limit_reached=deadline.expired)
+        if owns_distance_matrix and isinstance(distance_matrix, DistanceProvider):
+            distance_matrix.close()
+        if verbose:
+            print(output)
+        if plot:
+            Plotting.plot_route(data=data, clusters=clusters, header="Final Route(s)",
+                                path=os.path.join(plot_directory, "final_routes.png") if plot_directory else None)
 
         return output
+
+    @staticmethod
+    def get_distance_matrix(data: DataPreparation, distance_mode: str = 'dense', cache: InstanceCache = None):
+        """Build the distance matrix of an instance, dense matrices of instance files come from the cache if given
+
+        Args:
+            data (DataPreparation): The data preparation object
+            distance_mode (str): The distance matrix memory mode, see DistanceMatrix.create_provider
+            cache (InstanceCache): The instance cache, None to disable
+
+        Returns:
+            np.ndarray | DistanceProvider: The distance matrix
+        """
+        if cache is not None and data.path and distance_mode == 'dense':
+            return cache.load_distance_matrix(path=data.path, coordinates=data.node_table.coordinates)
+        return DistanceMatrix.create_provider(coordinates=data.node_table.coordinates, mode=distance_mode)
+
+    @staticmethod
+    def report_solution(data: DataPreparation, stage: str, t_start: float, best_distance: float | None,
+                        callback: Callable[[dict], None] = None) -> float:
+        """Pass the current solution to the callback if it improves on the best one reported so far
+
+        Args:
+            data (DataPreparation): The data preparation object with the current vehicles
+            stage (str): The stage that produced the solution
+            t_start (float): The start time of the solve
+            best_distance (float | None): The total distance of the best solution reported so far, None for none
+            callback (Callable[[dict], None]): The callback, None to only track the best distance
+
+        Returns:
+            float: The total distance of the best solution reported so far
+        """
+        total_distance = sum(vehicle.route_distance for vehicle in data.vehicles)
+        if best_distance is not None and total_distance >= best_distance:
+            return best_distance
+        if callback is not None:
+            data.set_unused_vehicles()
+            solution = Output.prepare_output(data=data, elapsed_time=time.perf_counter() - t_start)
+            solution["stage"] = stage
+            callback(solution)
+        return total_distance
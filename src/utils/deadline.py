@@ -0,0 +1,29 @@
+import time
+
+
+class Deadline:
+    """A point in time the improvement stages stop at, shared by the stages of one solve.
+
+    The end is a time.monotonic timestamp, so the deadline can be sent to worker processes. A stage calls reached()
+    only while it still has work to do, so expired tells whether the deadline cut the improvement short."""
+
+    def __init__(self, time_limit: float = None):
+        self.end = None if time_limit is None else time.monotonic() + time_limit
+        self.expired = False
+
+    def reached(self) -> bool:
+        """Check if the deadline has passed, and remember it if so
+
+        Returns:
+            bool: True if the deadline has passed, False otherwise or without a time limit
+        """
+        if self.end is not None and time.monotonic() >= self.end:
+            self.expired = True
+        return self.expired
+
+    @property
+    def remaining(self) -> float | None:
+        """The seconds left until the deadline, None without a time limit"""
+        if self.end is None:
+            return None
+        return max(self.end - time.monotonic(), 0.0)
@@ -5,15 +5,18 @@ from src.models.cluster import Cluster
 
 class Sorting:
     @staticmethod
-    def get_sorted_nodes_by_polar_angle(nodes: list[Node]) -> list[Node]:
+    def get_sorted_nodes_by_polar_angle(nodes: list[Node], start_angle: float = 0) -> list[Node]:
         """Sort the nodes by polar angle
 
         Args:
             nodes (list[Node]): The list of nodes
+            start_angle (float): The angle the sweep starts at, nodes below it come last
 
         Returns:
              list[Node]: The list of nodes sorted by polar angle
         """
+        if start_angle:
+            return sorted(nodes, key=lambda x: (x.polar_angle - start_angle) % 360)
         return sorted(nodes, key=lambda x: x.polar_angle)
 
     @staticmethod
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from src.configs.config import Instance
+from src.services.service import RoutingService
+from src.services.async_service import AsyncRoutingService
+
+SCENARIO = dict(instance=Instance.instances[1], no_of_vehicles=25, no_of_pickups=10, capacity=206, use_n_n=True)
+LARGE_SCENARIO = dict(instance={"generator": {"no_of_customers": 3000, "route_size": 15, "seed": 1}},
+                      no_of_vehicles=220, no_of_pickups=20, capacity=None, use_n_n=True, local_search=True)
+
+
+def test_concurrent_requests_match_the_blocking_solve(tmp_path):
+    expected = RoutingService.solve_routing(plot=False, verbose=False, **SCENARIO)
+
+    async def solve_all():
+        async with AsyncRoutingService(workers=2, cache_directory=str(tmp_path)) as service:
+            return await asyncio.gather(*[service.solve(**SCENARIO) for _ in range(6)])
+
+    outputs = asyncio.run(solve_all())
+
+    assert all(output["routes"] == expected["routes"] for output in outputs)
+    assert all(output["total_distance"] == expected["total_distance"] for output in outputs)
+
+
+def test_timeout_and_cancellation_free_the_slot(tmp_path):
+    async def solve_after_giving_up():
+        async with AsyncRoutingService(workers=1, cache_directory=str(tmp_path)) as service:
+            with pytest.raises(TimeoutError):
+                await service.solve(timeout=0.2, **LARGE_SCENARIO)
+            task = asyncio.create_task(service.solve(**LARGE_SCENARIO))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return await asyncio.wait_for(service.solve(**SCENARIO), timeout=30)
+
+    output = asyncio.run(solve_after_giving_up())
+
+    assert output["unassigned_deliveries"] == []
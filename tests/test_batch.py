@@ -0,0 +1,28 @@
+import io
+import json
+
+from src.services.batch import BatchRunner
+
+
+def test_expand_grid_and_parse_bool():
+    scenarios = BatchRunner.expand_grid(grid={"instance": [1, 2], "capacity": 100, "use_n_n": ["True", "False"]})
+
+    assert len(scenarios) == 4
+    assert scenarios[1] == {"instance": 1, "capacity": 100, "use_n_n": "False"}
+    assert BatchRunner.parse_bool("False") is False
+    assert BatchRunner.parse_bool("yes") is True
+
+
+def test_run_streams_one_json_line_per_scenario(tmp_path):
+    scenarios = [{"instance": 1, "no_of_vehicles": 25, "no_of_pickups": 10, "capacity": 206, "use_n_n": "True",
+                  "plot": True, "verbose": True},
+                 {"instance": 1, "no_of_vehicles": 25, "no_of_pickups": 10, "capacity": 206, "use_n_n": "maybe"}]
+    output = io.StringIO()
+
+    BatchRunner.run(scenarios=scenarios, output=output, cache_directory=str(tmp_path))
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert len(results) == 2
+    assert results[0]["unassigned_deliveries"] == 0
+    assert results[0]["total_distance"] > 0
+    assert results[1]["error"].startswith("ValueError")
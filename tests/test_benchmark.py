@@ -0,0 +1,26 @@
+from src.services.benchmark import Benchmark
+
+
+def test_compare_reports_regressions_beyond_tolerance():
+    baseline = {"a": {"elapsed_time": 1.0, "stage_times": {"two_opt": 0.5}, "peak_memory": 1000,
+                      "total_distance": 100.0, "unassigned_pickups": 0, "unassigned_deliveries": 0}}
+    within = {"a": {"elapsed_time": 1.4, "stage_times": {"two_opt": 0.7}, "peak_memory": 1200,
+                    "total_distance": 100.0, "unassigned_pickups": 0, "unassigned_deliveries": 0}}
+    beyond = {"a": {"elapsed_time": 1.6, "stage_times": {"two_opt": 0.5}, "peak_memory": 1000,
+                    "total_distance": 101.0, "unassigned_pickups": 0, "unassigned_deliveries": 1}}
+
+    assert Benchmark.compare(results=within, baseline=baseline, timings=True) == []
+    regressions = Benchmark.compare(results=beyond, baseline=baseline, timings=True)
+    assert [regression.split()[1] for regression in regressions] == ["elapsed_time", "total_distance",
+                                                                     "unassigned_deliveries"]
+    regressions = Benchmark.compare(results=beyond, baseline=baseline)
+    assert [regression.split()[1] for regression in regressions] == ["total_distance", "unassigned_deliveries"]
+
+
+def test_run_matches_the_baseline(tmp_path):
+    results = Benchmark.run(names=["X-n101-k25-nn"], repeat=1, synthetic=False)
+    Benchmark.save_baseline(results=results, path=str(tmp_path / "baseline.json"))
+
+    assert results["X-n101-k25-nn"]["unassigned_deliveries"] == 0
+    assert Benchmark.load_baseline(path=str(tmp_path / "baseline.json")) == results
+    assert Benchmark.compare(results=results, baseline=Benchmark.load_baseline(), distance_tolerance=0) == []
@@ -2,6 +2,7 @@ import numpy as np
 
 from src.models.node import Node
 from src.models.location import Location
+from src.models.cluster import Cluster
 from src.methods.calculations import Calculations
 
 
@@ -24,3 +25,30 @@ def test_create_distance_matrix(monkeypatch):
     expected_distance_matrix = np.array([[0, 5], [5, 0]])
 
     assert np.array_equal(distance_matrix, expected_distance_matrix)
+
+
+def test_calculate_benefit_table_matches_benefit_dictionaries():
+    nodes = [Node(id=index, location=Location(lat=lat, lon=lon))
+             for index, (lat, lon) in enumerate([(0, 0), (4, 3), (10, 1), (7, 7), (2, 9), (5, 5)])]
+    distance_matrix = Calculations.create_distance_matrix(nodes=nodes)
+    clusters = {1: Cluster(cluster_no=1, seed_node=nodes[1], nodes=[nodes[1]], capacity=10),
+                2: Cluster(cluster_no=2, seed_node=nodes[4], nodes=[nodes[4]], capacity=10)}
+    candidates = [nodes[2], nodes[3], nodes[5]]
+
+    neighbors = Calculations.calculate_nearest_neighbors_benefits(clusters=clusters, nodes=candidates,
+                                                                  distance_matrix=distance_matrix)
+    savings = Calculations.calculate_savings_benefits(clusters=clusters, nodes=candidates,
+                                                      distance_matrix=distance_matrix, depot=nodes[0])
+    neighbors_table = Calculations.calculate_benefit_table(clusters=clusters, nodes=candidates,
+                                                           distance_matrix=distance_matrix, depot=nodes[0], use_n_n=True)
+    savings_table = Calculations.calculate_benefit_table(clusters=clusters, nodes=candidates,
+                                                         distance_matrix=distance_matrix, depot=nodes[0], use_n_n=False)
+
+    assert neighbors_table.to_benefits() == neighbors
+    assert savings_table.to_benefits() == savings
+    for node in candidates:
+        assert neighbors_table.get_ranked_cluster_nos(node_id=node.id) == [
+            benefit.cluster_no for benefit in sorted(neighbors["node_ids"][node.id], key=lambda x: x.distance)]
+        assert savings_table.get_ranked_cluster_nos(node_id=node.id) == [
+            benefit.cluster_no for benefit in sorted(savings["node_ids"][node.id], key=lambda x: x.distance,
+                                                     reverse=True)]
@@ -0,0 +1,48 @@
+from src.configs.config import Instance
+from src.services.service import RoutingService
+from src.data.data_preparation import DataPreparation
+from src.methods.clarke_wright import ClarkeWright
+from src.methods.distance_matrix import DistanceMatrix
+
+
+def test_build_routes_merges_within_capacity():
+    data = DataPreparation(instance={"generator": {"no_of_customers": 300, "seed": 3}}, no_of_vehicles=60,
+                           no_of_pickups=5)
+    distance_matrix = DistanceMatrix.create_provider(coordinates=data.node_table.coordinates, mode='dense')
+    routes = ClarkeWright.build_routes(nodes=data.eligible_deliveries, distance_matrix=distance_matrix,
+                                       depot=data.depot, capacity=data.capacity, neighbor_k=10)
+
+    node_ids = [node.id for route in routes for node in route]
+    assert sorted(node_ids) == sorted(node.id for node in data.eligible_deliveries)
+    assert all(sum(node.demand for node in route) <= data.capacity for route in routes)
+    assert len(routes) < len(data.eligible_deliveries) // 2
+
+
+def test_create_clusters_inserts_the_nodes_of_the_dropped_routes():
+    data = DataPreparation(instance=Instance.instances[4], no_of_vehicles=44, no_of_pickups=10, capacity=87)
+    distance_matrix = DistanceMatrix.create_provider(coordinates=data.node_table.coordinates, mode='dense')
+    routes = ClarkeWright.build_routes(nodes=data.eligible_deliveries, distance_matrix=distance_matrix,
+                                       depot=data.depot, capacity=data.capacity)
+    clusters, unassigned_nodes = ClarkeWright.create_clusters(nodes=data.eligible_deliveries,
+                                                              distance_matrix=distance_matrix, depot=data.depot,
+                                                              capacity=data.capacity, no_of_vehicles=len(routes) - 2)
+
+    dropped = sorted(routes, key=lambda route: sum(node.demand for node in route))[:2]
+    assigned_ids = [node.id for cluster in clusters.values() for node in cluster.nodes]
+    assert len(clusters) == len(routes) - 2
+    assert len(unassigned_nodes) < sum(len(route) for route in dropped)
+    assert sorted(assigned_ids + [node.id for node in unassigned_nodes]) == \
+        sorted(node.id for node in data.eligible_deliveries)
+    assert all(cluster.total_demand == sum(node.demand for node in cluster.nodes) <= cluster.capacity and
+               cluster.seed_node in cluster.nodes for cluster in clusters.values())
+    assert all(node.demand > cluster.remaining_capacity for node in unassigned_nodes for cluster in clusters.values())
+
+
+def test_solve_with_clarke_wright():
+    arguments = dict(instance=Instance.instances[4], no_of_vehicles=44, no_of_pickups=10, capacity=87, use_n_n=True,
+                     plot=False, verbose=False)
+    sweep = RoutingService.solve_routing(**arguments)
+    output = RoutingService.solve_routing(construction='clarke_wright', **arguments)
+
+    assert output["unassigned_deliveries"] == [] and output["unassigned_pickups"] == []
+    assert output["total_distance"] < sweep["total_distance"]
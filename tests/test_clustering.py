@@ -1,8 +1,12 @@
+import numpy as np
+
 from src.models.node import Node
 from src.models.cluster import Cluster
 from src.utils.sorting import Sorting
 from src.models.benefit import Benefit
+from src.models.benefit_table import BenefitTable
 from src.methods.clustering import Clustering
+from src.methods.distance_matrix import DistanceMatrix
 
 
 def test_finalize_clusters(monkeypatch):
@@ -37,3 +41,92 @@ def test_finalize_clusters(monkeypatch):
     assert len(unassigned_nodes) == 0
     assert clusters[1].remaining_capacity == 23
     assert clusters[2].remaining_capacity == 35
+
+
+def test_eliminate_empty_clusters():
+    seed_1 = Node(id=1, demand=10, polar_angle=10)
+    seed_2 = Node(id=2, demand=5, polar_angle=50)
+    node_3 = Node(id=3, demand=20, polar_angle=5)
+    clusters = {1: Cluster(cluster_no=1, seed_node=seed_1, nodes=[seed_1, node_3], capacity=40),
+                2: Cluster(cluster_no=2, seed_node=seed_2, nodes=[seed_2], capacity=40)}
+    benefits = BenefitTable(node_ids=[3, 1, 2], cluster_nos=[1, 2],
+                            values=np.array([[1.0, 2.0], [0.0, 3.0], [3.0, 0.0]]), ascending=True)
+
+    clusters, remaining_nodes = Clustering.eliminate_empty_clusters(clusters=clusters, nodes=[node_3],
+                                                                    benefits=benefits, use_polar_angle=True)
+
+    assert list(clusters) == [1]
+    assert [node.id for node in clusters[1].nodes] == [3, 1, 2]
+    assert clusters[1].remaining_capacity == 5
+    assert [node.id for node in remaining_nodes] == [3, 2]
+    assert benefits.cluster_nos == [1]
+
+
+def test_failed_elimination_is_rolled_back():
+    seed_1, seed_2, seed_3 = (Node(id=1, demand=10, polar_angle=10), Node(id=2, demand=5, polar_angle=50),
+                              Node(id=4, demand=25, polar_angle=90))
+    node_3 = Node(id=3, demand=20, polar_angle=5)
+    clusters = {1: Cluster(cluster_no=1, seed_node=seed_1, nodes=[seed_1, node_3], capacity=40),
+                2: Cluster(cluster_no=2, seed_node=seed_2, nodes=[seed_2], capacity=40),
+                3: Cluster(cluster_no=3, seed_node=seed_3, nodes=[seed_3], capacity=40)}
+    benefits = BenefitTable(node_ids=[3, 1, 2, 4], cluster_nos=[1, 2, 3],
+                            values=np.array([[1.0, 2.0, 3.0], [0.0, 3.0, 3.0], [3.0, 0.0, 1.0], [1.0, 2.0, 0.0]]),
+                            ascending=True)
+
+    # Cluster 2 is eliminated, cluster 3 is not: its seed node and node 3 do not both fit cluster 1
+    clusters, remaining_nodes = Clustering.eliminate_empty_clusters(clusters=clusters, nodes=[node_3],
+                                                                    benefits=benefits, use_polar_angle=True)
+
+    assert list(clusters) == [1, 3] and benefits.cluster_nos == [1, 3]
+    assert [node.id for node in clusters[1].nodes] == [3, 1]
+    assert [node.id for node in clusters[3].nodes] == [2, 4]
+    assert (clusters[1].total_demand, clusters[1].remaining_capacity) == (30, 10)
+    assert (clusters[3].total_demand, clusters[3].remaining_capacity) == (30, 10)
+    assert [node.id for node in remaining_nodes] == [3, 2]
+
+
+def test_finalize_clusters_by_regret():
+    def get_clusters():
+        return {1: Cluster(cluster_no=1, seed_node=Node(id=1, demand=2, polar_angle=5),
+                           nodes=[Node(id=1, demand=2, polar_angle=5)], capacity=10),
+                2: Cluster(cluster_no=2, seed_node=Node(id=2, demand=2, polar_angle=5),
+                           nodes=[Node(id=2, demand=2, polar_angle=5)], capacity=10)}
+    nodes = [Node(id=3, demand=6, polar_angle=1), Node(id=4, demand=5, polar_angle=1)]
+    benefits = BenefitTable(node_ids=[3, 4], cluster_nos=[1, 2], values=np.array([[1.0, 2.0], [1.0, 100.0]]),
+                            ascending=True)
+
+    by_demand = get_clusters()
+    Clustering.finalize_clusters(clusters=by_demand, nodes=nodes, benefits=benefits, use_n_n=True,
+                                 use_polar_angle=False)
+    by_regret = get_clusters()
+    unassigned_nodes = Clustering.finalize_clusters(clusters=by_regret, nodes=nodes, benefits=benefits, use_n_n=True,
+                                                    use_polar_angle=False, regret_k=2)
+
+    assert [[node.id for node in cluster.nodes] for cluster in by_demand.values()] == [[1, 3], [2, 4]]
+    assert [[node.id for node in cluster.nodes] for cluster in by_regret.values()] == [[1, 4], [2, 3]]
+    assert unassigned_nodes == []
+    assert [cluster.remaining_capacity for cluster in by_regret.values()] == [3, 2]
+
+
+def test_insert_pickups_at_the_cheapest_feasible_position():
+    distance_matrix = DistanceMatrix.create(coordinates=np.array([[0, 0], [9, 1], [10, 0], [10, 10], [0, 20], [5, 5]],
+                                                                   dtype=np.float64))
+    depot = Node(id=0, node_type='depot')
+    pickup = Node(id=1, demand=4, node_type='pickup')
+
+    for capacity, expected in ((10, [2, 1, 3]), (20, [1, 2, 3])):
+        nodes = [Node(id=2, demand=5, node_type='delivery'), Node(id=3, demand=5, node_type='delivery')]
+        clusters = {1: Cluster(cluster_no=1, seed_node=nodes[0], nodes=nodes, capacity=capacity),
+                    2: Cluster(cluster_no=2, seed_node=Node(id=4, demand=5, node_type='delivery'),
+                               nodes=[Node(id=4, demand=5, node_type='delivery')], capacity=capacity)}
+
+        unassigned_nodes = Clustering.insert_pickups(clusters=clusters, nodes=[pickup],
+                                                     distance_matrix=distance_matrix, depot=depot)
+
+        assert unassigned_nodes == []
+        assert [node.id for node in clusters[1].nodes] == expected
+
+    second_pickup = Node(id=5, demand=4, node_type='pickup')
+    unassigned_nodes = Clustering.insert_pickups(clusters={1: clusters[1]}, nodes=[second_pickup],
+                                                 distance_matrix=distance_matrix, depot=depot)
+    assert unassigned_nodes == [second_pickup]
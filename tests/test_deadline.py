@@ -0,0 +1,35 @@
+from src.utils.deadline import Deadline
+from src.configs.config import Instance
+from src.services.service import RoutingService
+
+
+def test_deadline():
+    assert not Deadline().reached() and Deadline().remaining is None
+    deadline = Deadline(time_limit=0)
+
+    assert deadline.reached() and deadline.expired
+    assert deadline.remaining == 0
+
+
+def test_time_limit_keeps_the_construction_and_reports_the_cut():
+    solutions = []
+    output = RoutingService.solve_routing(instance=Instance.instances[1], no_of_vehicles=25, no_of_pickups=10,
+                                          capacity=206, use_n_n=True, time_limit=0, callback=solutions.append,
+                                          plot=False, verbose=False)
+
+    assert output["time_limit_reached"] is True
+    assert [solution["stage"] for solution in solutions] == ["construction"]
+    assert output["total_distance"] == solutions[0]["total_distance"]
+    assert output["profile"]["counts"]["two_opt_moves_evaluated"] == 0
+
+
+def test_callback_receives_improving_solutions():
+    solutions = []
+    output = RoutingService.solve_routing(instance=Instance.instances[1], no_of_vehicles=25, no_of_pickups=10,
+                                          capacity=206, use_n_n=True, local_search=True, time_limit=60,
+                                          callback=solutions.append, plot=False, verbose=False)
+    distances = [solution["total_distance"] for solution in solutions]
+
+    assert output["time_limit_reached"] is False
+    assert [solution["stage"] for solution in solutions] == ["construction", "two_opt", "local_search"]
+    assert distances == sorted(distances, reverse=True) and distances[-1] == output["total_distance"]
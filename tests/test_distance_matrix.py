@@ -0,0 +1,38 @@
+import numpy as np
+
+from src.models.node import Node
+from src.models.location import Location
+from src.methods.calculations import Calculations
+from src.methods.distance_matrix import DistanceMatrix
+
+
+def test_create_matches_pairwise_distances():
+    nodes = [Node(id=0, location=Location(lat=0, lon=0)),
+             Node(id=1, location=Location(lat=146, lon=180)),
+             Node(id=2, location=Location(lat=792, lon=5)),
+             Node(id=3, location=Location(lat=658, lon=510))]
+
+    distance_matrix = DistanceMatrix.create(coordinates=DistanceMatrix.get_coordinates(nodes=nodes))
+
+    for row_index, node_1 in enumerate(nodes):
+        for column_index, node_2 in enumerate(nodes):
+            assert distance_matrix[row_index][column_index] == Calculations.calculate_distance(node_1, node_2)
+
+
+def test_create_with_euc_2d_rounding_and_float32():
+    coordinates = np.array([[0, 0], [1, 1], [3, 4]], dtype=np.float64)
+
+    distance_matrix = DistanceMatrix.create(coordinates=coordinates, dtype=np.float32, round_to_int=True)
+
+    assert distance_matrix.dtype == np.float32
+    assert np.array_equal(distance_matrix, np.array([[0, 1, 5], [1, 0, 4], [5, 4, 0]]))
+
+
+def test_get_neighbor_lists():
+    coordinates = np.array([[0, 0], [1, 0], [3, 0], [7, 0], [8, 0]], dtype=np.float64)
+    distance_matrix = DistanceMatrix.create(coordinates=coordinates)
+
+    neighbor_lists = DistanceMatrix.get_neighbor_lists(distance_matrix=distance_matrix, node_ids=[1, 2, 3, 4],
+                                                       neighbor_k=2, block_size=3)
+
+    assert neighbor_lists == {1: [2, 3], 2: [1, 3], 3: [4, 2], 4: [3, 2]}
@@ -0,0 +1,44 @@
+import os
+import tempfile
+
+import numpy as np
+
+from src.configs.config import Instance
+from src.services.service import RoutingService
+from src.methods.distance_matrix import DistanceMatrix
+
+
+def test_providers_match_dense_matrix(tmp_path):
+    coordinates = np.random.default_rng(7).integers(0, 1000, size=(30, 2)).astype(np.float64)
+    dense = DistanceMatrix.create(coordinates=coordinates)
+
+    lazy = DistanceMatrix.create_provider(coordinates=coordinates, mode='lazy', cache_size=4)
+    condensed = DistanceMatrix.create_provider(coordinates=coordinates, mode='condensed', block_size=7)
+    memmap = DistanceMatrix.create_provider(coordinates=coordinates, mode='memmap', block_size=7,
+                                            path=str(tmp_path / "matrix.dat"))
+
+    for index in range(len(coordinates)):
+        assert np.array_equal(lazy[index], dense[index])
+        assert np.array_equal(memmap[index], dense[index])
+        assert np.allclose(condensed.row(index), dense[index], rtol=1e-6)
+        assert condensed[index, 3] == condensed[3][index] == np.asarray(condensed[index])[3]
+    assert len(lazy.rows) == 4
+    assert condensed.memory_usage < DistanceMatrix.get_memory_usage(dense)
+    assert DistanceMatrix.estimate_memory_usage(no_of_nodes=30, mode='condensed') == condensed.memory_usage
+
+
+def test_memmap_temporary_file_is_removed(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    coordinates = np.random.default_rng(8).integers(0, 1000, size=(20, 2)).astype(np.float64)
+
+    with DistanceMatrix.create_provider(coordinates=coordinates, mode='memmap') as memmap:
+        assert os.path.exists(memmap.path)
+    assert not os.path.exists(memmap.path)
+
+    kept = DistanceMatrix.create_provider(coordinates=coordinates, mode='memmap', path=str(tmp_path / "matrix.dat"))
+    kept.close()
+    assert os.path.exists(kept.path)
+
+    RoutingService.solve_routing(instance=Instance.instances[1], no_of_vehicles=25, no_of_pickups=10, capacity=206,
+                                 use_n_n=True, distance_mode='memmap', plot=False, verbose=False)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["matrix.dat"]
@@ -0,0 +1,25 @@
+import sys
+import subprocess
+
+from src.configs.config import Instance
+from src.services.service import RoutingService
+
+
+def test_headless_solve_does_not_import_matplotlib():
+    code = ("import sys\n"
+            "from src.configs.config import Instance\n"
+            "from src.services.service import RoutingService\n"
+            "RoutingService.solve_routing(instance=Instance.instances[1], no_of_vehicles=25, no_of_pickups=10,\n"
+            "                             capacity=206, use_n_n=True, plot=False, verbose=False)\n"
+            "print('matplotlib' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "False"
+
+
+def test_plots_are_rendered_to_files(tmp_path):
+    RoutingService.solve_routing(instance=Instance.instances[1], no_of_vehicles=25, no_of_pickups=10, capacity=206,
+                                 use_n_n=True, plot_directory=str(tmp_path / "plots" / "run"), verbose=False)
+
+    assert (tmp_path / "plots" / "run" / "initial_routes.png").stat().st_size > 0
+    assert (tmp_path / "plots" / "run" / "final_routes.png").stat().st_size > 0
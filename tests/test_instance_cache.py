@@ -0,0 +1,35 @@
+import shutil
+
+import numpy as np
+
+from src.data.instance_cache import InstanceCache
+
+
+def test_instance_cache_reuses_and_invalidates_entries(tmp_path):
+    path = tmp_path / "X-n101-k25.txt"
+    shutil.copy('src/data/input/X-n101-k25.txt', path)
+    cache = InstanceCache(directory=str(tmp_path / "cache"))
+
+    instance = cache.load_instance(path=str(path))
+    distance_matrix = cache.load_distance_matrix(path=str(path), coordinates=instance.coordinates)
+    cached_instance = cache.load_instance(path=str(path))
+    cached_distance_matrix = cache.load_distance_matrix(path=str(path), coordinates=instance.coordinates)
+
+    assert cached_instance.capacity == instance.capacity == 206
+    assert np.array_equal(cached_instance.coordinates, instance.coordinates)
+    assert np.array_equal(cached_distance_matrix, distance_matrix)
+    assert not cached_distance_matrix.flags.writeable
+
+    path.write_text(path.read_text().replace("CAPACITY : \t206", "CAPACITY : \t300"))
+    assert cache.load_instance(path=str(path)).capacity == 300
+
+
+def test_instance_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = InstanceCache(directory=str(tmp_path), max_size=150_000)
+
+    for name in ('X-n101-k25', 'X-n251-k28'):
+        instance = cache.load_instance(path=f'src/data/input/{name}.txt')
+        cache.load_distance_matrix(path=f'src/data/input/{name}.txt', coordinates=instance.coordinates)
+
+    assert cache.size <= 150_000 or len(list(tmp_path.iterdir())) == 1
+    assert any(entry.name.endswith('.npy') for entry in tmp_path.iterdir())
@@ -0,0 +1,35 @@
+import numpy as np
+
+from src.data.instance_parser import InstanceParser
+from src.data.data_preparation import DataPreparation
+from src.data.instance_generator import InstanceGenerator
+
+
+def test_generate_is_seeded_and_distinct():
+    instance = InstanceGenerator.generate(no_of_customers=500, depot_position='C', customer_position='RC',
+                                          demand_distribution='Q', route_size=10, seed=7)
+    again = InstanceGenerator.generate(no_of_customers=500, depot_position='C', customer_position='RC',
+                                       demand_distribution='Q', route_size=10, seed=7)
+
+    assert instance.dimension == 501
+    assert instance.coordinates[0].tolist() == [500, 500]
+    assert len({tuple(point) for point in instance.coordinates.tolist()}) == 501
+    assert np.array_equal(instance.coordinates, again.coordinates)
+    assert np.array_equal(instance.demand, again.demand)
+    assert instance.demand[0] == 0 and 1 <= instance.demand[1:].min() and instance.demand.max() <= 100
+    assert instance.capacity == np.ceil(10 * instance.demand.sum() / 500)
+
+
+def test_written_instance_round_trips_and_solves(tmp_path):
+    instance = InstanceGenerator.generate(no_of_customers=300, seed=3)
+    InstanceGenerator.write(instance=instance, path=str(tmp_path / "generated.vrp"))
+    parsed = InstanceParser.parse(path=str(tmp_path / "generated.vrp"))
+
+    assert parsed.name == instance.name and parsed.capacity == instance.capacity
+    assert np.array_equal(parsed.coordinates, instance.coordinates)
+    assert np.array_equal(parsed.demand, instance.demand)
+
+    data = DataPreparation(instance={"generator": {"no_of_customers": 300, "seed": 3}}, no_of_vehicles=60,
+                           no_of_pickups=5)
+    assert data.capacity == instance.capacity
+    assert len(data.nodes) == 301
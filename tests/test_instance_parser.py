@@ -0,0 +1,54 @@
+import pytest
+
+from src.data.instance_parser import InstanceParser
+
+
+def test_parse_bundled_instance():
+    instance = InstanceParser.parse(path='src/data/input/X-n101-k25.txt')
+
+    assert instance.name == 'X-n101-k25'
+    assert instance.dimension == 101
+    assert instance.capacity == 206
+    assert instance.edge_weight_type == 'EUC_2D'
+    assert instance.coordinates.shape == (101, 2)
+    assert instance.coordinates[1].tolist() == [146, 180]
+    assert int(instance.demand.sum()) == 5147
+
+
+def test_parse_moves_depot_to_first_row(tmp_path):
+    path = tmp_path / "small.vrp"
+    path.write_text("NAME : small\nTYPE : CVRP\nDIMENSION : 3\nEDGE_WEIGHT_TYPE : EUC_2D\nCAPACITY : 10\n"
+                    "NODE_COORD_SECTION\n1 5 5\n2 0 0\n3 7 1\nDEMAND_SECTION\n1 4\n2 0\n3 6\n"
+                    "DEPOT_SECTION\n2\n-1\nEOF\n")
+
+    instance = InstanceParser.parse(path=str(path))
+
+    assert instance.depot_ids == [1]
+    assert instance.coordinates.tolist() == [[0, 0], [5, 5], [7, 1]]
+    assert instance.demand.tolist() == [0, 4, 6]
+
+
+def test_parse_skips_unknown_sections(tmp_path):
+    path = tmp_path / "small.vrp"
+    path.write_text("NAME : small\nDIMENSION : 3\nEDGE_WEIGHT_TYPE : EUC_2D\nCAPACITY : 10\n"
+                    "NODE_COORD_SECTION\n1 5 5\n2 0 0\n3 7 1\nDEMAND_SECTION\n1 0\n2 4\n3 6\n"
+                    "FOO_SECTION\n1 9\n2 9\nDEPOT_SECTION\n1\n-1\nEOF\n")
+
+    instance = InstanceParser.parse(path=str(path))
+
+    assert instance.demand.tolist() == [0, 4, 6]
+
+
+@pytest.mark.parametrize("text, message", [
+    ("DIMENSION : 3\nEDGE_WEIGHT_TYPE : EXPLICIT\n", "EDGE_WEIGHT_TYPE"),
+    ("NODE_COORD_SECTION\n1 5 5\n2 0 0\n3 7 1\n", "DIMENSION"),
+    ("DIMENSION : 3\nNODE_COORD_SECTION\n1 5 5\n2 0 0\n3 7 1\n", "DEMAND_SECTION"),
+    ("DIMENSION : 3\nNODE_COORD_SECTION\n1 5 5\n3 7 1\nDEMAND_SECTION\n1 0\n2 4\n3 6\n", "NODE_COORD_SECTION"),
+    ("DIMENSION : 3\nNODE_COORD_SECTION\n1 5 5\n2 0 0\n3 7 1\nDEMAND_SECTION\n1 0\n1 4\n3 6\n", "DEMAND_SECTION"),
+])
+def test_parse_rejects_invalid_instances(tmp_path, text, message):
+    path = tmp_path / "invalid.vrp"
+    path.write_text(text + "EOF\n")
+
+    with pytest.raises(ValueError, match=message):
+        InstanceParser.parse(path=str(path))
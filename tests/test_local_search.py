@@ -0,0 +1,74 @@
+import numpy as np
+
+from src.models.node import Node
+from src.models.location import Location
+from src.models.vehicle import Vehicle
+from src.methods.two_opt import TwoOpt
+from src.methods.local_search import LocalSearch
+from src.methods.calculations import Calculations
+from src.methods.distance_matrix import DistanceMatrix
+
+
+def get_vehicles(points: list[tuple], routes: list[list[int]], capacity: int):
+    nodes = [Node(id=node_id, location=Location(lat=lat, lon=lon), demand=demand, node_type=node_type)
+             for node_id, (lat, lon, demand, node_type) in enumerate(points)]
+    distance_matrix = DistanceMatrix.create(coordinates=DistanceMatrix.get_coordinates(nodes=nodes))
+    vehicles = []
+    for route in routes:
+        vehicle = Vehicle(capacity=capacity, route=[nodes[node_id] for node_id in route])
+        vehicle.route_distance = Calculations.calculate_route_distance(nodes=vehicle.route,
+                                                                       distance_matrix=distance_matrix)
+        vehicles.append(vehicle)
+    return vehicles, distance_matrix
+
+
+def test_relocate_moves_a_node_to_the_route_next_to_it():
+    points = [(0, 0, 0, 'depot'), (10, 0, 1, 'delivery'), (0.5, 10.5, 1, 'delivery'), (10, 1, 1, 'delivery'),
+              (0, 10, 1, 'delivery'), (1, 10, 1, 'delivery')]
+    vehicles, distance_matrix = get_vehicles(points=points, routes=[[1, 2, 3], [4, 5]], capacity=3)
+    total_distance = sum(vehicle.route_distance for vehicle in vehicles)
+
+    evaluated, accepted = LocalSearch.improve(vehicles=vehicles, distance_matrix=distance_matrix, neighbor_k=3)
+
+    assert accepted >= 1 and evaluated >= accepted
+    assert sorted(sorted(node.id for node in vehicle.route) for vehicle in vehicles) == [[1, 3], [2, 4, 5]]
+    assert sorted(vehicle.total_demand for vehicle in vehicles) == [2, 3]
+    assert sum(vehicle.route_distance for vehicle in vehicles) < total_distance
+    assert all(np.isclose(vehicle.route_distance, Calculations.calculate_route_distance(
+        nodes=vehicle.route, distance_matrix=distance_matrix)) for vehicle in vehicles)
+
+
+def test_moves_keep_the_pickup_feasible():
+    # The pickup of the second route leaves no room for another delivery after it
+    points = [(0, 0, 0, 'depot'), (10, 0, 1, 'delivery'), (0.5, 10.5, 1, 'delivery'), (10, 1, 1, 'delivery'),
+              (0, 10, 1, 'delivery'), (1, 10, 1, 'delivery'), (0, 9, 9, 'pickup')]
+    vehicles, distance_matrix = get_vehicles(points=points, routes=[[1, 2, 3], [6, 4, 5]], capacity=11)
+
+    LocalSearch.improve(vehicles=vehicles, distance_matrix=distance_matrix, neighbor_k=5)
+
+    route = vehicles[1].route_sequence
+    assert 2 not in route or route.index(2) < route.index(6)
+    assert all(vehicle.is_route_feasible(route=vehicle.route) for vehicle in vehicles)
+    assert all(vehicle.total_demand <= vehicle.capacity for vehicle in vehicles)
+
+
+def test_time_limit_stops_the_search():
+    points = [(0, 0, 0, 'depot'), (10, 0, 1, 'delivery'), (0.5, 10.5, 1, 'delivery'), (10, 1, 1, 'delivery'),
+              (0, 10, 1, 'delivery'), (1, 10, 1, 'delivery')]
+    vehicles, distance_matrix = get_vehicles(points=points, routes=[[1, 2, 3], [4, 5]], capacity=10)
+
+    assert LocalSearch.improve(vehicles=vehicles, distance_matrix=distance_matrix, time_limit=0) == (0, 0)
+    assert [node.id for node in vehicles[0].route] == [1, 2, 3]
+
+
+def test_counts_include_the_two_opt_of_the_changed_routes(monkeypatch):
+    points = [(0, 0, 0, 'depot'), (10, 0, 1, 'delivery'), (0.5, 10.5, 1, 'delivery'), (10, 1, 1, 'delivery'),
+              (0, 10, 1, 'delivery'), (1, 10, 1, 'delivery')]
+    monkeypatch.setattr(TwoOpt, "delta_two_opt", lambda vehicle, distance_matrix, deadline: (0, 0))
+    vehicles, distance_matrix = get_vehicles(points=points, routes=[[1, 2, 3], [4, 5]], capacity=3)
+    evaluated, accepted = LocalSearch.improve(vehicles=vehicles, distance_matrix=distance_matrix, neighbor_k=3)
+
+    monkeypatch.setattr(TwoOpt, "delta_two_opt", lambda vehicle, distance_matrix, deadline: (100, 7))
+    vehicles, distance_matrix = get_vehicles(points=points, routes=[[1, 2, 3], [4, 5]], capacity=3)
+    assert LocalSearch.improve(vehicles=vehicles, distance_matrix=distance_matrix, neighbor_k=3) == \
+        (evaluated + 200, accepted + 14)
@@ -0,0 +1,47 @@
+from src.configs.config import Instance
+from src.services.service import RoutingService
+from src.services.profiler import Profiler
+from src.services.multi_start import MultiStart
+
+
+def solve(**kwargs) -> dict:
+    return RoutingService.solve_routing(instance=Instance.instances[2], no_of_vehicles=28, no_of_pickups=10,
+                                        capacity=69, use_n_n=True, plot=False, verbose=False, **kwargs)
+
+
+def test_construction_seeds():
+    seeds = MultiStart.get_construction_seeds(starts=4, seed=1)
+
+    assert seeds[0] is None and len(set(seeds[1:])) == 3
+    assert seeds == MultiStart.get_construction_seeds(starts=4, seed=1)
+    assert seeds != MultiStart.get_construction_seeds(starts=4, seed=2)
+
+
+def test_first_start_is_the_deterministic_construction():
+    output = solve(starts=4, seed=1)
+
+    assert [start["start"] for start in output["starts"]] == [0, 1, 2, 3]
+    assert output["starts"][0]["total_distance"] == solve()["total_distance"]
+    assert output["total_distance"] == output["starts"][output["best_start"]]["total_distance"]
+    assert output["total_distance"] <= min(start["total_distance"] for start in output["starts"]
+                                           if start["unassigned_deliveries"] + start["unassigned_pickups"] == 0)
+
+
+def test_parallel_starts_match_serial_starts():
+    serial = solve(starts=3, seed=7)
+    parallel = solve(starts=3, seed=7, workers=2)
+
+    assert [start["total_distance"] for start in serial["starts"]] == \
+        [start["total_distance"] for start in parallel["starts"]]
+    assert serial["routes"] == parallel["routes"]
+
+
+def test_plot_and_profile_of_the_best_start(tmp_path):
+    profiler = Profiler()
+    output = RoutingService.solve_routing(instance=Instance.instances[2], no_of_vehicles=28, no_of_pickups=10,
+                                          capacity=69, use_n_n=True, verbose=False, starts=3, seed=7,
+                                          plot_directory=str(tmp_path / "plots"), profiler=profiler)
+
+    assert (tmp_path / "plots" / "final_routes.png").exists()
+    assert profiler.stage_times == output["profile"]["stage_times"]
+    assert profiler.counts == output["profile"]["counts"]
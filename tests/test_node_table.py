@@ -0,0 +1,34 @@
+import pickle
+
+import numpy as np
+
+from src.models.node_table import NodeTable
+from src.methods.calculations import Calculations
+
+
+def test_node_table_matches_node_calculations():
+    coordinates = np.random.default_rng(1).integers(0, 1000, size=(50, 2))
+    demand = np.arange(50)
+    node_table = NodeTable.create(coordinates=coordinates, demand=demand, no_of_pickups=5)
+
+    node_table.set_polar_angles(depot_id=0)
+    nodes = node_table.to_nodes()
+
+    assert [node.node_type for node in nodes[:7]] == ['depot'] + ['pickup'] * 5 + ['delivery']
+    assert node_table.get_total_demand(node_type=NodeTable.DELIVERY) == sum(range(6, 50))
+    assert nodes[0].polar_angle == 0
+    for node in nodes[1:]:
+        assert node.polar_angle == Calculations.calculate_polar_angle(depot=nodes[0], node=node)
+
+
+def test_nodes_are_views_of_the_table():
+    coordinates = np.random.default_rng(2).integers(0, 1000, size=(20, 2))
+    node_table = NodeTable.create(coordinates=coordinates, demand=np.arange(20), no_of_pickups=3)
+    nodes = node_table.to_nodes()
+
+    node_table.set_polar_angles(depot_id=0)
+    assert [node.polar_angle for node in nodes] == node_table.polar_angle.tolist()
+    assert (nodes[4].location.lat, nodes[4].location.lon, nodes[4].demand) == (*coordinates[4].tolist(), 4)
+    assert type(nodes[4].demand) is int and nodes[4].node_type == 'delivery'
+    copies = pickle.loads(pickle.dumps(nodes))
+    assert copies == nodes and copies[0].table is copies[-1].table
@@ -0,0 +1,31 @@
+from copy import deepcopy
+
+import numpy as np
+
+from src.models.node import Node
+from src.models.vehicle import Vehicle
+from src.models.location import Location
+from src.methods.two_opt import TwoOpt
+from src.methods.calculations import Calculations
+from src.methods.parallel_two_opt import ParallelTwoOpt
+
+
+def test_two_opt_vehicles_matches_serial_two_opt():
+    rng = np.random.default_rng(5)
+    nodes = [Node(id=index, location=Location(lat=float(lat), lon=float(lon)), demand=int(demand),
+                  node_type='delivery')
+             for index, (lat, lon, demand) in enumerate(rng.integers(1, 100, size=(31, 3)))]
+    distance_matrix = Calculations.create_distance_matrix(nodes=nodes)
+    vehicles = [Vehicle(id=index + 1, route=nodes[1 + index * 10:11 + index * 10], capacity=1000) for index in range(3)]
+    serial_vehicles = deepcopy(vehicles)
+    for vehicle in serial_vehicles:
+        TwoOpt.delta_two_opt(vehicle=vehicle, distance_matrix=distance_matrix)
+
+    for executor in ('thread', 'process'):
+        parallel_vehicles = deepcopy(vehicles)
+        ParallelTwoOpt.two_opt_vehicles(vehicles=parallel_vehicles, distance_matrix=distance_matrix, workers=2,
+                                        executor=executor)
+
+        for parallel_vehicle, serial_vehicle in zip(parallel_vehicles, serial_vehicles):
+            assert parallel_vehicle.route_sequence == serial_vehicle.route_sequence
+            assert parallel_vehicle.route_distance == serial_vehicle.route_distance
@@ -0,0 +1,38 @@
+import pytest
+
+from src.configs.config import Instance
+from src.services.profiler import Profiler
+from src.services.service import RoutingService
+
+
+def test_solve_routing_returns_stage_profile():
+    output = RoutingService.solve_routing(instance=Instance.instances[1], no_of_vehicles=25, no_of_pickups=10,
+                                          capacity=206, use_n_n=True, plot=False, verbose=False)
+    profile = output["profile"]
+
+    assert {"data_preparation", "distance_matrix", "benefits", "finalize_clusters", "two_opt"} <= set(
+        profile["stage_times"])
+    assert sum(profile["stage_times"].values()) <= profile["elapsed_time"]
+    assert profile["counts"]["two_opt_moves_evaluated"] >= profile["counts"]["two_opt_moves_accepted"] > 0
+    assert profile["stage_peak_memory"] == {} and profile["process_peak_memory"] >= 0
+
+
+def test_profiler_hooks_keep_a_snapshot_per_stage():
+    profiler = Profiler(hook='cprofile')
+    with profiler.stage("sum"):
+        sum(range(1000))
+    profiler.count("calls", 2)
+
+    assert profiler.stage_times["sum"] > 0
+    assert profiler.counts == {"calls": 2}
+    assert profiler.snapshots["sum"].total_calls > 0
+    profiler = Profiler(hook='tracemalloc')
+    with profiler.stage("large"):
+        large = bytearray(4_000_000)
+    del large
+    with profiler.stage("small"):
+        bytearray(1000)
+
+    assert profiler.stage_peak_memory["large"] >= 4_000_000 > profiler.stage_peak_memory["small"]
+    with pytest.raises(ValueError):
+        Profiler(hook='perf')
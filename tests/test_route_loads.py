@@ -0,0 +1,97 @@
+import random
+
+from src.models.node import Node
+from src.configs.config import Instance
+from src.models.route_loads import RouteLoads
+from src.services.service import RoutingService
+from src.data.data_preparation import DataPreparation
+
+
+def get_max_load(route: list[Node]) -> int:
+    load = sum(node.demand for node in route if node.node_type == 'delivery')
+    max_load = load
+    for node in route:
+        load += node.demand if node.node_type == 'pickup' else -node.demand
+        max_load = max(max_load, load)
+    return max_load
+
+
+def get_route(generator: random.Random, length: int, first_id: int = 1) -> list[Node]:
+    return [Node(id=first_id + index, demand=generator.randint(1, 9),
+                 node_type=generator.choice(['delivery', 'delivery', 'pickup'])) for index in range(length)]
+
+
+def test_checks_match_the_changed_routes():
+    generator = random.Random(5)
+    for _ in range(500):
+        route = get_route(generator=generator, length=generator.randint(1, 12))
+        other = get_route(generator=generator, length=generator.randint(0, 6), first_id=50)
+        capacity = generator.randint(10, 50)
+        loads, other_loads = RouteLoads(route=route, capacity=capacity), RouteLoads(route=other, capacity=capacity)
+        start = generator.randrange(len(route))
+        end = generator.randint(start, len(route) - 1)
+        position = generator.randint(0, len(other))
+        node = get_route(generator=generator, length=1, first_id=99)[0]
+
+        assert loads.max_load == get_max_load(route)
+        assert loads.is_reversal_feasible(index_1=start, index_2=end) == \
+            (get_max_load(route[:start] + route[start:end + 1][::-1] + route[end + 1:]) <= capacity)
+        assert loads.is_replacement_feasible(start=start, end=end, segment=(0, 0, 0)) == \
+            (get_max_load(route[:start] + route[end + 1:]) <= capacity)
+        assert loads.is_replacement_feasible(start=start, end=end, segment=RouteLoads.get_node_segment(node=node)) \
+            == (get_max_load(route[:start] + [node] + route[end + 1:]) <= capacity)
+        for reverse in (False, True):
+            segment = route[start:end + 1][::-1] if reverse else route[start:end + 1]
+            assert other_loads.is_replacement_feasible(start=position, end=position - 1,
+                                                       segment=loads.get_segment(start=start, end=end,
+                                                                                 reverse=reverse)) == \
+                (get_max_load(other[:position] + segment + other[position:]) <= capacity)
+
+
+def test_reverse_updates_the_profile_in_place():
+    generator = random.Random(6)
+    route = get_route(generator=generator, length=40)
+    loads = RouteLoads(route=route, capacity=100)
+    loads.get_range(start=0, stop=len(route))
+    for _ in range(200):
+        index_1 = generator.randrange(len(route))
+        index_2 = generator.randint(index_1, len(route) - 1)
+        route[index_1:index_2 + 1] = route[index_1:index_2 + 1][::-1]
+        loads.reverse(index_1=index_1, index_2=index_2)
+        rebuilt = RouteLoads(route=route, capacity=100)
+        assert (loads.net, loads.prefix_max, loads.suffix_max, loads.range_min, loads.range_max) == \
+            (rebuilt.net, rebuilt.prefix_max, rebuilt.suffix_max, rebuilt.range_min, rebuilt.range_max)
+        assert loads.pickup_positions == rebuilt.pickup_positions
+
+
+def test_single_pickup_routes_do_not_build_the_tables():
+    generator = random.Random(7)
+    for _ in range(300):
+        route = [Node(id=index, demand=generator.randint(1, 9), node_type='delivery') for index in range(1, 15)]
+        pickup = generator.randrange(len(route))
+        route[pickup].node_type = generator.choice(['delivery', 'pickup'])
+        capacity = generator.randint(60, 90)
+        loads = RouteLoads(route=route, capacity=capacity)
+        index_1 = generator.randrange(len(route))
+        index_2 = generator.randint(index_1, len(route) - 1)
+
+        assert loads.is_reversal_feasible(index_1=index_1, index_2=index_2) == \
+            (get_max_load(route[:index_1] + route[index_1:index_2 + 1][::-1] + route[index_2 + 1:]) <= capacity)
+        loads.reverse(index_1=index_1, index_2=index_2)
+        route[index_1:index_2 + 1] = route[index_1:index_2 + 1][::-1]
+        assert loads.max_load == get_max_load(route)
+        assert loads.maxima is None and loads.ranges is None
+
+
+def test_vehicles_make_several_pickups():
+    arguments = dict(instance=Instance.instances[4], no_of_vehicles=44, no_of_pickups=60, capacity=87, use_n_n=True,
+                     plot=False, verbose=False)
+    one_pickup = RoutingService.solve_routing(**arguments)
+    output = RoutingService.solve_routing(max_pickups=None, pickup_insertion='cheapest', local_search=True,
+                                          **arguments)
+
+    nodes = DataPreparation(instance=Instance.instances[4], no_of_vehicles=44, no_of_pickups=60, capacity=87).nodes
+    routes = [[nodes[node_id] for node_id in route["route"]] for route in output["routes"]]
+    assert len(output["unassigned_pickups"]) < len(one_pickup["unassigned_pickups"])
+    assert max(sum(node.node_type == 'pickup' for node in route) for route in routes) > 1
+    assert all(RouteLoads(route=route, capacity=87).is_feasible() for route in routes)
@@ -0,0 +1,61 @@
+import numpy as np
+
+from src.configs.config import Instance
+from src.services.service import RoutingService
+from src.methods.spatial_index import SpatialIndex
+from src.methods.clustering import Clustering
+from src.methods.calculations import Calculations
+from src.data.data_preparation import DataPreparation
+from src.methods.distance_matrix import DistanceMatrix
+
+
+def test_query_matches_a_full_scan_after_removals():
+    generator = np.random.default_rng(1)
+    coordinates = generator.uniform(0, 100, size=(300, 2))
+    coordinates[:50] = generator.normal(20, 2, size=(50, 2))
+    points = generator.uniform(-20, 120, size=(200, 2))
+    index = SpatialIndex(coordinates=coordinates)
+    for removed in range(0, 300, 7):
+        index.remove(index=removed)
+    active = np.flatnonzero(index.active)
+
+    distances = np.sqrt(((points[:, np.newaxis, :] - coordinates[np.newaxis, active, :]) ** 2).sum(axis=2))
+    expected = active[np.argsort(distances, axis=1, kind='stable')[:, :8]]
+
+    assert index.size == len(active)
+    assert np.array_equal(index.query(points=points, k=8), expected)
+
+
+def test_nearest_seed_candidates_keep_the_nearest_neighbor_solution():
+    arguments = dict(instance=Instance.instances[4], no_of_vehicles=44, no_of_pickups=10, capacity=87, use_n_n=True,
+                     plot=False, verbose=False)
+    expected = RoutingService.solve_routing(**arguments)
+
+    for distance_mode in ('dense', 'lazy'):
+        output = RoutingService.solve_routing(seed_k=5, distance_mode=distance_mode, **arguments)
+        assert output["routes"] == expected["routes"]
+
+
+def test_nearest_seed_candidates_with_savings_and_regret():
+    output = RoutingService.solve_routing(instance=Instance.instances[2], no_of_vehicles=28, no_of_pickups=10,
+                                          capacity=69, use_n_n=False, seed_k=5, regret_k=2, plot=False,
+                                          verbose=False)
+
+    assert output["unassigned_deliveries"] == [] and output["unassigned_pickups"] == []
+    assert output["total_distance"] > 0
+
+
+def test_candidate_table_converts_to_full_benefits():
+    data = DataPreparation(instance=Instance.instances[1], no_of_vehicles=25, no_of_pickups=10, capacity=206)
+    distance_matrix = DistanceMatrix.create_provider(coordinates=data.node_table.coordinates, mode='dense')
+    clusters, remaining_nodes = Clustering.initiate_clusters(nodes=data.eligible_deliveries, no_of_vehicles=25,
+                                                             capacity=206)
+
+    for use_n_n in (True, False):
+        arguments = dict(clusters=clusters, nodes=remaining_nodes, distance_matrix=distance_matrix, depot=data.depot,
+                         use_n_n=use_n_n)
+        candidates = Calculations.calculate_benefit_table(seed_k=5, **arguments)
+        full = Calculations.calculate_benefit_table(**arguments)
+
+        assert candidates.partial and not full.partial
+        assert candidates.to_benefits() == full.to_benefits()
@@ -1,6 +1,7 @@
 import numpy as np
 
 from src.models.node import Node
+from src.models.location import Location
 from src.models.vehicle import Vehicle
 from src.methods.two_opt import TwoOpt
 from src.methods.calculations import Calculations
@@ -36,3 +37,43 @@ def test_two_opt(monkeypatch):
 
     assert vehicle.route == [node_1, node_2]
     assert vehicle.route_distance == 50
+
+
+def test_delta_two_opt_matches_two_opt():
+    rng = np.random.default_rng(3)
+    nodes = [Node(id=index, location=Location(lat=float(lat), lon=float(lon)), demand=int(demand),
+                  node_type='pickup' if index in (4, 9) else 'delivery')
+             for index, (lat, lon, demand) in enumerate(rng.integers(1, 100, size=(13, 3)))]
+    distance_matrix = Calculations.create_distance_matrix(nodes=nodes)
+    route = nodes[1:]
+    total_demand = sum(node.demand for node in route if node.node_type == 'delivery')
+
+    for capacity in (total_demand, total_demand + 40):
+        vehicle = Vehicle(id=1, route=list(route), capacity=capacity)
+        delta_vehicle = Vehicle(id=1, route=list(route), capacity=capacity)
+
+        TwoOpt.two_opt(vehicle, distance_matrix)
+        TwoOpt.delta_two_opt(delta_vehicle, distance_matrix)
+
+        assert delta_vehicle.route_sequence == vehicle.route_sequence
+        assert delta_vehicle.route_distance == vehicle.route_distance
+        assert delta_vehicle.is_route_feasible(route=delta_vehicle.route)
+
+
+def test_neighbor_two_opt_reaches_two_opt_local_optimum():
+    rng = np.random.default_rng(11)
+    nodes = [Node(id=index, location=Location(lat=float(lat), lon=float(lon)), demand=int(demand),
+                  node_type='delivery')
+             for index, (lat, lon, demand) in enumerate(rng.integers(1, 100, size=(25, 3)))]
+    distance_matrix = Calculations.create_distance_matrix(nodes=nodes)
+    vehicle = Vehicle(id=1, route=nodes[1:], capacity=10000)
+    vehicle.route_distance = Calculations.calculate_route_distance(nodes=vehicle.route, distance_matrix=distance_matrix)
+    initial_distance = vehicle.route_distance
+
+    TwoOpt.delta_two_opt(vehicle, distance_matrix, neighbor_k=len(nodes))
+    neighbor_distance = vehicle.route_distance
+    TwoOpt.delta_two_opt(vehicle, distance_matrix)
+
+    assert neighbor_distance < initial_distance
+    assert sorted(vehicle.route_sequence) == list(range(1, len(nodes)))
+    assert vehicle.route_distance >= neighbor_distance - 1e-6